@@ -4,9 +4,11 @@ Tests all major functionality of Tesco Creative Studio
 """
 
 import requests
+import io
 import json
 import os
 import time
+import zipfile
 
 API_BASE = "http://localhost:8000"
 
@@ -208,6 +210,37 @@ def test_compliance_with_errors():
         return False
 
 
+def test_batch_validation():
+    print_test("Batch Compliance Validation")
+
+    creatives = [
+        {"format": "1:1", "headline": "Fresh Products", "elements": []},
+        {"format": "1:1", "headline": "Win a prize!", "elements": []},
+    ]
+
+    response = requests.post(
+        f"{API_BASE}/api/compliance/validate-batch",
+        json={"creatives": creatives},
+        timeout=30
+    )
+
+    if response.status_code == 200:
+        results = {}
+        for line in response.text.splitlines():
+            result = json.loads(line)
+            results[result['index']] = result
+
+        print_pass(f"Results streamed: {len(results)}")
+        return (
+            len(results) == 2 and
+            results[0].get('is_compliant') and
+            not results[1].get('is_compliant')
+        )
+    else:
+        print_fail(f"Status: {response.status_code}")
+        return False
+
+
 def test_file_upload():
     print_test("File Upload")
 
@@ -320,6 +353,228 @@ def test_export_formats():
         return False
 
 
+EXPORT_TEST_CREATIVE = {
+    "format": "1:1",
+    "background_color": "#00539F",
+    "elements": [
+        {"id": "headline", "type": "text", "x": 100, "y": 100, "width": 800, "height": 100,
+         "text": "Fresh Products", "fontSize": 48, "fill": "#FFFFFF", "zIndex": 1}
+    ]
+}
+
+
+def _unique_test_image():
+    """PNG bytes no earlier run has uploaded"""
+    from PIL import Image
+
+    seed = time.time_ns()
+    img = Image.new('RGB', (64, 64), color=(seed % 256, (seed >> 8) % 256, (seed >> 16) % 256))
+    img.putpixel((0, 0), ((seed >> 24) % 256, (seed >> 32) % 256, (seed >> 40) % 256))
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format='PNG')
+    return img_bytes.getvalue()
+
+
+def test_upload_duplicate_and_delete():
+    print_test("Upload Deduplication and Asset Delete")
+
+    try:
+        image = _unique_test_image()
+    except ImportError:
+        print_warn("PIL not available, skipping upload test")
+        return True
+
+    first = requests.post(f"{API_BASE}/api/upload",
+                          files={'file': ('dedup_a.png', image, 'image/png')}, timeout=10)
+    second = requests.post(f"{API_BASE}/api/upload",
+                           files={'file': ('dedup_b.png', image, 'image/png')}, timeout=10)
+
+    if first.status_code != 200 or second.status_code != 200:
+        print_fail(f"Upload status: {first.status_code}, {second.status_code}")
+        return False
+
+    first_data, second_data = first.json(), second.json()
+    print_pass(f"First upload duplicate: {first_data.get('duplicate')}")
+    print_pass(f"Second upload duplicate: {second_data.get('duplicate')}")
+    if first_data.get('duplicate') or not second_data.get('duplicate'):
+        print_fail("Second upload of the same bytes should be a duplicate")
+        return False
+
+    asset_id = first_data.get('sha256')
+    deleted = requests.delete(f"{API_BASE}/api/assets/{asset_id}", timeout=10)
+    deleted_again = requests.delete(f"{API_BASE}/api/assets/{asset_id}", timeout=10)
+
+    print_pass(f"Delete status: {deleted.status_code}, repeat delete: {deleted_again.status_code}")
+    return (
+        deleted.status_code == 200 and
+        deleted.json().get('asset_id') == asset_id and
+        deleted_again.status_code == 404
+    )
+
+
+def test_background_removal_batch():
+    print_test("Batch Background Removal Job")
+
+    try:
+        image = _unique_test_image()
+    except ImportError:
+        print_warn("PIL not available, skipping background removal test")
+        return True
+
+    upload = requests.post(f"{API_BASE}/api/upload",
+                           files={'file': ('batch_bg.png', image, 'image/png')}, timeout=10)
+    image_path = upload.json().get('file_path')
+
+    missing = requests.post(f"{API_BASE}/api/ai/remove-background/batch",
+                            json={"image_paths": ["/uploads/does_not_exist.png"]}, timeout=10)
+    if missing.status_code != 404:
+        print_fail(f"Missing image status: {missing.status_code}")
+        return False
+    print_pass("Missing image rejected with 404")
+
+    response = requests.post(f"{API_BASE}/api/ai/remove-background/batch",
+                             json={"image_paths": [image_path]}, timeout=10)
+    if response.status_code != 200:
+        print_fail(f"Status: {response.status_code}")
+        return False
+
+    job = response.json()
+    print_pass(f"Job {job.get('job_id')} {job.get('status')}, {job.get('total')} image(s)")
+
+    status = requests.get(f"{API_BASE}/api/ai/remove-background/jobs/{job['job_id']}", timeout=10)
+    unknown = requests.get(f"{API_BASE}/api/ai/remove-background/jobs/unknown", timeout=10)
+
+    return (
+        job.get('total') == 1 and
+        status.status_code == 200 and
+        status.json().get('job_id') == job['job_id'] and
+        unknown.status_code == 404
+    )
+
+
+def test_multi_format_zip():
+    print_test("Multi-Format ZIP Bundle")
+
+    response = requests.post(
+        f"{API_BASE}/api/export/multi-format/zip",
+        json={"creative_data": EXPORT_TEST_CREATIVE, "filename": "zip_test", "formats": ["1:1", "9:16"]},
+        timeout=60
+    )
+
+    if response.status_code != 200:
+        print_fail(f"Status: {response.status_code}")
+        return False
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = sorted(archive.namelist())
+    manifest = json.loads(archive.read('manifest.json'))
+    print_pass(f"Entries: {names}")
+
+    return (
+        response.headers.get('content-type') == 'application/zip' and
+        archive.testzip() is None and
+        names == ['manifest.json', 'zip_test_1-1.jpg', 'zip_test_9-16.jpg'] and
+        [entry['format'] for entry in manifest['files']] == ['1:1', '9:16'] and
+        all(entry['success'] for entry in manifest['files'])
+    )
+
+
+def test_campaign_zip():
+    print_test("Campaign ZIP Bundle")
+
+    red_creative = dict(EXPORT_TEST_CREATIVE, background_color="#E31837")
+    response = requests.post(
+        f"{API_BASE}/api/export/campaign/zip",
+        json={
+            "filename": "campaign_test",
+            "creatives": [
+                {"creative_data": EXPORT_TEST_CREATIVE, "formats": ["1:1"]},
+                {"creative_data": red_creative, "name": "red", "formats": ["4:5"]},
+            ]
+        },
+        timeout=60
+    )
+
+    if response.status_code != 200:
+        print_fail(f"Status: {response.status_code}")
+        return False
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = sorted(archive.namelist())
+    manifest = json.loads(archive.read('manifest.json'))
+    print_pass(f"Entries: {names}")
+
+    invalid = requests.post(
+        f"{API_BASE}/api/export/campaign/zip",
+        json={"creatives": [{"creative_data": EXPORT_TEST_CREATIVE, "formats": ["2:3"]}]},
+        timeout=10
+    )
+    print_pass(f"Unsupported format status: {invalid.status_code}")
+
+    return (
+        names == ['campaign_test_1_1-1.jpg', 'manifest.json', 'red_4-5.jpg'] and
+        [entry['file'] for entry in manifest['files']] == ['campaign_test_1_1-1.jpg', 'red_4-5.jpg'] and
+        invalid.status_code == 400
+    )
+
+
+def test_export_job():
+    print_test("Queued Export Job")
+
+    response = requests.post(
+        f"{API_BASE}/api/export/jobs",
+        json={"creative_data": EXPORT_TEST_CREATIVE, "filename": "job_test", "formats": ["1:1", "1.91:1"]},
+        timeout=10
+    )
+
+    if response.status_code != 202:
+        print_fail(f"Status: {response.status_code}")
+        return False
+
+    job_id = response.json()['job_id']
+    print_pass(f"Job {job_id} queued")
+
+    # Progress events end once the job has finished
+    events = []
+    with requests.get(f"{API_BASE}/api/export/jobs/{job_id}/events", stream=True, timeout=60) as stream:
+        for line in stream.iter_lines(decode_unicode=True):
+            if line and line.startswith('data: '):
+                events.append(json.loads(line[len('data: '):]))
+    print_pass(f"Events: {[event['status'] for event in events]}")
+
+    job = requests.get(f"{API_BASE}/api/export/jobs/{job_id}", timeout=10).json()
+    results = job.get('results', {})
+    print_pass(f"Status: {job.get('status')}, progress: {job.get('progress')}")
+
+    unknown = requests.get(f"{API_BASE}/api/export/jobs/unknown", timeout=10)
+
+    return (
+        events and events[-1]['status'] == 'completed' and
+        job.get('status') == 'completed' and
+        job.get('progress') == 1.0 and
+        sorted(results) == ['1.91:1', '1:1'] and
+        all(result['success'] and result['output_path'].startswith('/exports/') for result in results.values()) and
+        unknown.status_code == 404
+    )
+
+
+def test_metrics_endpoint():
+    print_test("Prometheus Metrics")
+
+    response = requests.get(f"{API_BASE}/metrics", timeout=5)
+
+    if response.status_code == 200:
+        content_type = response.headers.get('content-type', '')
+        print_pass(f"Content type: {content_type}")
+        return (
+            content_type.startswith('text/plain; version=0.0.4') and
+            'creative_studio_render_element_seconds' in response.text
+        )
+    else:
+        print_fail(f"Status: {response.status_code}")
+        return False
+
+
 # ============================================================================
 # RUN ALL TESTS
 # ============================================================================
@@ -354,10 +609,17 @@ def main():
     run_test(test_compliance_rules)
     run_test(test_compliance_validation)
     run_test(test_compliance_with_errors)
+    run_test(test_batch_validation)
     run_test(test_file_upload)
     run_test(test_layout_suggestions)
     run_test(test_color_palettes)
     run_test(test_export_formats)
+    run_test(test_upload_duplicate_and_delete)
+    run_test(test_background_removal_batch)
+    run_test(test_multi_format_zip)
+    run_test(test_campaign_zip)
+    run_test(test_export_job)
+    run_test(test_metrics_endpoint)
 
     # Print summary
     print("\n" + "=" * 60)
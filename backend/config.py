@@ -8,10 +8,23 @@ class Settings(BaseSettings):
     # API Settings
     app_name: str = "Tesco Creative Studio"
     app_version: str = "1.0.0"
-    debug: bool = True
+    debug: bool = True  # Also sets the log level: DEBUG when on, INFO when off
+    log_element_sample_rate: float = 1.0  # Fraction of per-element debug records kept
+    metrics_enabled: bool = True  # Record stage latency histograms served on /metrics
 
     # Google Gemini Settings
     gemini_api_key: str = ""
+    gemini_model: str = "gemini-2.5-flash"
+    gemini_endpoint: str = ""  # Override the API host, e.g. http://127.0.0.1:8089 for a stub server
+    llm_cache_size: int = 512  # Cached responses (0 disables)
+    llm_cache_ttl_seconds: int = 3600  # Age after which a cached response is refetched
+    llm_workers: int = 4  # Threads running blocking model calls, i.e. the cap on concurrent calls
+    llm_max_retries: int = 3  # Retries after a 429 or 5xx response
+    llm_retry_base_seconds: float = 0.5  # First backoff delay, doubled per retry
+    llm_retry_max_seconds: float = 8.0  # Longest backoff delay, also caps Retry-After
+
+    # Text compliance
+    text_compliance_llm_threshold: float = 0.8  # Ask Gemini when the local verdict is less confident than this
 
     # Database
     database_url: str = "sqlite:///./tesco_creative.db"
@@ -19,6 +32,7 @@ class Settings(BaseSettings):
     # File Storage
     upload_dir: str = "./uploads"
     export_dir: str = "./exports"
+    export_cache_dir: str = "./export_cache"  # Not served: keep it outside export_dir
     max_file_size: int = 10485760  # 10MB
     allowed_extensions: str = "jpg,jpeg,png,webp,gif,svg,bmp,tiff,tif"
 
@@ -27,6 +41,32 @@ class Settings(BaseSettings):
         """Parse allowed extensions from comma-separated string"""
         return [ext.strip() for ext in self.allowed_extensions.split(',')]
 
+    # Compliance
+    compliance_cache_size: int = 1024  # Cached validation results (0 disables)
+    validation_workers: int = 0  # Batch validation processes (0 = CPU count)
+    validation_chunk_size: int = 25  # Creatives per worker task
+    validation_batch_max: int = 5000  # Max creatives per batch request
+
+    # Export rendering
+    render_workers: int = 0  # Render threads (0 = CPU count)
+    render_queue_limit: int = 16  # Renders allowed to wait before returning 503
+    asset_cache_mb: int = 512  # Memory budget for decoded images shared across renders
+    composite_cache_mb: int = 256  # Memory budget for flattened static layers reused between exports
+    export_cache_mb: int = 1024  # Disk budget for reused finished exports, shared by all processes using export_cache_dir (0 disables)
+    export_bundle_max: int = 100  # Max files per streamed ZIP bundle
+    export_workers: int = 2  # Processes running queued export jobs (0 = CPU count)
+    export_job_retention_hours: int = 168  # Finished export jobs are deleted after this long
+    export_job_lease_seconds: int = 60  # Running jobs whose worker stops renewing this lease are run again
+    font_dir: str = "./fonts"  # TTF/OTF files registered by family and weight
+    default_font_family: str = "Arial"
+
+    # Background removal
+    rembg_model: str = "u2net"  # rembg model name
+    rembg_sessions: int = 1  # Warm model sessions, one inference worker each
+    rembg_preload: bool = True  # Load sessions at startup instead of on first use
+    rembg_batch_size: int = 8  # Images stacked into one inference in batch jobs
+    rembg_batch_max: int = 1000  # Max images per batch job
+
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:5173,http://127.0.0.1:3000,http://127.0.0.1:5173"
 
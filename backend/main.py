@@ -3,37 +3,58 @@ Tesco Creative Studio - FastAPI Backend
 Main application with all API routes
 """
 
+import asyncio
+import itertools
+import json
+import logging
 import os
-import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import List
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request
+from fastapi import FastAPI, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from config import get_settings
+from utils.log import setup_logging
+from utils import metrics
+from utils.multipart_stream import BodyTooLarge, MultipartError, MultipartFileStream
 from models.schemas import (
     BackgroundRemovalRequest, BackgroundRemovalResponse,
-    ComplianceCheckRequest, ComplianceCheckResponse,
+    BatchBackgroundRemovalRequest, BackgroundRemovalJobResponse,
+    ComplianceCheckRequest, ComplianceCheckResponse, BatchComplianceCheckRequest,
     TextComplianceRequest, TextComplianceResponse,
     LayoutSuggestionRequest, LayoutSuggestionsResponse,
     ColorPalettesResponse,
     ExportRequest, ExportResult,
     MultiFormatExportRequest, MultiFormatExportResponse,
-    UploadResponse
+    ExportJobRequest, ExportJobResponse,
+    ExportBundleRequest, CampaignBundleRequest,
+    UploadResponse, AssetDeleteResponse
 )
 from services.compliance_rules import ComplianceEngine
+from services.batch_validation import BatchValidator, summarise_result
 from services.ai_service import AIService, CreativeSuggestionService
-from services.export_service import ExportService
+from services.export_service import ExportService, configure_export_service
+from services.render_executor import RenderExecutor, RenderQueueFull
+from services.export_jobs import ExportJobStore, ExportWorkerPool, FINISHED_STATUSES, sqlite_path
+from services.background_removal import BackgroundRemovalEngine
+from services.llm_gateway import LLMGateway
+from services.text_compliance import TextComplianceClassifier
+from services.asset_store import AssetStore, UploadTooLarge
 
 # Initialize app
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Stage latency histograms, exported on /metrics
+metrics.set_enabled(settings.metrics_enabled)
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -65,9 +86,97 @@ Path(settings.export_dir).mkdir(parents=True, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
 app.mount("/exports", StaticFiles(directory=settings.export_dir), name="exports")
 
-# Initialize services
-compliance_engine = ComplianceEngine()
-ai_service = AIService()
+# Services, created by init_services() at startup. Spawned worker processes
+# re-import this file as __mp_main__ when the server runs as `python main.py`,
+# so importing it must not build pools, sessions or logging threads.
+compliance_engine: ComplianceEngine = None
+batch_validator: BatchValidator = None
+render_executor: RenderExecutor = None
+ai_service: AIService = None
+asset_store: AssetStore = None
+asset_registry = None
+export_jobs: ExportJobStore = None
+export_workers: ExportWorkerPool = None
+
+
+@app.on_event("startup")
+def init_services():
+    """Configure logging and create the services used by the routes"""
+    global compliance_engine, batch_validator, render_executor, ai_service
+    global asset_store, asset_registry, export_jobs, export_workers
+
+    # Structured logging, written off the request threads
+    setup_logging(settings.debug, settings.log_element_sample_rate)
+
+    compliance_engine = ComplianceEngine(cache_size=settings.compliance_cache_size)
+    batch_validator = BatchValidator(
+        max_workers=settings.validation_workers,
+        chunk_size=settings.validation_chunk_size,
+        cache_size=settings.compliance_cache_size
+    )
+    render_executor = RenderExecutor(
+        max_workers=settings.render_workers,
+        max_queue=settings.render_queue_limit
+    )
+    configure_export_service(settings)
+    AIService.background_removal = BackgroundRemovalEngine(
+        model_name=settings.rembg_model,
+        sessions=settings.rembg_sessions,
+        batch_size=settings.rembg_batch_size
+    )
+    AIService.llm = LLMGateway(
+        api_key=settings.gemini_api_key,
+        model_name=settings.gemini_model,
+        endpoint=settings.gemini_endpoint,
+        cache_size=settings.llm_cache_size,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_workers=settings.llm_workers,
+        max_retries=settings.llm_max_retries,
+        retry_base_seconds=settings.llm_retry_base_seconds,
+        retry_max_seconds=settings.llm_retry_max_seconds
+    )
+    AIService.text_classifier = TextComplianceClassifier(threshold=settings.text_compliance_llm_threshold)
+    ai_service = AIService()
+    asset_store = AssetStore(settings.upload_dir)
+    asset_registry = ExportService.asset_registry
+    export_jobs = ExportJobStore(sqlite_path(settings.database_url))
+    export_workers = ExportWorkerPool(
+        export_jobs.db_path,
+        workers=settings.export_workers,
+        lease_seconds=settings.export_job_lease_seconds
+    )
+
+
+@app.on_event("startup")
+def preload_models():
+    """Warm model sessions in the background"""
+    if settings.rembg_preload:
+        AIService.background_removal.preload()
+
+
+@app.on_event("startup")
+def start_export_workers():
+    """
+    Prune old export jobs and start the workers
+
+    Jobs interrupted by a shutdown are not requeued here: other server
+    processes may share the queue, so workers take them over once their
+    lease expires.
+    """
+    pruned = export_jobs.prune(settings.export_job_retention_hours)
+    if pruned:
+        logger.info("Export queue pruned", extra={'pruned': pruned})
+    export_workers.start()
+
+
+@app.on_event("shutdown")
+def shutdown_services():
+    """Stop worker pools"""
+    batch_validator.shutdown()
+    render_executor.shutdown()
+    AIService.background_removal.shutdown()
+    AIService.llm.shutdown()
+    export_workers.shutdown()
 
 
 # ============================================================================
@@ -88,6 +197,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    # SQLite may wait on a worker's write lock: keep it off the event loop
+    job_counts = await run_in_threadpool(export_jobs.stats)
+
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -95,20 +207,71 @@ async def health_check():
             "api": "running",
             "compliance_engine": "active",
             "ai_service": "active"
-        }
+        },
+        "compliance_cache": compliance_engine.result_cache.stats(),
+        "render_executor": render_executor.stats(),
+        "asset_cache": ExportService.asset_cache.stats(),
+        "compositor": ExportService.compositor.stats(),
+        "export_cache": ExportService.export_cache.stats(),
+        "export_jobs": {**job_counts, "workers": export_workers.alive()},
+        "fonts": ExportService.fonts.stats(),
+        "background_removal": AIService.background_removal.stats(),
+        "llm": AIService.llm.stats(),
+        "text_compliance": AIService.text_classifier.stats(),
+        "assets": asset_registry.stats()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Stage latency histograms in Prometheus text format"""
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # ============================================================================
 # FILE UPLOAD
 # ============================================================================
 
-@app.post("/api/upload", response_model=UploadResponse)
-async def upload_file(file: UploadFile = File(...)):
+# Room for the multipart boundaries and part headers around the file
+UPLOAD_BODY_OVERHEAD = 64 * 1024
+
+UPLOAD_REQUEST_BODY = {
+    'required': True,
+    'content': {'multipart/form-data': {'schema': {
+        'type': 'object',
+        'required': ['file'],
+        'properties': {'file': {'type': 'string', 'format': 'binary'}},
+    }}},
+}
+
+
+@app.post("/api/upload", response_model=UploadResponse, openapi_extra={'requestBody': UPLOAD_REQUEST_BODY})
+async def upload_file(request: Request):
     """
     Upload image file (packshot, logo, background)
+
+    The multipart body is parsed as it arrives rather than spooled first, so
+    an oversized upload is refused from its Content-Length, or as soon as
+    the bytes received cross the limit.
     """
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"File too large. Max size: {settings.max_file_size / 1024 / 1024}MB"
+    )
+    max_body_bytes = settings.max_file_size + UPLOAD_BODY_OVERHEAD
+
     try:
+        content_length = request.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+            raise too_large
+
+        try:
+            file = await MultipartFileStream(request, 'file', max_body_bytes).open()
+        except MultipartError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except BodyTooLarge:
+            raise too_large
+
         # Validate file type
         file_ext = file.filename.split('.')[-1].lower()
         if file_ext not in settings.allowed_extensions_list:
@@ -117,29 +280,69 @@ async def upload_file(file: UploadFile = File(...)):
                 detail=f"Invalid file type. Allowed: {', '.join(settings.allowed_extensions_list)}"
             )
 
-        # Generate unique filename
-        unique_filename = f"{uuid.uuid4().hex}_{file.filename}"
-        file_path = os.path.join(settings.upload_dir, unique_filename)
-
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
+        # Stream to disk under the content hash; re-uploads reuse the existing file
+        try:
+            stored = await asset_store.store_upload(file, settings.max_file_size)
+        except (UploadTooLarge, BodyTooLarge):
+            raise too_large
 
-            # Check file size
-            if len(content) > settings.max_file_size:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File too large. Max size: {settings.max_file_size / 1024 / 1024}MB"
-                )
+        asset_registry.register(stored['file_path'])
 
-            buffer.write(content)
+        # Normalise and pre-scale once, so renders resample from a nearby size
+        if ExportService.pyramid.manifest(stored['file_path']) is None:
+            try:
+                await run_in_threadpool(ExportService.pyramid.build, stored['file_path'])
+            except Exception as e:
+                logger.warning("No pyramid for %s: %s", stored['file_path'], e)
 
         return UploadResponse(
             success=True,
-            file_path=file_path,
-            filename=unique_filename,
-            file_size=len(content),
-            message="File uploaded successfully"
+            file_path=stored['file_path'],
+            filename=stored['filename'],
+            file_size=stored['size'],
+            sha256=stored['sha256'],
+            original_filename=stored['original_filename'],
+            duplicate=stored['duplicate'],
+            message="File already uploaded" if stored['duplicate'] else "File uploaded successfully"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/api/assets/{asset_ref}", response_model=AssetDeleteResponse)
+async def delete_asset(asset_ref: str):
+    """
+    Delete an uploaded asset by id (content hash) or filename
+    Removes every stored copy of the content and its pyramid
+    """
+    try:
+        paths = asset_registry.paths_for(asset_ref)
+        if not paths:
+            path = asset_registry.resolve(asset_ref)
+            paths = [path] if path else []
+
+        if not paths:
+            raise HTTPException(status_code=404, detail="Asset not found")
+
+        asset_id = asset_registry.asset_id(os.path.basename(paths[0]))
+
+        for path in paths:
+            ExportService.pyramid.remove(path)
+            if os.path.exists(path):
+                os.remove(path)
+            asset_registry.unregister(path)
+
+        if asset_id != os.path.basename(paths[0]):
+            asset_store.forget(asset_id)
+
+        return AssetDeleteResponse(
+            success=True,
+            asset_id=asset_id,
+            deleted=[os.path.basename(path) for path in paths],
+            message="Asset deleted successfully"
         )
 
     except HTTPException:
@@ -158,23 +361,30 @@ async def remove_background(request: BackgroundRemovalRequest):
     Remove background from image using AI
     """
     try:
-        if not os.path.exists(request.image_path):
+        # Asset id, upload URL or path
+        image_path = ExportService._resolve_image_path(request.image_path)
+        if image_path is None:
             raise HTTPException(status_code=404, detail="Image file not found")
 
-        # Generate output filename
-        input_filename = os.path.basename(request.image_path)
-        output_filename = f"no_bg_{input_filename}".replace(
-            input_filename.split('.')[-1], 'png'
-        )
-        output_path = os.path.join(settings.upload_dir, output_filename)
+        # Output named after the input's content hash, so repeats are cache hits
+        output_path = asset_store.derived_path(image_path, 'no_bg', settings.rembg_model)
 
         # Remove background
-        result = await ai_service.remove_background(request.image_path, output_path)
+        result = await ai_service.remove_background(image_path, output_path)
 
         if result['success']:
+            asset_registry.register(output_path)
+
+            if ExportService.pyramid.manifest(output_path) is None:
+                try:
+                    await run_in_threadpool(ExportService.pyramid.build, output_path)
+                except Exception as e:
+                    logger.warning("No pyramid for %s: %s", output_path, e)
+
             return BackgroundRemovalResponse(
                 success=True,
                 output_path=output_path,
+                cached=result['cached'],
                 message=result['message']
             )
         else:
@@ -190,10 +400,48 @@ async def remove_background(request: BackgroundRemovalRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/ai/remove-background/batch", response_model=BackgroundRemovalJobResponse)
+async def remove_background_batch(request: BatchBackgroundRemovalRequest):
+    """
+    Remove backgrounds from many images as one job
+    Images are run through the model in stacked batches; poll the job for progress
+    """
+    if len(request.image_paths) > settings.rembg_batch_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many images. Max per job: {settings.rembg_batch_max}"
+        )
+
+    paths = {ref: ExportService._resolve_image_path(ref) for ref in request.image_paths}
+    missing = [ref for ref, path in paths.items() if path is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Image files not found: {', '.join(missing[:10])}")
+
+    items = [
+        (paths[ref], asset_store.derived_path(paths[ref], 'no_bg', settings.rembg_model))
+        for ref in request.image_paths
+    ]
+    job_id = AIService.background_removal.submit_batch(items)
+
+    return AIService.background_removal.get_job(job_id)
+
+
+@app.get("/api/ai/remove-background/jobs/{job_id}", response_model=BackgroundRemovalJobResponse)
+async def get_background_removal_job(job_id: str):
+    """
+    Progress and per-image results of a batch background removal job
+    """
+    job = AIService.background_removal.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+
 @app.post("/api/ai/check-text-compliance", response_model=TextComplianceResponse)
 async def check_text_compliance(request: TextComplianceRequest):
     """
-    Check text for compliance issues using AI
+    Check text for compliance issues, using AI only for ambiguous copy
     """
     try:
         result = await ai_service.check_text_compliance(request.text)
@@ -203,6 +451,8 @@ async def check_text_compliance(request: TextComplianceRequest):
             is_compliant=result.get('is_compliant', True),
             violations=result.get('violations', []),
             severity=result.get('severity', 'low'),
+            tier=result.get('tier'),
+            confidence=result.get('confidence'),
             error=result.get('error')
         )
 
@@ -310,58 +560,64 @@ async def validate_compliance(request: ComplianceCheckRequest):
     Rate Limited: 20 requests per minute per IP address
     """
     try:
-        print(f"\n🔍 Compliance validation request received")
         creative_data = request.creative_data.dict()
-        print(f"  Elements count: {len(creative_data.get('elements', []))}")
-        print(f"  Headline: {creative_data.get('headline')}")
-        print(f"  Rule types filter: {request.rule_types}")
+        logger.debug(
+            "Compliance validation request",
+            extra={'elements': len(creative_data.get('elements', [])), 'rule_types': request.rule_types}
+        )
 
         if request.rule_types:
             # Validate specific rule types (for real-time checking)
             result = compliance_engine.validate_realtime(
                 creative_data,
-                request.rule_types
+                request.rule_types,
+                session_id=request.session_id
             )
 
-            return ComplianceCheckResponse(
-                is_compliant=len(result['errors']) == 0,
-                compliance_score=100.0 if len(result['errors']) == 0 else 50.0,
-                total_rules=len(result['errors']) + len(result['warnings']),
-                passed_rules=len(result['warnings']),
-                errors=result['errors'],
-                warnings=result['warnings']
-            )
+            return ComplianceCheckResponse(**summarise_result(result, partial=True))
         else:
             # Full validation
-            result = compliance_engine.validate_all(creative_data)
-
-            print(f"\n✅ Compliance check complete:")
-            print(f"  Score: {result['compliance_score']}%")
-            print(f"  Passed: {result['passed_rules']}/{result['total_rules']}")
-            print(f"  Errors: {len(result['errors'])}")
-            print(f"  Warnings: {len(result['warnings'])}")
-
-            if result['errors']:
-                print(f"\n❌ Errors found:")
-                for error in result['errors']:
-                    print(f"  - {error['rule']}: {error['message']}")
-
-            return ComplianceCheckResponse(
-                is_compliant=result['is_compliant'],
-                compliance_score=result['compliance_score'],
-                total_rules=result['total_rules'],
-                passed_rules=result['passed_rules'],
-                errors=result['errors'],
-                warnings=result['warnings']
+            result = compliance_engine.validate_all(creative_data, session_id=request.session_id)
+
+            logger.debug(
+                "Compliance check complete",
+                extra={
+                    'score': result['compliance_score'],
+                    'passed': result['passed_rules'],
+                    'total': result['total_rules'],
+                    'failed_rules': [error['rule'] for error in result['errors']],
+                    'warnings': len(result['warnings']),
+                }
             )
 
+            return ComplianceCheckResponse(**summarise_result(result))
+
     except Exception as e:
-        print(f"\n❌ Compliance check error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Compliance check error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/compliance/validate-batch")
+async def validate_compliance_batch(request: BatchComplianceCheckRequest):
+    """
+    Validate many creatives in one call
+    Streams one NDJSON line per creative ({"index": ..., ...ComplianceCheckResponse})
+    as worker processes finish, so lines may arrive out of order
+    """
+    if len(request.creatives) > settings.validation_batch_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many creatives. Max per batch: {settings.validation_batch_max}"
+        )
+
+    creatives = [creative.dict() for creative in request.creatives]
+
+    return StreamingResponse(
+        batch_validator.stream(creatives, request.rule_types),
+        media_type="application/x-ndjson"
+    )
+
+
 @app.get("/api/compliance/rules")
 async def get_compliance_rules():
     """
@@ -398,34 +654,29 @@ async def export_creative(request: ExportRequest):
     Export creative in specified format
     """
     try:
-        print(f"🔽 Export request received:")
-        print(f"  Format: {request.format_type}")
-        print(f"  File format: {request.file_format}")
-        print(f"  Filename: {request.filename}")
-
         creative_data = request.creative_data.dict()
-        print(f"  Creative data keys: {list(creative_data.keys())}")
 
         # Generate output filename
         output_filename = f"{request.filename}_{request.format_type.replace(':', '-')}.{request.file_format.lower()}"
         output_path = os.path.join(settings.export_dir, output_filename)
 
-        print(f"  Output path: {output_path}")
+        logger.debug(
+            "Export request",
+            extra={'format': request.format_type, 'file_format': request.file_format, 'output_path': output_path}
+        )
 
-        # Export
-        result = ExportService.export_creative(
+        # Export (rendered on the render pool, off the event loop)
+        result = await render_executor.run(
+            ExportService.export_creative,
             creative_data,
             request.format_type,
             output_path,
             request.file_format
         )
 
-        print(f"  Export result: {result['success']}")
-
         if result['success']:
             # Return relative path for frontend
             relative_path = f"/exports/{output_filename}"
-            print(f"  ✅ Success! Relative path: {relative_path}")
 
             return ExportResult(
                 success=True,
@@ -433,20 +684,21 @@ async def export_creative(request: ExportRequest):
                 file_size_kb=result.get('file_size_kb'),
                 format=result.get('format'),
                 dimensions=result.get('dimensions'),
+                cached=result.get('cached', False),
                 message=result['message']
             )
         else:
-            print(f"  ❌ Export failed: {result.get('message')}")
+            logger.warning("Export failed", extra={'format': request.format_type, 'error': result.get('error')})
             return ExportResult(
                 success=False,
                 message=result['message'],
                 error=result.get('error')
             )
 
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        print(f"❌ Export error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Export error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -458,11 +710,13 @@ async def export_multiple_formats(request: MultiFormatExportRequest):
     try:
         creative_data = request.creative_data.dict()
 
-        # Export all formats
-        results = ExportService.export_multiple_formats(
+        # Export all formats, each format rendered in its own render pool slot
+        results = await run_in_threadpool(
+            ExportService.export_multiple_formats,
             creative_data,
             settings.export_dir,
-            request.filename
+            request.filename,
+            submit=render_executor.submit
         )
 
         # Fix paths for frontend - convert to web URLs
@@ -480,10 +734,137 @@ async def export_multiple_formats(request: MultiFormatExportRequest):
             message=results['message']
         )
 
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _validate_export_formats(formats: List[str], file_format: str):
+    """Raise 400 for unsupported formats or file formats"""
+    unknown = [format_type for format_type in formats if format_type not in ExportService.FORMATS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported formats: {', '.join(unknown)}")
+    if file_format not in ('JPEG', 'PNG'):
+        raise HTTPException(status_code=400, detail="file_format must be JPEG or PNG")
+
+
+async def _bundle_response(entries: list, file_format: str, filename: str) -> StreamingResponse:
+    """Stream a ZIP bundle, answering 503 if the render queue can't admit it"""
+    if len(entries) > settings.export_bundle_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many files. Max per bundle: {settings.export_bundle_max}"
+        )
+
+    chunks = ExportService.stream_bundle(entries, file_format, submit=render_executor.submit)
+    try:
+        # Runs until the first file is in the archive, so errors can still set the status
+        first = await run_in_threadpool(next, chunks)
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    return StreamingResponse(
+        itertools.chain([first], chunks),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{ExportService.safe_name(filename)}.zip"'}
+    )
+
+
+@app.post("/api/export/multi-format/zip")
+async def export_multiple_formats_zip(request: ExportBundleRequest):
+    """
+    Export creative in several formats as one streamed ZIP archive
+    Each format is added as soon as it is encoded; manifest.json lists the results
+    """
+    formats = request.formats or list(ExportService.FORMATS)
+    _validate_export_formats(formats, request.file_format)
+
+    creative_data = request.creative_data.dict()
+    entries = [(request.filename, creative_data, format_type) for format_type in formats]
+
+    return await _bundle_response(entries, request.file_format, request.filename)
+
+
+@app.post("/api/export/campaign/zip")
+async def export_campaign_zip(request: CampaignBundleRequest):
+    """
+    Export every creative of a campaign as one streamed ZIP archive
+    """
+    entries = []
+    for index, item in enumerate(request.creatives, start=1):
+        formats = item.formats or list(ExportService.FORMATS)
+        _validate_export_formats(formats, request.file_format)
+
+        creative_data = item.creative_data.dict()
+        name = item.name or f"{request.filename}_{index}"
+        entries.extend((name, creative_data, format_type) for format_type in formats)
+
+    return await _bundle_response(entries, request.file_format, request.filename)
+
+
+@app.post("/api/export/jobs", response_model=ExportJobResponse, status_code=202)
+async def submit_export_job(request: ExportJobRequest):
+    """
+    Queue an export of one creative in several formats
+    Worker processes render it; poll the job or follow its events for progress
+    """
+    formats = request.formats or list(ExportService.FORMATS)
+    _validate_export_formats(formats, request.file_format)
+
+    return await run_in_threadpool(
+        export_jobs.submit,
+        request.creative_data.dict(),
+        request.filename,
+        formats,
+        request.file_format
+    )
+
+
+@app.get("/api/export/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: str):
+    """
+    Status, progress and per-format results of an export job
+    """
+    job = await run_in_threadpool(export_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+
+@app.get("/api/export/jobs/{job_id}/events")
+async def export_job_events(job_id: str):
+    """
+    Server-sent events for an export job
+    Sends the job (as ExportJobResponse JSON) whenever its progress changes,
+    and closes the stream once it has completed or failed
+    """
+    job = await run_in_threadpool(export_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current = job
+        last_sent = None
+        while True:
+            data = json.dumps(current)
+            if data != last_sent:
+                yield f"data: {data}\n\n"
+                last_sent = data
+            if current is None or current['status'] in FINISHED_STATUSES:
+                return
+
+            await asyncio.sleep(0.5)
+            current = await run_in_threadpool(export_jobs.get, job_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/export/download/{filename}")
 async def download_export(filename: str):
     """
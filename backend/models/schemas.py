@@ -97,10 +97,22 @@ class BackgroundRemovalRequest(BaseModel):
     image_path: str
 
 
+class BatchBackgroundRemovalRequest(BaseModel):
+    """Request to remove backgrounds from many images as one job"""
+    image_paths: List[str]
+
+
 class ComplianceCheckRequest(BaseModel):
     """Request for compliance validation"""
     creative_data: CreativeData
     rule_types: Optional[List[str]] = None  # Specific rule types to check
+    session_id: Optional[str] = None  # Editor session/creative id, enables incremental validation
+
+
+class BatchComplianceCheckRequest(BaseModel):
+    """Request for validating many creatives in one call"""
+    creatives: List[CreativeData]
+    rule_types: Optional[List[str]] = None  # Specific rule types to check
 
 
 class TextComplianceRequest(BaseModel):
@@ -132,6 +144,36 @@ class MultiFormatExportRequest(BaseModel):
     filename: str = "creative"
 
 
+class ExportBundleRequest(BaseModel):
+    """Request to download several formats of a creative as one ZIP archive"""
+    creative_data: CreativeData
+    filename: str = "creative"
+    formats: Optional[List[str]] = None  # All supported formats when omitted
+    file_format: str = "JPEG"  # JPEG or PNG
+
+
+class CampaignBundleItem(BaseModel):
+    """One creative of a campaign bundle"""
+    creative_data: CreativeData
+    name: Optional[str] = None  # File name prefix, numbered after the bundle when omitted
+    formats: Optional[List[str]] = None  # All supported formats when omitted
+
+
+class CampaignBundleRequest(BaseModel):
+    """Request to download a campaign's creatives as one ZIP archive"""
+    creatives: List[CampaignBundleItem]
+    filename: str = "campaign"
+    file_format: str = "JPEG"  # JPEG or PNG
+
+
+class ExportJobRequest(BaseModel):
+    """Request to queue an export job"""
+    creative_data: CreativeData
+    filename: str = "creative"  # Files are named <filename>_<job id>_<format>.<ext>
+    formats: Optional[List[str]] = None  # All supported formats when omitted
+    file_format: str = "JPEG"  # JPEG or PNG
+
+
 # ============================================================================
 # RESPONSE MODELS
 # ============================================================================
@@ -140,10 +182,33 @@ class BackgroundRemovalResponse(BaseModel):
     """Response from background removal"""
     success: bool
     output_path: Optional[str] = None
+    cached: bool = False  # Result reused from an earlier removal of the same content
     message: str
     error: Optional[str] = None
 
 
+class BackgroundRemovalJobResult(BaseModel):
+    """Outcome for one image of a batch background removal job"""
+    index: int
+    image_path: str
+    success: bool
+    output_path: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class BackgroundRemovalJobResponse(BaseModel):
+    """Progress of a batch background removal job"""
+    job_id: str
+    status: str  # queued, running or completed
+    total: int
+    processed: int
+    failed: int
+    results: List[BackgroundRemovalJobResult] = []
+    created_at: str
+    finished_at: Optional[str] = None
+
+
 class ComplianceIssue(BaseModel):
     """Single compliance issue"""
     rule: str
@@ -168,6 +233,8 @@ class TextComplianceResponse(BaseModel):
     is_compliant: bool
     violations: List[str]
     severity: str
+    tier: Optional[str] = None  # 'local' (copy-rule scan) or 'llm'
+    confidence: Optional[float] = None  # Local tier confidence, when it decided
     message: Optional[str] = None
     error: Optional[str] = None
 
@@ -205,6 +272,7 @@ class ExportResult(BaseModel):
     file_size_kb: Optional[float] = None
     format: Optional[str] = None
     dimensions: Optional[str] = None
+    cached: bool = False  # Identical export reused from the export cache
     message: str
     error: Optional[str] = None
 
@@ -216,6 +284,20 @@ class MultiFormatExportResponse(BaseModel):
     message: str
 
 
+class ExportJobResponse(BaseModel):
+    """Progress of a queued export job"""
+    job_id: str
+    status: str  # queued, running, completed or failed
+    total: int
+    completed: int
+    progress: float  # Fraction of formats finished
+    results: Dict[str, ExportResult] = {}
+    error: Optional[str] = None  # Why a job failed, or which formats failed in a completed job
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
 # ============================================================================
 # USER MODELS
 # ============================================================================
@@ -247,4 +329,15 @@ class UploadResponse(BaseModel):
     file_path: str
     filename: str
     file_size: int
+    sha256: Optional[str] = None
+    original_filename: Optional[str] = None
+    duplicate: bool = False  # Same content was already uploaded
+    message: str
+
+
+class AssetDeleteResponse(BaseModel):
+    """Response from deleting an uploaded asset"""
+    success: bool
+    asset_id: str
+    deleted: List[str]  # Filenames removed from the upload directory
     message: str
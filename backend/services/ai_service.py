@@ -11,21 +11,29 @@ import io
 from typing import List, Dict, Optional
 from PIL import Image
 import numpy as np
-from rembg import remove
-import google.generativeai as genai
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import get_settings
+from services.background_removal import BackgroundRemovalEngine
+from services.llm_gateway import LLMGateway
+from services.text_compliance import TextComplianceClassifier
 
 settings = get_settings()
-if settings.gemini_api_key:
-    genai.configure(api_key=settings.gemini_api_key)
 
 
 class AIService:
     """AI service for background removal and creative suggestions"""
 
+    # Warm rembg sessions and the worker pool that runs inference
+    background_removal = BackgroundRemovalEngine()
+
+    # Shared Gemini client, with coalescing and a response cache
+    llm = LLMGateway(api_key=settings.gemini_api_key)
+
+    # Local copy-rule tier in front of the LLM for text compliance
+    text_classifier = TextComplianceClassifier()
+
     @staticmethod
     async def remove_background(image_path: str, output_path: str) -> dict:
         """
@@ -39,18 +47,13 @@ class AIService:
             dict with success status and output path
         """
         try:
-            # Load image
-            input_image = Image.open(image_path)
-
-            # Remove background
-            output_image = remove(input_image)
-
-            # Save output
-            output_image.save(output_path)
+            # Inference runs on the engine's workers, off the event loop
+            cached = await AIService.background_removal.remove_file(image_path, output_path)
 
             return {
                 'success': True,
                 'output_path': output_path,
+                'cached': cached,
                 'message': 'Background removed successfully'
             }
 
@@ -64,18 +67,32 @@ class AIService:
     @staticmethod
     async def check_text_compliance(text: str) -> dict:
         """
-        Check text for prohibited content using Google Gemini
-        
+        Check text for prohibited content
+
+        The local copy-rule scan answers first. Google Gemini is asked only
+        when that verdict's confidence is under the classifier threshold, and
+        the local verdict stands if the model call fails.
+
         Args:
             text: Text to check
             
         Returns:
-            dict with compliance status and detected issues
+            dict with compliance status, detected issues and the tier that decided
         """
 
-        if not settings.gemini_api_key:
-            # Fallback to rule-based checking if no API key
-            return AIService._fallback_text_check(text)
+        classifier = AIService.text_classifier
+        local = classifier.classify(text)
+        local_result = {
+            'success': True,
+            'is_compliant': local['is_compliant'],
+            'violations': local['violations'],
+            'severity': local['severity'],
+            'confidence': local['confidence'],
+        }
+
+        if not local['needs_review'] or not AIService.llm.enabled:
+            classifier.record('local')
+            return {**local_result, 'tier': 'local'}
 
         try:
             prompt = f"""You are a compliance checker for retail media advertising.
@@ -100,59 +117,25 @@ Respond in JSON format:
 }}
 """
 
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
+            response_text = await AIService.llm.generate(prompt, operation='text_compliance')
 
             # Parse JSON response
             import json
-            compliance_data = json.loads(response.text)
+            compliance_data = json.loads(response_text)
 
+            classifier.record('llm')
             return {
                 'success': True,
                 'is_compliant': compliance_data.get('is_compliant', True),
                 'violations': compliance_data.get('violations', []),
-                'severity': compliance_data.get('severity', 'low')
+                'severity': compliance_data.get('severity', 'low'),
+                'tier': 'llm'
             }
 
         except Exception as e:
-            # Fallback on error
-            return AIService._fallback_text_check(text)
-
-    @staticmethod
-    def _fallback_text_check(text: str) -> dict:
-        """Fallback rule-based text compliance checking"""
-
-        import re
-
-        violations = []
-        text_lower = text.lower()
-
-        # Check for prohibited patterns
-        prohibited_patterns = {
-            'T&Cs/Claims': [r'\*', r't&c', r'terms apply', r'terms and conditions'],
-            'Competitions': ['competition', 'contest', 'win', 'prize', 'giveaway'],
-            'Sustainability': ['sustainable', 'eco-friendly', 'green', 'carbon neutral'],
-            'Charity': ['charity', 'donation', 'donate', 'fundraiser'],
-            'Price': [r'£\d+', r'\d+%\s*off', 'discount', 'save', 'deal'],
-            'Money-back': ['money back', 'guarantee', 'refund'],
-            'Claims': ['survey', 'study', 'proven', 'tested']
-        }
-
-        for category, patterns in prohibited_patterns.items():
-            for pattern in patterns:
-                if isinstance(pattern, str):
-                    if pattern in text_lower:
-                        violations.append(f"{category}: '{pattern}' detected")
-                else:
-                    if re.search(pattern, text_lower):
-                        violations.append(f"{category}: pattern '{pattern}' detected")
-
-        return {
-            'success': True,
-            'is_compliant': len(violations) == 0,
-            'violations': violations,
-            'severity': 'high' if violations else 'low'
-        }
+            # Keep the local verdict
+            classifier.record('llm_failed')
+            return {**local_result, 'tier': 'local'}
 
     @staticmethod
     def suggest_layouts(creative_data: dict) -> List[dict]:
@@ -419,7 +402,7 @@ class CreativeSuggestionService:
             Adapted creative data with repositioned elements
         """
 
-        if not settings.gemini_api_key:
+        if not AIService.llm.enabled:
             # Fallback to proportional resizing
             return CreativeSuggestionService._proportional_resize(creative_data, target_format)
 
@@ -463,11 +446,10 @@ Provide optimal element positions in JSON:
 }}
 """
 
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
+            response_text = await AIService.llm.generate(prompt, operation='adaptive_resize')
 
             import json
-            adapted_layout = json.loads(response.text)
+            adapted_layout = json.loads(response_text)
 
             # Update creative data with new positions
             adapted_creative = creative_data.copy()
@@ -547,7 +529,7 @@ Provide optimal element positions in JSON:
             Set of creative variations optimized for different channels
         """
 
-        if not settings.gemini_api_key:
+        if not AIService.llm.enabled:
             # Fallback to basic template variations
             return CreativeSuggestionService._template_campaign_set(product_name, headline, brand_colors)
 
@@ -593,11 +575,10 @@ Respond in JSON:
 }}
 """
 
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
+            response_text = await AIService.llm.generate(prompt, operation='campaign_set')
 
             import json
-            campaign_data = json.loads(response.text)
+            campaign_data = json.loads(response_text)
 
             return {
                 'success': True,
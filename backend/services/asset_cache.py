@@ -0,0 +1,132 @@
+"""
+Decoded Asset Cache for Tesco Creative Studio
+Process-wide LRU of decoded images and their resized variants
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from utils.metrics import IMAGE_DECODE_SECONDS, IMAGE_RESIZE_SECONDS
+
+
+class AssetCache:
+    """
+    Byte-budgeted LRU of decoded images
+
+    Entries are keyed by (path, mtime, size), so an overwritten file is decoded
+    again instead of being served stale. Besides the decoded RGBA original, the
+    cache holds resized/rotated variants keyed by (width, height, rotation,
+    opacity). Cached images are shared between render threads and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[tuple, Image.Image]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _file_key(path: str) -> Tuple[str, int, int]:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _image_bytes(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def _lookup(self, key: tuple) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def _store(self, key: tuple, image: Image.Image):
+        size = self._image_bytes(image)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= self._image_bytes(previous)
+
+            self._entries[key] = image
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._image_bytes(evicted)
+                self.evictions += 1
+
+    def get_image(self, path: str) -> Image.Image:
+        """Decoded RGBA image for a file path, EXIF orientation applied"""
+
+        key = (self._file_key(path), None)
+        image = self._lookup(key)
+
+        if image is None:
+            with IMAGE_DECODE_SECONDS.time(), Image.open(path) as source:
+                image = ImageOps.exif_transpose(source).convert('RGBA')
+            self._store(key, image)
+
+        return image
+
+    def get_variant(self, path: str, width: int, height: int, rotation: float = 0,
+                    opacity: float = 1.0) -> Image.Image:
+        """
+        Decoded image resized to (width, height), then rotated by `rotation` degrees
+
+        With opacity below 1 the alpha channel is scaled by it, so existing
+        transparency (cut-outs, rotated corners) is kept.
+        """
+
+        key = (self._file_key(path), (width, height, rotation, opacity))
+        image = self._lookup(key)
+
+        if image is None:
+            if opacity < 1.0:
+                image = self.get_variant(path, width, height, rotation).copy()
+                scale = max(0.0, opacity)
+                image.putalpha(image.getchannel('A').point(lambda value: round(value * scale)))
+            else:
+                source = self.get_image(path)
+                with IMAGE_RESIZE_SECONDS.time():
+                    image = source.resize((width, height), Image.Resampling.LANCZOS)
+                    if rotation:
+                        image = image.rotate(-rotation, expand=True, fillcolor=(255, 255, 255, 0))
+            self._store(key, image)
+
+        return image
+
+    def clear(self):
+        """Drop all cached images"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Size and hit/miss/eviction counters for monitoring"""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
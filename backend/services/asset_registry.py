@@ -0,0 +1,168 @@
+"""
+Asset Registry for Tesco Creative Studio
+Maps asset ids, upload URLs and filenames to files in the upload directory
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+
+_DIGEST_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+# Names AssetStore writes: blobs (<sha256>.<ext>) and derived files
+# (<kind>_<sha256>[_<variant>].<ext>)
+_STORED_NAME = re.compile(r'^(?:[a-z][a-z0-9]*(?:_[a-z0-9]+)*_)?[0-9a-f]{64}(?:_[A-Za-z0-9-]+)?\.[A-Za-z0-9]+$')
+
+
+class AssetRegistry:
+    """
+    In-memory index of the upload directory
+
+    Built by one directory scan at startup and kept current by the upload,
+    background-removal and delete endpoints. Every asset is reachable by its
+    filename and, for content-addressed uploads, by its SHA-256 id, so an
+    element src such as "http://host/uploads/<name>", "./uploads/<name>",
+    "<name>" or "<sha256>" resolves with a dict lookup. Files written to the
+    directory by other means are picked up on first lookup.
+
+    Only files named by AssetStore are assets. Dot-files (.meta/, .pyramid/,
+    in-progress uploads) and anything else in the directory can't be looked
+    up, and so can't be deleted through the API.
+    """
+
+    def __init__(self, upload_dir: str = './uploads'):
+        self.upload_dir = upload_dir
+        self._root = os.path.abspath(upload_dir)
+        self._paths: Dict[str, str] = {}
+        self._ids: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self.scan()
+
+    @staticmethod
+    def asset_id(filename: str) -> str:
+        """Content hash for content-addressed files, else the filename"""
+        stem = os.path.splitext(filename)[0]
+        return stem if _DIGEST_NAME.match(stem) else filename
+
+    @staticmethod
+    def is_asset_name(filename: str) -> bool:
+        """True for content-addressed blobs and files derived from them"""
+        return bool(_STORED_NAME.match(filename))
+
+    def scan(self):
+        """Index every file in the upload directory"""
+
+        with self._lock:
+            self._paths.clear()
+            self._ids.clear()
+
+        if not os.path.isdir(self.upload_dir):
+            return
+
+        for entry in os.scandir(self.upload_dir):
+            if entry.is_file():
+                self.register(entry.path)
+
+    def register(self, path: str) -> Optional[str]:
+        """Index a file in the upload directory, returning its asset id (None if it isn't an asset)"""
+
+        filename = os.path.basename(path)
+        if not self.is_asset_name(filename):
+            return None
+
+        asset_id = self.asset_id(filename)
+        canonical = os.path.join(self.upload_dir, filename)
+
+        with self._lock:
+            self._paths[filename] = canonical
+            filenames = self._ids.setdefault(asset_id, [])
+            if filename not in filenames:
+                filenames.append(filename)
+
+        return asset_id
+
+    def unregister(self, path: str):
+        """Drop a file from the index"""
+
+        filename = os.path.basename(path)
+        asset_id = self.asset_id(filename)
+
+        with self._lock:
+            self._paths.pop(filename, None)
+            filenames = self._ids.get(asset_id, [])
+            if filename in filenames:
+                filenames.remove(filename)
+            if not filenames:
+                self._ids.pop(asset_id, None)
+
+    def _filename(self, ref: str) -> Optional[str]:
+        """Upload-directory filename named by a URL, path or bare filename, None unless it's an asset name"""
+
+        if ref.startswith(('http://', 'https://')):
+            ref = urlparse(ref).path
+
+        ref = unquote(ref).replace('\\', '/')
+
+        if '/uploads/' in ref:
+            ref = ref.rsplit('/uploads/', 1)[-1]
+            # Only top-level files, not .meta/ or .pyramid/ internals
+            if '/' in ref:
+                return None
+        elif os.path.isabs(ref):
+            if os.path.dirname(os.path.abspath(ref)) != self._root:
+                return None
+        else:
+            if ref.startswith('./'):
+                ref = ref[2:]
+            if ref.startswith('uploads/'):
+                ref = ref[len('uploads/'):]
+                if '/' in ref:
+                    return None
+            elif os.path.dirname(ref) and os.path.abspath(os.path.dirname(ref)) != self._root:
+                return None
+
+        filename = os.path.basename(ref)
+        return filename if self.is_asset_name(filename) else None
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """
+        Path of the asset an id, upload URL, path or filename refers to
+
+        Returns None when the reference doesn't name an existing upload.
+        """
+
+        if not ref:
+            return None
+
+        filenames = self._ids.get(ref)
+        if filenames:
+            return self._paths.get(filenames[0])
+
+        filename = self._filename(ref)
+        if not filename:
+            return None
+
+        path = self._paths.get(filename)
+        if path is not None:
+            return path
+
+        # Written without going through the API, e.g. batch job outputs
+        candidate = os.path.join(self.upload_dir, filename)
+        if os.path.isfile(candidate):
+            self.register(candidate)
+            return candidate
+
+        return None
+
+    def paths_for(self, asset_id: str) -> List[str]:
+        """Every indexed file of an asset (one per stored extension)"""
+        with self._lock:
+            return [self._paths[filename] for filename in self._ids.get(asset_id, [])]
+
+    def stats(self) -> dict:
+        """Index size for monitoring"""
+        with self._lock:
+            return {'assets': len(self._ids), 'files': len(self._paths)}
@@ -0,0 +1,239 @@
+"""
+Asset Store for Tesco Creative Studio
+Content-addressed storage for uploaded images and their derived files
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+UPLOAD_CHUNK_SIZE = 256 * 1024
+_DIGEST_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload stream exceeds the size limit"""
+
+
+class AssetStore:
+    """
+    Uploads stored under the SHA-256 of their content
+
+    Blobs live flat in the upload directory as <sha256>.<ext>, so they stay
+    reachable under /uploads/ like before. Uploading the same bytes again
+    reuses the existing blob; when only the extension differs, the new name
+    is a hard link to it. Original filenames are kept in a JSON sidecar under
+    .meta/. Derived files (e.g. background-removed copies) are named after the
+    source digest, so they can be reused whenever the same content comes back.
+    """
+
+    def __init__(self, root_dir: str = './uploads'):
+        self.root_dir = root_dir
+        self.meta_dir = os.path.join(root_dir, '.meta')
+        self._lock = threading.Lock()
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        os.makedirs(self.meta_dir, exist_ok=True)
+
+    @staticmethod
+    def _extension(filename: str) -> str:
+        return filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'bin'
+
+    def blob_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root_dir, f"{digest}.{ext}")
+
+    def _meta_path(self, digest: str) -> str:
+        return os.path.join(self.meta_dir, f"{digest}.json")
+
+    def metadata(self, digest: str) -> Optional[dict]:
+        """Sidecar metadata for a digest, or None if it was never stored"""
+
+        try:
+            with open(self._meta_path(digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_metadata(self, digest: str, ext: str, size: int, filename: str):
+        with self._lock:
+            meta = self.metadata(digest) or {
+                'sha256': digest,
+                'size': size,
+                'extensions': [],
+                'original_filenames': [],
+                'created_at': datetime.now().isoformat(),
+            }
+
+            if ext not in meta['extensions']:
+                meta['extensions'].append(ext)
+            if filename not in meta['original_filenames']:
+                meta['original_filenames'].append(filename)
+            meta['last_uploaded_at'] = datetime.now().isoformat()
+
+            # Atomic replace, readers never see a half-written sidecar
+            fd, tmp_path = tempfile.mkstemp(dir=self.meta_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._meta_path(digest))
+
+    def _commit(self, tmp_path: str, digest: str, size: int, filename: str) -> dict:
+        """Move a fully written temp file into place under its digest"""
+
+        ext = self._extension(filename)
+        path = self.blob_path(digest, ext)
+        duplicate = True
+
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            # Same bytes under another extension: hard link instead of a copy
+            meta = self.metadata(digest) or {}
+            existing = [
+                self.blob_path(digest, other) for other in meta.get('extensions', [])
+                if os.path.exists(self.blob_path(digest, other))
+            ]
+
+            try:
+                if existing:
+                    os.link(existing[0], path)
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, path)
+                    duplicate = False
+            except FileExistsError:
+                # A concurrent upload of the same content won the race
+                os.remove(tmp_path)
+            except OSError:
+                # Filesystem without hard links
+                os.replace(tmp_path, path)
+
+        self._write_metadata(digest, ext, size, filename)
+
+        return {
+            'sha256': digest,
+            'file_path': path,
+            'filename': os.path.basename(path),
+            'original_filename': filename,
+            'size': size,
+            'duplicate': duplicate,
+        }
+
+    def forget(self, digest: str):
+        """Drop the metadata of a digest once all of its files are deleted"""
+        with self._lock:
+            if os.path.exists(self._meta_path(digest)):
+                os.remove(self._meta_path(digest))
+
+    def store_bytes(self, data: bytes, filename: str) -> dict:
+        """
+        Store uploaded content
+
+        Returns:
+            dict with sha256, file_path, filename, original_filename, size and
+            duplicate (True when the content was already stored)
+        """
+
+        digest = hashlib.sha256(data).hexdigest()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix='.upload-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        return self._commit(tmp_path, digest, len(data), filename)
+
+    async def store_upload(self, upload, max_bytes: int) -> dict:
+        """
+        Stream an upload to disk, hashing it in the same pass
+
+        Reads fixed-size chunks, so memory use doesn't grow with file size,
+        and stops as soon as the stream exceeds max_bytes. Disk writes and
+        the commit run in the threadpool, off the event loop. The upload
+        endpoint passes a MultipartFileStream, which reads the request body
+        as it arrives; a Starlette UploadFile would already be spooled.
+
+        Args:
+            upload: Object with a filename and an async read(size)
+            max_bytes: Size limit
+
+        Returns:
+            Same dict as store_bytes
+
+        Raises:
+            UploadTooLarge: The upload is larger than max_bytes
+        """
+
+        sha = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                def write(chunk: bytes):
+                    sha.update(chunk)
+                    f.write(chunk)
+
+                while True:
+                    chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+
+                    await run_in_threadpool(write, chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        return await run_in_threadpool(self._commit, tmp_path, sha.hexdigest(), size, upload.filename)
+
+    def digest_of(self, path: str) -> str:
+        """
+        SHA-256 of a file's content
+
+        Files named by the store carry their digest; other files are hashed
+        once per (path, mtime, size).
+        """
+
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if _DIGEST_NAME.match(stem) and os.path.exists(self._meta_path(stem)):
+            return stem
+
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is not None:
+            return digest
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        with self._lock:
+            self._digests[key] = digest
+
+        return digest
+
+    def derived_path(self, source_path: str, kind: str, variant: str = '', ext: str = 'png') -> str:
+        """
+        Path for a file derived from source content, e.g. kind='no_bg'
+
+        The name depends only on the source digest and variant, so an existing
+        file at this path is a valid memoised result.
+        """
+
+        suffix = f"_{variant}" if variant else ''
+        return os.path.join(self.root_dir, f"{kind}_{self.digest_of(source_path)}{suffix}.{ext}")
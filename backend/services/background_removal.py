@@ -0,0 +1,379 @@
+"""
+Background Removal Engine for Tesco Creative Studio
+Runs rembg (U-2-Net) inference on a worker pool with warm ONNX sessions
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from rembg import new_session, remove
+from rembg.bg import fix_image_orientation, naive_cutout
+
+from utils.metrics import REMBG_INFERENCE_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+# Models sharing U2netSession's pre/post-processing, whose inputs can be stacked
+BATCHED_MODELS = ('u2net', 'u2netp', 'u2net_human_seg')
+U2NET_MEAN = (0.485, 0.456, 0.406)
+U2NET_STD = (0.229, 0.224, 0.225)
+U2NET_SIZE = (320, 320)
+
+
+class BackgroundRemovalEngine:
+    """
+    Pool of rembg sessions served by dedicated worker threads
+
+    Creating a session loads the ONNX model, which takes far longer than a
+    single inference, so sessions are created once and checked out per call.
+    There is one worker per session; onnxruntime releases the GIL during
+    inference, so the event loop stays responsive while masks are computed.
+    """
+
+    def __init__(self, model_name: str = 'u2net', sessions: int = 1, batch_size: int = 8, max_jobs: int = 200):
+        self.model_name = model_name
+        self.size = max(1, sessions)
+        self.batch_size = max(1, batch_size)
+        self.max_jobs = max_jobs
+        self._jobs: 'OrderedDict[str, dict]' = OrderedDict()
+        self._batching = model_name in BATCHED_MODELS
+        self._pool = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='rembg')
+        self._idle: 'queue.Queue' = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._latencies = deque(maxlen=256)
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cache_hits = 0
+
+    def _create(self):
+        """New session if the pool isn't full yet, else None"""
+
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+
+        try:
+            return new_session(self.model_name)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        session = self._create()
+        return self._idle.get() if session is None else session
+
+    def _release(self, session):
+        self._idle.put(session)
+
+    def _warm(self):
+        # Create rather than acquire: an idle session released by an earlier
+        # warm-up would otherwise be picked up and the pool left half-loaded
+        try:
+            session = self._create()
+        except Exception as e:
+            logger.warning("Could not preload rembg model %s: %s", self.model_name, e)
+            return
+
+        if session is not None:
+            self._release(session)
+
+    def preload(self):
+        """Create every session on the worker pool without blocking the caller"""
+
+        for _ in range(self.size - self._created):
+            self._pool.submit(self._warm)
+
+    def remove_image(self, image: Image.Image) -> Image.Image:
+        """Remove the background of an image on the calling thread"""
+
+        session = self._acquire()
+        started = time.perf_counter()
+        try:
+            return remove(image, session=session)
+        finally:
+            self._release(session)
+            elapsed = time.perf_counter() - started
+            self._latencies.append(elapsed)
+            REMBG_INFERENCE_SECONDS.labels(mode='single').observe(elapsed)
+
+    @staticmethod
+    def _save(image: Image.Image, output_path: str):
+        # Write then rename: an existing output path always holds a complete file
+        tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            image.save(tmp_path, format='PNG')
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _cached(self, output_path: str) -> bool:
+        if not os.path.exists(output_path):
+            return False
+
+        with self._lock:
+            self.cache_hits += 1
+        return True
+
+    def _remove_file(self, image_path: str, output_path: str):
+        try:
+            with Image.open(image_path) as input_image:
+                output_image = self.remove_image(input_image)
+            self._save(output_image, output_path)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.completed += 1
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def remove_file(self, image_path: str, output_path: str) -> bool:
+        """
+        Remove the background of an image file on the worker pool
+
+        Output paths are content-addressed (see AssetStore.derived_path), so
+        an existing output is reused without running inference.
+
+        Returns:
+            True if the result was already on disk
+        """
+
+        if self._cached(output_path):
+            return True
+
+        with self._lock:
+            self.in_flight += 1
+
+        try:
+            future = self._pool.submit(self._remove_file, image_path, output_path)
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+
+        await asyncio.wrap_future(future)
+        return False
+
+    def stats(self) -> dict:
+        """Session, queue depth and inference latency figures"""
+
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+
+        with self._lock:
+            return {
+                'model': self.model_name,
+                'sessions': self.size,
+                'batch_size': self.batch_size,
+                'batched_inference': self._batching,
+                'sessions_loaded': self._created,
+                'in_flight': self.in_flight,
+                'queued': max(0, self.in_flight - self.size),
+                'completed': self.completed,
+                'failed': self.failed,
+                'cache_hits': self.cache_hits,
+                'jobs': len(self._jobs),
+                'latency_ms': {
+                    'p50': percentile(0.5),
+                    'p95': percentile(0.95),
+                    'max': percentile(1.0),
+                },
+            }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ========================================================================
+    # BATCH JOBS
+    # ========================================================================
+
+    def _predict_masks(self, session, images: List[Image.Image]) -> List[Image.Image]:
+        """
+        U-2-Net masks for several images from one stacked inference
+
+        Mirrors U2netSession.predict per image. Models exported with a fixed
+        batch size of 1 reject the stacked tensor; batching is then turned
+        off and images are predicted one by one.
+        """
+
+        if not self._batching or len(images) == 1:
+            return [session.predict(image)[0] for image in images]
+
+        inputs = [session.normalize(image, U2NET_MEAN, U2NET_STD, U2NET_SIZE) for image in images]
+        input_name = next(iter(inputs[0]))
+
+        try:
+            outputs = session.inner_session.run(
+                None, {input_name: np.concatenate([item[input_name] for item in inputs])}
+            )
+        except Exception as e:
+            logger.warning("%s does not accept batched input, predicting per image: %s", self.model_name, e)
+            self._batching = False
+            return [session.predict(image)[0] for image in images]
+
+        masks = []
+        for image, pred in zip(images, outputs[0][:, 0, :, :]):
+            pred = (pred - np.min(pred)) / (np.max(pred) - np.min(pred))
+            mask = Image.fromarray((pred * 255).astype('uint8'), mode='L')
+            masks.append(mask.resize(image.size, Image.LANCZOS))
+
+        return masks
+
+    def remove_images(self, images: List[Image.Image]) -> List[Image.Image]:
+        """Remove the backgrounds of several images with one session checkout"""
+
+        images = [fix_image_orientation(image) for image in images]
+
+        session = self._acquire()
+        started = time.perf_counter()
+        try:
+            masks = self._predict_masks(session, images)
+        finally:
+            self._release(session)
+            elapsed = time.perf_counter() - started
+            self._latencies.extend([elapsed / max(1, len(images))] * len(images))
+            REMBG_INFERENCE_SECONDS.labels(mode='batch').observe(elapsed)
+
+        return [naive_cutout(image, mask) for image, mask in zip(images, masks)]
+
+    def _record(self, job_id: str, result: dict):
+        with self._lock:
+            self.in_flight -= 1
+            if result['success']:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+
+            job['results'].append(result)
+            job['processed'] += 1
+            job['failed'] += 0 if result['success'] else 1
+
+            if job['processed'] == job['total']:
+                job['status'] = 'completed'
+                job['finished_at'] = datetime.now().isoformat()
+
+    def _run_batch(self, job_id: str, batch: List[Tuple[int, str, str]]):
+        with self._lock:
+            if job_id in self._jobs and self._jobs[job_id]['status'] == 'queued':
+                self._jobs[job_id]['status'] = 'running'
+
+        loaded = []
+        for index, image_path, output_path in batch:
+            if self._cached(output_path):
+                self._record(job_id, {'index': index, 'image_path': image_path,
+                                      'success': True, 'output_path': output_path, 'cached': True})
+                continue
+
+            try:
+                with Image.open(image_path) as image:
+                    image.load()
+                loaded.append((index, image_path, output_path, image))
+            except Exception as e:
+                self._record(job_id, {'index': index, 'image_path': image_path, 'success': False, 'error': str(e)})
+
+        if not loaded:
+            return
+
+        try:
+            outputs = self.remove_images([image for _, _, _, image in loaded])
+        except Exception as e:
+            outputs = [e] * len(loaded)
+
+        for (index, image_path, output_path, _), output in zip(loaded, outputs):
+            result = {'index': index, 'image_path': image_path}
+            try:
+                if isinstance(output, Exception):
+                    raise output
+                self._save(output, output_path)
+                result.update({'success': True, 'output_path': output_path})
+            except Exception as e:
+                result.update({'success': False, 'error': str(e)})
+
+            self._record(job_id, result)
+
+    def submit_batch(self, items: List[Tuple[str, str]]) -> str:
+        """
+        Queue background removal for many images
+
+        Args:
+            items: (image_path, output_path) pairs
+
+        Returns:
+            job id to poll with get_job
+        """
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'status': 'queued' if items else 'completed',
+            'total': len(items),
+            'processed': 0,
+            'failed': 0,
+            'results': [],
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None if items else datetime.now().isoformat(),
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self.in_flight += len(items)
+
+            # Forget the oldest finished jobs
+            for old_id in list(self._jobs):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._jobs[old_id]['status'] == 'completed':
+                    del self._jobs[old_id]
+
+        indexed = [(index, image_path, output_path) for index, (image_path, output_path) in enumerate(items)]
+        for start in range(0, len(indexed), self.batch_size):
+            self._pool.submit(self._run_batch, job_id, indexed[start:start + self.batch_size])
+
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Snapshot of a batch job's progress and per-image results"""
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+
+            return {
+                **job,
+                'results': sorted(job['results'], key=lambda result: result['index']),
+            }
@@ -0,0 +1,124 @@
+"""
+Batch Compliance Validation for Tesco Creative Studio
+Fans creatives out to a pool of ComplianceEngine worker processes
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from services.compliance_rules import ComplianceEngine
+
+
+# Engine owned by each worker process, created by the pool initializer
+_worker_engine: Optional[ComplianceEngine] = None
+
+
+def summarise_result(result: dict, partial: bool = False) -> dict:
+    """
+    Shape an engine result like ComplianceCheckResponse
+
+    Args:
+        result: Output of validate_all, or of validate_realtime when partial
+        partial: Result only covers a subset of rule types
+    """
+
+    if partial:
+        return {
+            'is_compliant': len(result['errors']) == 0,
+            'compliance_score': 100.0 if len(result['errors']) == 0 else 50.0,
+            'total_rules': len(result['errors']) + len(result['warnings']),
+            'passed_rules': len(result['warnings']),
+            'errors': result['errors'],
+            'warnings': result['warnings'],
+        }
+
+    return {
+        'is_compliant': result['is_compliant'],
+        'compliance_score': result['compliance_score'],
+        'total_rules': result['total_rules'],
+        'passed_rules': result['passed_rules'],
+        'errors': result['errors'],
+        'warnings': result['warnings'],
+    }
+
+
+def _init_worker(cache_size: int):
+    global _worker_engine
+    _worker_engine = ComplianceEngine(cache_size=cache_size)
+
+
+def _validate_chunk(items: List[Tuple[int, dict]], rule_types: Optional[List[str]]) -> List[dict]:
+    """Validate a chunk of (index, creative_data) pairs inside a worker process"""
+
+    results = []
+
+    for index, creative_data in items:
+        try:
+            if rule_types:
+                result = _worker_engine.validate_realtime(creative_data, rule_types)
+            else:
+                result = _worker_engine.validate_all(creative_data)
+
+            results.append({'index': index, **summarise_result(result, partial=bool(rule_types))})
+
+        except Exception as e:
+            results.append({'index': index, 'error': str(e)})
+
+    return results
+
+
+class BatchValidator:
+    """Process pool of compliance engines for validating many creatives at once"""
+
+    def __init__(self, max_workers: int = 0, chunk_size: int = 25, cache_size: int = 1024):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.cache_size = cache_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn rather than fork: the server process runs an event loop and threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.cache_size,),
+            )
+        return self._pool
+
+    async def stream(self, creatives: List[dict], rule_types: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """
+        Validate creatives across the pool
+
+        Yields one NDJSON line per creative as soon as its chunk completes,
+        so results arrive out of order and carry the creative's index.
+        """
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        indexed = list(enumerate(creatives))
+        futures = [
+            loop.run_in_executor(pool, _validate_chunk, indexed[start:start + self.chunk_size], rule_types)
+            for start in range(0, len(indexed), self.chunk_size)
+        ]
+
+        try:
+            for future in asyncio.as_completed(futures):
+                for result in await future:
+                    yield json.dumps(result) + '\n'
+        finally:
+            # Client went away: don't keep queued chunks running
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
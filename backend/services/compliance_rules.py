@@ -3,15 +3,38 @@ Compliance Rules Engine for Tesco Creative Studio
 Implements all 18 validation rules from Appendix B
 """
 
+import hashlib
+import logging
 import re
-from typing import Dict, List, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from PIL import Image
 import numpy as np
 
+from services.copy_scanner import COPY_FIELDS, CopyScanner, CopyScanResult
+from services.geometry import ElementGeometry, rect_gap
+from services.validation_cache import ValidationResultCache
+from utils.metrics import COMPLIANCE_RULE_SECONDS
+
+logger = logging.getLogger(__name__)
+# Per-element detail, sampled (see utils.log)
+element_logger = logging.getLogger(__name__ + '.elements')
+
+# Bump when rule logic changes in a way the rule fingerprint can't see
+RULESET_VERSION = "1.0"
+
+# Marks a field that is absent from creative data (as opposed to None)
+_MISSING = object()
+
 
 class ComplianceRule:
     """Base class for compliance rules"""
 
+    # Fields of CreativeData read by the rule. 'elements.<attr>' names a
+    # per-element attribute. None means the rule may read anything.
+    inputs: Optional[Tuple[str, ...]] = None
+
     def __init__(self, name: str, rule_type: str, strictness: str, description: str):
         self.name = name
         self.rule_type = rule_type
@@ -25,12 +48,94 @@ class ComplianceRule:
         """
         raise NotImplementedError
 
+    def check(self, context: 'ValidationContext') -> Tuple[bool, str]:
+        """
+        Validate the rule using state shared across a single engine run
+        Returns: (is_valid, error_message)
+        """
+        return self.validate(context.creative_data)
+
+
+class CopyRule(ComplianceRule):
+    """Base class for copy rules that reject a fixed vocabulary"""
+
+    # Copy fields read by the rule (prefix of COPY_FIELDS)
+    copy_fields = COPY_FIELDS
+
+    # Match vocabulary as plain substrings instead of regex patterns
+    literal = False
+
+    # Scanner used when the rule is validated on its own
+    _scanner = None
+
+    @property
+    def inputs(self) -> Tuple[str, ...]:
+        return self.copy_fields
+
+    def vocabulary(self) -> List[str]:
+        """Prohibited words/patterns in reporting order"""
+        return self.prohibited_words if self.literal else self.prohibited_patterns
+
+    def register(self, scanner: CopyScanner):
+        """Add this rule's vocabulary to a shared copy scanner"""
+        scanner.register(self.name, self.vocabulary(), self.copy_fields, literal=self.literal)
+
+    def hit_message(self, pattern: str) -> str:
+        """Error message for a matched word/pattern"""
+        raise NotImplementedError
+
+    def evaluate(self, scan: CopyScanResult) -> Tuple[bool, str]:
+        """Turn the hits of a copy scan into this rule's verdict"""
+        hits = scan.hits_for(self.name)
+
+        if hits:
+            for pattern in self.vocabulary():
+                if pattern in hits:
+                    return False, self.hit_message(pattern)
+
+        return True, ""
+
+    def validate(self, creative_data: dict) -> Tuple[bool, str]:
+        if self._scanner is None:
+            self._scanner = CopyScanner()
+            self.register(self._scanner)
+            self._scanner.compile()
+
+        return self.evaluate(self._scanner.scan(creative_data))
+
+    def check(self, context: 'ValidationContext') -> Tuple[bool, str]:
+        return self.evaluate(context.copy_scan)
+
+
+class ValidationContext:
+    """State shared by all rules during a single engine run"""
+
+    def __init__(self, creative_data: dict, copy_scanner: Optional[CopyScanner] = None):
+        self.creative_data = creative_data
+        self._copy_scanner = copy_scanner
+        self._copy_scan = None
+        self._geometry = None
+
+    @property
+    def copy_scan(self) -> CopyScanResult:
+        """Result of scanning the copy once for every registered copy rule"""
+        if self._copy_scan is None:
+            self._copy_scan = self._copy_scanner.scan(self.creative_data)
+        return self._copy_scan
+
+    @property
+    def geometry(self) -> ElementGeometry:
+        """Vectorised element bounds, built once for all geometric rules"""
+        if self._geometry is None:
+            self._geometry = ElementGeometry.from_creative(self.creative_data)
+        return self._geometry
+
 
 # ============================================================================
 # COPY VALIDATION RULES
 # ============================================================================
 
-class NoTCsRule(ComplianceRule):
+class NoTCsRule(CopyRule):
     """Rule 1: No T&Cs allowed"""
 
     def __init__(self):
@@ -50,25 +155,15 @@ class NoTCsRule(ComplianceRule):
             r'restrictions?\s+apply',
         ]
 
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-            creative_data.get('body_text') or '',
-        ]
-
-        combined_text = ' '.join(text_elements).lower()
-
-        for pattern in self.prohibited_patterns:
-            if re.search(pattern, combined_text, re.IGNORECASE):
-                return False, f"Prohibited T&C text detected: '{pattern}'"
-
-        return True, ""
+    def hit_message(self, pattern: str) -> str:
+        return f"Prohibited T&C text detected: '{pattern}'"
 
 
-class NoCompetitionsRule(ComplianceRule):
+class NoCompetitionsRule(CopyRule):
     """Rule 2: No competitions allowed"""
 
+    literal = True
+
     def __init__(self):
         super().__init__(
             name="No Competitions",
@@ -82,25 +177,15 @@ class NoCompetitionsRule(ComplianceRule):
             'free entry', 'winner'
         ]
 
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-            creative_data.get('body_text') or '',
-        ]
+    def hit_message(self, word: str) -> str:
+        return f"Competition keyword detected: '{word}'"
 
-        combined_text = ' '.join(text_elements).lower()
 
-        for word in self.prohibited_words:
-            if word in combined_text:
-                return False, f"Competition keyword detected: '{word}'"
-
-        return True, ""
-
-
-class NoSustainabilityClaimsRule(ComplianceRule):
+class NoSustainabilityClaimsRule(CopyRule):
     """Rule 3: No sustainability/green claims"""
 
+    literal = True
+
     def __init__(self):
         super().__init__(
             name="No Sustainability Claims",
@@ -116,25 +201,15 @@ class NoSustainabilityClaimsRule(ComplianceRule):
             'planet-friendly', 'earth-friendly', 'renewable'
         ]
 
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-            creative_data.get('body_text') or '',
-        ]
-
-        combined_text = ' '.join(text_elements).lower()
+    def hit_message(self, word: str) -> str:
+        return f"Sustainability claim detected: '{word}'"
 
-        for word in self.prohibited_words:
-            if word in combined_text:
-                return False, f"Sustainability claim detected: '{word}'"
 
-        return True, ""
-
-
-class NoCharityPartnershipsRule(ComplianceRule):
+class NoCharityPartnershipsRule(CopyRule):
     """Rule 4: No charity partnerships"""
 
+    literal = True
+
     def __init__(self):
         super().__init__(
             name="No Charity Partnerships",
@@ -148,25 +223,16 @@ class NoCharityPartnershipsRule(ComplianceRule):
             'social cause', 'non-profit', 'nonprofit'
         ]
 
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-            creative_data.get('body_text') or '',
-        ]
-
-        combined_text = ' '.join(text_elements).lower()
-
-        for word in self.prohibited_words:
-            if word in combined_text:
-                return False, f"Charity partnership text detected: '{word}'"
-
-        return True, ""
+    def hit_message(self, word: str) -> str:
+        return f"Charity partnership text detected: '{word}'"
 
 
-class NoPriceCallOutsRule(ComplianceRule):
+class NoPriceCallOutsRule(CopyRule):
     """Rule 5: No price call-outs in copy"""
 
+    # Note: Value tiles can contain prices, but headline/subhead cannot
+    copy_fields = ('headline', 'subhead')
+
     def __init__(self):
         super().__init__(
             name="No Price Call-Outs",
@@ -194,25 +260,15 @@ class NoPriceCallOutsRule(ComplianceRule):
             r'rrp',
         ]
 
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        # Note: Value tiles can contain prices, but headline/subhead cannot
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-        ]
-
-        combined_text = ' '.join(text_elements).lower()
-
-        for pattern in self.prohibited_patterns:
-            if re.search(pattern, combined_text, re.IGNORECASE):
-                return False, f"Price call-out detected in copy: '{pattern}'"
-
-        return True, ""
+    def hit_message(self, pattern: str) -> str:
+        return f"Price call-out detected in copy: '{pattern}'"
 
 
-class NoMoneyBackGuaranteesRule(ComplianceRule):
+class NoMoneyBackGuaranteesRule(CopyRule):
     """Rule 6: No money-back guarantees"""
 
+    literal = True
+
     def __init__(self):
         super().__init__(
             name="No Money-Back Guarantees",
@@ -226,25 +282,15 @@ class NoMoneyBackGuaranteesRule(ComplianceRule):
             'risk-free', 'no questions asked'
         ]
 
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-            creative_data.get('body_text') or '',
-        ]
-
-        combined_text = ' '.join(text_elements).lower()
+    def hit_message(self, word: str) -> str:
+        return f"Money-back guarantee text detected: '{word}'"
 
-        for word in self.prohibited_words:
-            if word in combined_text:
-                return False, f"Money-back guarantee text detected: '{word}'"
 
-        return True, ""
-
-
-class NoClaimsRule(ComplianceRule):
+class NoClaimsRule(CopyRule):
     """Rule 7: No claims with asterisks or surveys"""
 
+    copy_fields = ('headline', 'subhead')
+
     def __init__(self):
         super().__init__(
             name="No Claims",
@@ -252,35 +298,25 @@ class NoClaimsRule(ComplianceRule):
             strictness="hard_fail",
             description="No claims with asterisks or survey references"
         )
-
-    def validate(self, creative_data: dict) -> Tuple[bool, str]:
-        text_elements = [
-            creative_data.get('headline') or '',
-            creative_data.get('subhead') or '',
-        ]
-
-        combined_text = ' '.join(text_elements)
-
-        # Check for asterisks (claims)
-        if '*' in combined_text:
-            return False, "Asterisk detected - claims not allowed"
-
-        # Check for survey references
-        survey_patterns = [
+        self.prohibited_patterns = [
+            # Asterisks (claims) are checked first
+            r'\*',
+            # Survey references
             r'survey', r'study', r'research', r'tested',
             r'\d+%\s+of', r'clinical', r'proven', r'scientifically'
         ]
 
-        for pattern in survey_patterns:
-            if re.search(pattern, combined_text, re.IGNORECASE):
-                return False, f"Survey/claim reference detected: '{pattern}'"
-
-        return True, ""
+    def hit_message(self, pattern: str) -> str:
+        if pattern == r'\*':
+            return "Asterisk detected - claims not allowed"
+        return f"Survey/claim reference detected: '{pattern}'"
 
 
 class TescoTagsRule(ComplianceRule):
     """Rule 8: Only approved Tesco tags"""
 
+    inputs = ('tag_text', 'value_tile_type')
+
     def __init__(self):
         super().__init__(
             name="Tesco Tags",
@@ -319,6 +355,19 @@ class TescoTagsRule(ComplianceRule):
         return True, ""
 
 
+def copy_rules() -> List[CopyRule]:
+    """Fresh instances of the vocabulary-based copy rules (1-7)"""
+    return [
+        NoTCsRule(),
+        NoCompetitionsRule(),
+        NoSustainabilityClaimsRule(),
+        NoCharityPartnershipsRule(),
+        NoPriceCallOutsRule(),
+        NoMoneyBackGuaranteesRule(),
+        NoClaimsRule(),
+    ]
+
+
 # ============================================================================
 # DESIGN VALIDATION RULES
 # ============================================================================
@@ -326,6 +375,9 @@ class TescoTagsRule(ComplianceRule):
 class ValueTileRule(ComplianceRule):
     """Rule 9: Value tile validation"""
 
+    inputs = ('value_tile', 'format', 'elements.id', 'elements.x', 'elements.y',
+              'elements.width', 'elements.height')
+
     def __init__(self):
         super().__init__(
             name="Value Tile",
@@ -335,6 +387,10 @@ class ValueTileRule(ComplianceRule):
         )
 
     def validate(self, creative_data: dict) -> Tuple[bool, str]:
+        return self.check(ValidationContext(creative_data))
+
+    def check(self, context: ValidationContext) -> Tuple[bool, str]:
+        creative_data = context.creative_data
         value_tile = creative_data.get('value_tile')
 
         if not value_tile:
@@ -353,16 +409,10 @@ class ValueTileRule(ComplianceRule):
             return False, "Value tile position cannot be modified"
 
         # Check for overlays
-        elements = creative_data.get('elements', [])
-        tile_bounds = self._get_bounds(value_tile)
-
-        for element in elements:
-            if element.get('id') == value_tile.get('id'):
-                continue
+        tile_bounds = ElementGeometry.bounds_of(value_tile)
 
-            element_bounds = self._get_bounds(element)
-            if self._check_overlap(tile_bounds, element_bounds):
-                return False, "Content cannot overlay value tile"
+        if context.geometry.overlaps(tile_bounds, exclude_id=value_tile.get('id')).any():
+            return False, "Content cannot overlay value tile"
 
         return True, ""
 
@@ -375,26 +425,12 @@ class ValueTileRule(ComplianceRule):
         }
         return positions.get(format_type, {'x': 20, 'y': 20})
 
-    def _get_bounds(self, element):
-        return {
-            'x': element.get('x', 0),
-            'y': element.get('y', 0),
-            'width': element.get('width', 0),
-            'height': element.get('height', 0),
-        }
-
-    def _check_overlap(self, bounds1, bounds2):
-        return not (
-                bounds1['x'] + bounds1['width'] < bounds2['x'] or
-                bounds2['x'] + bounds2['width'] < bounds1['x'] or
-                bounds1['y'] + bounds1['height'] < bounds2['y'] or
-                bounds2['y'] + bounds2['height'] < bounds1['y']
-        )
-
 
 class CTARule(ComplianceRule):
     """Rule 10: CTA validation"""
 
+    inputs = ('cta',)
+
     def __init__(self):
         super().__init__(
             name="CTA",
@@ -416,6 +452,9 @@ class CTARule(ComplianceRule):
 class TescoTagPositionRule(ComplianceRule):
     """Rule 11: Tesco tag position validation"""
 
+    inputs = ('tag', 'canvas_height', 'elements.id', 'elements.x', 'elements.y',
+              'elements.width', 'elements.height')
+
     def __init__(self):
         super().__init__(
             name="Tesco Tag Position",
@@ -425,6 +464,10 @@ class TescoTagPositionRule(ComplianceRule):
         )
 
     def validate(self, creative_data: dict) -> Tuple[bool, str]:
+        return self.check(ValidationContext(creative_data))
+
+    def check(self, context: ValidationContext) -> Tuple[bool, str]:
+        creative_data = context.creative_data
         tag = creative_data.get('tag')
 
         if not tag:
@@ -441,7 +484,6 @@ class TescoTagPositionRule(ComplianceRule):
             return False, "Tesco tag must be positioned at bottom of creative"
 
         # Check for overlays
-        elements = creative_data.get('elements', [])
         tag_bounds = {
             'x': position.get('x', 0),
             'y': position.get('y', 0),
@@ -449,30 +491,11 @@ class TescoTagPositionRule(ComplianceRule):
             'height': tag.get('height', 0),
         }
 
-        for element in elements:
-            if element.get('id') == tag.get('id'):
-                continue
-
-            element_bounds = {
-                'x': element.get('x', 0),
-                'y': element.get('y', 0),
-                'width': element.get('width', 0),
-                'height': element.get('height', 0),
-            }
-
-            if self._check_overlap(tag_bounds, element_bounds):
-                return False, "Content cannot overlay Tesco tag"
+        if context.geometry.overlaps(tag_bounds, exclude_id=tag.get('id')).any():
+            return False, "Content cannot overlay Tesco tag"
 
         return True, ""
 
-    def _check_overlap(self, bounds1, bounds2):
-        return not (
-                bounds1['x'] + bounds1['width'] < bounds2['x'] or
-                bounds2['x'] + bounds2['width'] < bounds1['x'] or
-                bounds1['y'] + bounds1['height'] < bounds2['y'] or
-                bounds2['y'] + bounds2['height'] < bounds1['y']
-        )
-
 
 # ============================================================================
 # FORMAT VALIDATION RULES
@@ -481,6 +504,8 @@ class TescoTagPositionRule(ComplianceRule):
 class SocialSafeZoneRule(ComplianceRule):
     """Rule 12: 9:16 safe zone validation"""
 
+    inputs = ('format', 'canvas_height', 'elements.id', 'elements.y', 'elements.height')
+
     def __init__(self):
         super().__init__(
             name="Social Safe Zone",
@@ -490,6 +515,10 @@ class SocialSafeZoneRule(ComplianceRule):
         )
 
     def validate(self, creative_data: dict) -> Tuple[bool, str]:
+        return self.check(ValidationContext(creative_data))
+
+    def check(self, context: ValidationContext) -> Tuple[bool, str]:
+        creative_data = context.creative_data
         format_type = creative_data.get('format')
 
         # Only applies to 9:16 (Stories format)
@@ -500,25 +529,20 @@ class SocialSafeZoneRule(ComplianceRule):
         top_safe_zone = 200
         bottom_safe_zone = 250
 
-        elements = creative_data.get('elements', [])
-
-        for element in elements:
-            element_type = element.get('type')
+        geometry = context.geometry
+        in_top_zone = geometry.y < top_safe_zone
+        in_bottom_zone = geometry.bottom > (canvas_height - bottom_safe_zone)
 
-            # Check if element violates safe zones
-            y = element.get('y', 0)
-            height = element.get('height', 0)
-            element_bottom = y + height
-
-            # Check top safe zone
-            if y < top_safe_zone:
-                return False, f"Element '{element.get('id')}' violates top safe zone (200px)"
+        # Report the first element (in element order) violating either zone
+        idx = geometry.first(in_top_zone | in_bottom_zone)
+        if idx is None:
+            return True, ""
 
-            # Check bottom safe zone
-            if element_bottom > (canvas_height - bottom_safe_zone):
-                return False, f"Element '{element.get('id')}' violates bottom safe zone (250px)"
+        element_id = geometry.ids[idx]
+        if in_top_zone[idx]:
+            return False, f"Element '{element_id}' violates top safe zone (200px)"
 
-        return True, ""
+        return False, f"Element '{element_id}' violates bottom safe zone (250px)"
 
 
 # ============================================================================
@@ -528,6 +552,8 @@ class SocialSafeZoneRule(ComplianceRule):
 class MinimumFontSizeRule(ComplianceRule):
     """Rule 13: Minimum font size validation"""
 
+    inputs = ('format', 'elements.type', 'elements.fontSize')
+
     def __init__(self):
         super().__init__(
             name="Minimum Font Size",
@@ -566,6 +592,8 @@ class MinimumFontSizeRule(ComplianceRule):
 class ContrastRule(ComplianceRule):
     """Rule 14: WCAG AA contrast validation"""
 
+    inputs = ('background_color', 'elements.type', 'elements.fill', 'elements.fontSize')
+
     def __init__(self):
         super().__init__(
             name="Contrast",
@@ -627,6 +655,8 @@ class ContrastRule(ComplianceRule):
 class PhotographyOfPeopleRule(ComplianceRule):
     """Rule 15: Photography of people warning"""
 
+    inputs = ('has_people_in_images', 'people_confirmed')
+
     def __init__(self):
         super().__init__(
             name="Photography of People",
@@ -654,6 +684,9 @@ class PhotographyOfPeopleRule(ComplianceRule):
 class DrinkawareRule(ComplianceRule):
     """Rule 16: Drinkaware lock-up validation"""
 
+    inputs = ('is_alcohol_campaign', 'format', 'background_color', 'elements.type',
+              'elements.height', 'elements.color')
+
     def __init__(self):
         super().__init__(
             name="Drinkaware",
@@ -711,6 +744,8 @@ class DrinkawareRule(ComplianceRule):
 class PackshotPositioningRule(ComplianceRule):
     """Rule 17: Packshot positioning validation"""
 
+    inputs = ('elements.type',)
+
     def __init__(self):
         super().__init__(
             name="Packshot Positioning",
@@ -725,20 +760,16 @@ class PackshotPositioningRule(ComplianceRule):
 
         elements = creative_data.get('elements', [])
         if not isinstance(elements, list):
-            print(f"⚠️ Elements is not a list: {type(elements)}")
+            logger.warning("Elements is not a list: %s", type(elements).__name__)
             return True, ""  # Skip validation if elements is malformed
 
-        print(f"🔍 PackshotPositioningRule: Checking {len(elements)} elements")
-        for idx, elem in enumerate(elements):
-            if isinstance(elem, dict):
-                print(f"  Element {idx + 1}: type='{elem.get('type')}'")
-            else:
-                print(f"  Element {idx + 1}: Invalid type {type(elem)}")
-
         # Accept both 'packshot' and 'image' types as product images
         packshots = [e for e in elements if isinstance(e, dict) and e.get('type') in ['packshot', 'image']]
 
-        print(f"  Found {len(packshots)} packshots/images")
+        element_logger.debug(
+            "PackshotPositioningRule",
+            extra={'elements': len(elements), 'packshots': len(packshots)}
+        )
 
         # Make packshot optional for empty canvases
         if len(elements) == 0:
@@ -750,13 +781,15 @@ class PackshotPositioningRule(ComplianceRule):
         if len(packshots) > 3:
             return False, "Maximum of 3 packshots allowed"
 
-        print(f"  ✅ Packshot validation passed")
         return True, ""
 
 
 class PackshotSafeZoneRule(ComplianceRule):
     """Rule 18: Packshot safe zone validation"""
 
+    inputs = ('cta', 'format', 'elements.type', 'elements.x', 'elements.y',
+              'elements.width', 'elements.height')
+
     def __init__(self):
         super().__init__(
             name="Packshot Safe Zone",
@@ -766,9 +799,13 @@ class PackshotSafeZoneRule(ComplianceRule):
         )
 
     def validate(self, creative_data: dict) -> Tuple[bool, str]:
+        return self.check(ValidationContext(creative_data))
+
+    def check(self, context: ValidationContext) -> Tuple[bool, str]:
         # Per Appendix A: No CTA is used
         # This rule may not apply for social media formats
 
+        creative_data = context.creative_data
         cta = creative_data.get('cta')
         if not cta:
             return True, ""  # No CTA, rule doesn't apply
@@ -784,53 +821,17 @@ class PackshotSafeZoneRule(ComplianceRule):
 
         min_gap = min_gaps.get(format_type, 24)
 
-        packshots = [e for e in creative_data.get('elements', []) if e.get('type') in ['packshot', 'image']]
-        cta_bounds = {
-            'x': cta.get('x', 0),
-            'y': cta.get('y', 0),
-            'width': cta.get('width', 0),
-            'height': cta.get('height', 0),
-        }
-
-        for packshot in packshots:
-            packshot_bounds = {
-                'x': packshot.get('x', 0),
-                'y': packshot.get('y', 0),
-                'width': packshot.get('width', 0),
-                'height': packshot.get('height', 0),
-            }
-
-            gap = self._calculate_gap(packshot_bounds, cta_bounds)
+        geometry = context.geometry
+        cta_bounds = ElementGeometry.bounds_of(cta)
+        is_packshot = geometry.type_mask(['packshot', 'image'])
 
-            if gap < min_gap:
-                return False, f"Packshot must have minimum {min_gap}px gap from CTA (current: {gap}px)"
-
-        return True, ""
-
-    def _calculate_gap(self, bounds1, bounds2) -> float:
-        """Calculate minimum gap between two rectangles"""
-
-        # Horizontal gap
-        if bounds1['x'] + bounds1['width'] <= bounds2['x']:
-            h_gap = bounds2['x'] - (bounds1['x'] + bounds1['width'])
-        elif bounds2['x'] + bounds2['width'] <= bounds1['x']:
-            h_gap = bounds1['x'] - (bounds2['x'] + bounds2['width'])
-        else:
-            h_gap = 0
-
-        # Vertical gap
-        if bounds1['y'] + bounds1['height'] <= bounds2['y']:
-            v_gap = bounds2['y'] - (bounds1['y'] + bounds1['height'])
-        elif bounds2['y'] + bounds2['height'] <= bounds1['y']:
-            v_gap = bounds1['y'] - (bounds2['y'] + bounds2['height'])
-        else:
-            v_gap = 0
+        idx = geometry.first(is_packshot & (geometry.gaps(cta_bounds) < min_gap))
+        if idx is None:
+            return True, ""
 
-        # Return minimum gap (considering both directions)
-        if h_gap > 0 and v_gap > 0:
-            return min(h_gap, v_gap)
-        else:
-            return max(h_gap, v_gap)
+        # Recompute the offending gap exactly so the message keeps its number format
+        gap = rect_gap(ElementGeometry.bounds_of(geometry.elements[idx]), cta_bounds)
+        return False, f"Packshot must have minimum {min_gap}px gap from CTA (current: {gap}px)"
 
 
 # ============================================================================
@@ -840,16 +841,10 @@ class PackshotSafeZoneRule(ComplianceRule):
 class ComplianceEngine:
     """Main compliance validation engine"""
 
-    def __init__(self):
+    def __init__(self, max_sessions: int = 1000, cache_size: int = 1024):
         self.rules = [
             # Copy rules (1-8)
-            NoTCsRule(),
-            NoCompetitionsRule(),
-            NoSustainabilityClaimsRule(),
-            NoCharityPartnershipsRule(),
-            NoPriceCallOutsRule(),
-            NoMoneyBackGuaranteesRule(),
-            NoClaimsRule(),
+            *copy_rules(),
             TescoTagsRule(),
 
             # Design rules (9-11)
@@ -875,10 +870,130 @@ class ComplianceEngine:
             PackshotSafeZoneRule(),
         ]
 
-    def validate_all(self, creative_data: dict) -> Dict[str, any]:
+        # One compiled scanner covering every copy rule vocabulary
+        self.copy_scanner = CopyScanner()
+        for rule in self.rules:
+            if isinstance(rule, CopyRule):
+                rule.register(self.copy_scanner)
+        self.copy_scanner.compile()
+
+        # Last verdict per session and rule, used for incremental validation
+        self.max_sessions = max_sessions
+        self._sessions: 'OrderedDict[str, Dict[str, tuple]]' = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._rule_inputs = {rule.name: self._split_inputs(rule.inputs) for rule in self.rules}
+
+        # Results of previously seen creatives, keyed by content hash
+        self.ruleset_version = self._ruleset_fingerprint()
+        self.result_cache = ValidationResultCache(max_entries=cache_size)
+
+    def _ruleset_fingerprint(self) -> str:
+        """Version string that changes whenever the configured rules change"""
+
+        description = [
+            (type(rule).__name__, rule.name, rule.strictness, rule.rule_type,
+             rule.vocabulary() if isinstance(rule, CopyRule) else None)
+            for rule in self.rules
+        ]
+        digest = hashlib.sha256(repr(description).encode('utf-8')).hexdigest()
+        return f"{RULESET_VERSION}-{digest[:12]}"
+
+    @staticmethod
+    def _split_inputs(inputs: Optional[Tuple[str, ...]]):
+        """Split rule inputs into (top-level fields, element attributes)"""
+
+        if inputs is None:
+            return None
+
+        fields = tuple(spec for spec in inputs if not spec.startswith('elements.'))
+        element_attrs = tuple(spec[len('elements.'):] for spec in inputs if spec.startswith('elements.'))
+        return fields, element_attrs
+
+    def _snapshot_inputs(self, rule: ComplianceRule, creative_data: dict):
+        """Project creative data onto the fields a rule reads"""
+
+        split = self._rule_inputs[rule.name]
+        if split is None:
+            return None
+
+        fields, element_attrs = split
+        snapshot = [creative_data.get(field, _MISSING) for field in fields]
+
+        if element_attrs:
+            elements = creative_data.get('elements', _MISSING)
+            if isinstance(elements, list):
+                snapshot.append([
+                    tuple(element.get(attr, _MISSING) for attr in element_attrs)
+                    if isinstance(element, dict) else element
+                    for element in elements
+                ])
+            else:
+                snapshot.append(elements)
+
+        return snapshot
+
+    @staticmethod
+    def _check(rule: ComplianceRule, context: ValidationContext) -> Tuple[bool, str]:
+        with COMPLIANCE_RULE_SECONDS.labels(rule=rule.name).time():
+            return rule.check(context)
+
+    def _run_rules(self, rules: List[ComplianceRule], creative_data: dict,
+                   session_id: Optional[str] = None) -> List[Tuple[ComplianceRule, bool, str]]:
+        """
+        Run rules against creative data
+
+        With a session_id, rules whose inputs are unchanged since the previous
+        call for that session reuse their last verdict instead of re-running.
+        """
+
+        context = ValidationContext(creative_data, self.copy_scanner)
+
+        if session_id is None:
+            return [(rule, *self._check(rule, context)) for rule in rules]
+
+        with self._sessions_lock:
+            previous = self._sessions.get(session_id, {})
+
+        current = dict(previous)
+        results = []
+
+        for rule in rules:
+            snapshot = self._snapshot_inputs(rule, creative_data)
+            cached = previous.get(rule.name)
+
+            if snapshot is not None and cached is not None and cached[0] == snapshot:
+                verdict = cached[1]
+            else:
+                verdict = self._check(rule, context)
+                current[rule.name] = (snapshot, verdict)
+
+            results.append((rule, *verdict))
+
+        with self._sessions_lock:
+            self._sessions[session_id] = current
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+        return results
+
+    @staticmethod
+    def _issue(rule: ComplianceRule, error_message: str) -> dict:
+        return {
+            'rule': rule.name,
+            'message': error_message,
+            'severity': rule.strictness,
+            'type': rule.rule_type,
+        }
+
+    def validate_all(self, creative_data: dict, session_id: Optional[str] = None) -> Dict[str, any]:
         """
         Validate creative against all rules
-        
+
+        Args:
+            creative_data: Current creative state
+            session_id: Optional editor session/creative id for incremental validation
+
         Returns:
         {
             'is_compliant': bool,
@@ -888,23 +1003,21 @@ class ComplianceEngine:
         }
         """
 
+        cache_key = self.result_cache.make_key(creative_data, self.ruleset_version, 'all')
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         errors = []
         warnings = []
         total_rules = len(self.rules)
         passed_rules = 0
 
-        for rule in self.rules:
-            is_valid, error_message = rule.validate(creative_data)
-
+        for rule, is_valid, error_message in self._run_rules(self.rules, creative_data, session_id):
             if is_valid:
                 passed_rules += 1
             else:
-                issue = {
-                    'rule': rule.name,
-                    'message': error_message,
-                    'severity': rule.strictness,
-                    'type': rule.rule_type,
-                }
+                issue = self._issue(rule, error_message)
 
                 if rule.strictness == 'hard_fail':
                     errors.append(issue)
@@ -915,7 +1028,7 @@ class ComplianceEngine:
         compliance_score = (passed_rules / total_rules) * 100
         is_compliant = len(errors) == 0
 
-        return {
+        result = {
             'is_compliant': is_compliant,
             'compliance_score': round(compliance_score, 1),
             'total_rules': total_rules,
@@ -924,15 +1037,25 @@ class ComplianceEngine:
             'warnings': warnings,
         }
 
-    def validate_realtime(self, creative_data: dict, rule_types: List[str] = None) -> Dict[str, any]:
+        self.result_cache.put(cache_key, result)
+        return result
+
+    def validate_realtime(self, creative_data: dict, rule_types: List[str] = None,
+                          session_id: Optional[str] = None) -> Dict[str, any]:
         """
         Validate specific rule types for real-time feedback
         
         Args:
             creative_data: Current creative state
             rule_types: List of rule types to validate (e.g., ['copy', 'design'])
+            session_id: Optional editor session/creative id for incremental validation
         """
 
+        cache_key = self.result_cache.make_key(creative_data, self.ruleset_version, 'realtime', rule_types)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         rules_to_check = self.rules
 
         if rule_types:
@@ -941,23 +1064,19 @@ class ComplianceEngine:
         errors = []
         warnings = []
 
-        for rule in rules_to_check:
-            is_valid, error_message = rule.validate(creative_data)
-
+        for rule, is_valid, error_message in self._run_rules(rules_to_check, creative_data, session_id):
             if not is_valid:
-                issue = {
-                    'rule': rule.name,
-                    'message': error_message,
-                    'severity': rule.strictness,
-                    'type': rule.rule_type,
-                }
+                issue = self._issue(rule, error_message)
 
                 if rule.strictness == 'hard_fail':
                     errors.append(issue)
                 else:
                     warnings.append(issue)
 
-        return {
+        result = {
             'errors': errors,
             'warnings': warnings,
         }
+
+        self.result_cache.put(cache_key, result)
+        return result
@@ -0,0 +1,197 @@
+"""
+Compositor for Tesco Creative Studio
+Layer graph of a creative with cached flattened static layers
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image
+
+
+# Bump when a renderer change alters the pixels of static layers
+COMPOSITOR_VERSION = "2"
+
+
+class RenderLayer:
+    """One node of the layer graph: the background or a single element"""
+
+    __slots__ = ('kind', 'element', 'static', 'key')
+
+    def __init__(self, kind: str, element: Optional[dict], static: bool, key: str):
+        self.kind = kind
+        self.element = element
+        self.static = static
+        self.key = key
+
+
+class Compositor:
+    """
+    Renders a creative as an ordered list of layers, reusing flattened prefixes
+
+    The background and the elements (by zIndex) become layers, each keyed by
+    a hash of its content; image layers also hash the (path, mtime, size) of
+    their source file. Layers of STATIC_TYPES rarely change while copy is
+    being edited, so the run of static layers at the bottom of the stack is
+    flattened into one canvas and cached under the chained hash of those
+    layers. A later export with the same bottom run starts from a copy of
+    that canvas and only draws the layers above it.
+    """
+
+    # Element types whose layers may be flattened into the cached prefix
+    STATIC_TYPES = ('image', 'packshot', 'logo', 'shape')
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Image.Image]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.layers_reused = 0
+        self.layers_drawn = 0
+
+    @staticmethod
+    def _hash(payload) -> str:
+        data = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def build_graph(self, creative_data: dict, size: Tuple[int, int], mode: str,
+                    source_key: Callable[[str], Optional[tuple]]) -> List[RenderLayer]:
+        """
+        Layer graph of a creative rendered at `size` in `mode`
+
+        Args:
+            creative_data: Creative canvas data
+            size: Canvas (width, height)
+            mode: Canvas mode, 'RGB' or 'RGBA'
+            source_key: Maps an image src to a key identifying the file version
+        """
+
+        background_image = creative_data.get('background_image')
+        background = {
+            'canvas': [size[0], size[1], mode],
+            'color': creative_data.get('background_color', '#FFFFFF'),
+            'image': background_image,
+            'source': source_key(background_image) if background_image else None,
+        }
+        layers = [RenderLayer('background', None, True, self._hash(background))]
+
+        elements = sorted(creative_data.get('elements', []), key=lambda e: e.get('zIndex', 0))
+        for element in elements:
+            element_type = element.get('type')
+            src = element.get('src')
+            key = self._hash({
+                'element': element,
+                'source': source_key(src) if src and element_type in ('image', 'packshot', 'logo') else None,
+            })
+            layers.append(RenderLayer('element', element, element_type in self.STATIC_TYPES, key))
+
+        return layers
+
+    def _static_prefix(self, layers: List[RenderLayer]) -> Tuple[int, str]:
+        """Length and chained hash of the leading run of static layers"""
+
+        digest = hashlib.sha256(COMPOSITOR_VERSION.encode('utf-8'))
+        length = 0
+        for layer in layers:
+            if not layer.static:
+                break
+            digest.update(layer.key.encode('utf-8'))
+            length += 1
+        return length, digest.hexdigest()
+
+    @staticmethod
+    def _image_bytes(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def _lookup(self, key: str) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def _store(self, key: str, image: Image.Image):
+        size = self._image_bytes(image)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= self._image_bytes(previous)
+
+            self._entries[key] = image
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._image_bytes(evicted)
+
+    def compose(self, layers: List[RenderLayer], create_canvas: Callable[[], Image.Image],
+                draw_layer: Callable[[Image.Image, RenderLayer], None]) -> Image.Image:
+        """
+        Rasterise a layer graph
+
+        Args:
+            layers: Output of build_graph
+            create_canvas: Returns a blank canvas
+            draw_layer: Draws one layer onto the canvas in place
+
+        Returns:
+            The composited canvas, owned by the caller
+        """
+
+        prefix_length, prefix_key = self._static_prefix(layers)
+
+        snapshot = self._lookup(prefix_key)
+        if snapshot is not None:
+            # Cached canvases are shared: draw on a copy
+            canvas = snapshot.copy()
+        else:
+            canvas = create_canvas()
+            for layer in layers[:prefix_length]:
+                draw_layer(canvas, layer)
+            self._store(prefix_key, canvas.copy())
+
+        for layer in layers[prefix_length:]:
+            draw_layer(canvas, layer)
+
+        with self._lock:
+            if snapshot is not None:
+                self.layers_reused += prefix_length
+            else:
+                self.layers_drawn += prefix_length
+            self.layers_drawn += len(layers) - prefix_length
+
+        return canvas
+
+    def clear(self):
+        """Drop all cached canvases"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Cache size, hit rate and layer reuse for monitoring"""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'layers_reused': self.layers_reused,
+                'layers_drawn': self.layers_drawn,
+            }
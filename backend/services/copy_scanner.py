@@ -0,0 +1,180 @@
+"""
+Copy Scanner for Tesco Creative Studio
+Single-pass matching of every copy rule vocabulary against the creative copy
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+
+# Copy fields in the order they are joined into the scanned text. A rule may
+# only read a prefix of this list, so every scope is a prefix of the full text.
+COPY_FIELDS = ('headline', 'subhead', 'body_text')
+
+# Non-ASCII characters that case-insensitively match an ASCII letter even after
+# lower-casing. Folding them keeps the case-sensitive prefilter a superset of
+# the case-insensitive rule patterns.
+_CASE_FOLDS = str.maketrans({'ſ': 's', 'ı': 'i'})
+
+_QUANTIFIERS = '?*+{'
+
+
+class CopyScanResult:
+    """Patterns matched by a single scan, grouped by owning rule"""
+
+    def __init__(self, hits: Dict[str, Set[str]]):
+        self._hits = hits
+
+    def hits_for(self, owner: str) -> Set[str]:
+        """Return the set of pattern sources owned by `owner` that matched"""
+        return self._hits.get(owner, set())
+
+    @property
+    def owners(self) -> List[str]:
+        """Owners with at least one matching pattern"""
+        return list(self._hits.keys())
+
+    def __bool__(self) -> bool:
+        return bool(self._hits)
+
+
+class CopyScanner:
+    """
+    Compiles the vocabularies of several copy rules into one alternation regex.
+
+    Alternatives are factored by their first character, so the combined
+    pattern only descends into the handful of words that can start at each
+    position. A clean headline therefore costs a single `search`. Positions
+    where the combined pattern hits are re-checked against the individual
+    patterns, which keeps verdicts identical to running each rule separately.
+    """
+
+    def __init__(self):
+        # (owner, pattern source, compiled pattern, number of copy fields read)
+        self._entries: List[Tuple[str, str, re.Pattern, int]] = []
+        self._prefilter = None
+        self._by_first_char: Dict[str, List[int]] = {}
+        self._always_check: List[int] = []
+
+    def register(self, owner: str, patterns: Iterable[str], fields: Sequence[str],
+                 literal: bool = False):
+        """
+        Register a rule vocabulary
+
+        Args:
+            owner: Name of the rule that owns the patterns
+            patterns: Regex sources (or plain substrings when `literal` is set)
+            fields: Copy fields the rule reads, must be a prefix of COPY_FIELDS
+            literal: Match patterns as exact substrings of the lower-cased copy
+        """
+
+        if tuple(fields) != COPY_FIELDS[:len(fields)]:
+            raise ValueError(f"Copy fields must be a prefix of {COPY_FIELDS}: {fields}")
+
+        for pattern in patterns:
+            if literal:
+                compiled = re.compile(re.escape(pattern))
+            else:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            self._entries.append((owner, pattern, compiled, len(fields)))
+
+        self._prefilter = None
+
+    @staticmethod
+    def _split_first_token(source: str) -> Tuple[str, str]:
+        """Split a regex source into (first atom, rest), or ('', source) if it can't be factored"""
+
+        if source.startswith('\\'):
+            token = source[:2]
+        elif source and source[0] not in '()[]|.^$' + _QUANTIFIERS:
+            token = source[0]
+        else:
+            return '', source
+
+        rest = source[len(token):]
+        if rest[:1] and rest[0] in _QUANTIFIERS:
+            return '', source
+
+        return token, rest
+
+    def compile(self):
+        """Build the combined prefilter from all registered vocabularies"""
+
+        groups: Dict[str, List[str]] = {}
+        unfactored: List[str] = []
+        self._by_first_char = {}
+        self._always_check = []
+
+        for idx, (_, pattern, compiled, _) in enumerate(self._entries):
+            source = compiled.pattern
+            if compiled.flags & re.IGNORECASE and source != source.lower():
+                # The scanned text is lower-cased, so only lower-case sources
+                # can be matched case-sensitively
+                source = f"(?i:{source})"
+
+            token, rest = self._split_first_token(source)
+            first_char = token[-1] if token and (len(token) == 1 or not token[-1].isalnum()) else ''
+
+            if token:
+                groups.setdefault(token, []).append(rest)
+            else:
+                unfactored.append(source)
+
+            if first_char:
+                self._by_first_char.setdefault(first_char, []).append(idx)
+            else:
+                self._always_check.append(idx)
+
+        alternatives = [
+            f"{token}(?:{'|'.join(rests)})" for token, rests in groups.items()
+        ] + [f"(?:{source})" for source in unfactored]
+
+        self._prefilter = re.compile('|'.join(alternatives)) if alternatives else None
+        return self
+
+    @staticmethod
+    def normalise(creative_data: dict) -> Tuple[str, List[int]]:
+        """
+        Join and lower-case the copy fields
+
+        Returns:
+            (text, scope_ends) where scope_ends[n] is the length of the text
+            made of the first n copy fields
+        """
+
+        parts = [(creative_data.get(field) or '').lower() for field in COPY_FIELDS]
+        scope_ends = [0]
+        length = -1
+        for part in parts:
+            length += len(part) + 1
+            scope_ends.append(length)
+
+        return ' '.join(parts), scope_ends
+
+    def scan(self, creative_data: dict) -> CopyScanResult:
+        """Scan the copy once and dispatch every hit to the rule that owns it"""
+
+        if self._prefilter is None:
+            self.compile()
+        if self._prefilter is None:
+            return CopyScanResult({})
+
+        text, scope_ends = self.normalise(creative_data)
+        folded = text if text.isascii() else text.translate(_CASE_FOLDS)
+        hits: Dict[str, Set[str]] = {}
+
+        match = self._prefilter.search(folded)
+        while match:
+            pos = match.start()
+            candidates = self._by_first_char.get(folded[pos], [])
+
+            for idx in candidates + self._always_check:
+                owner, pattern, compiled, field_count = self._entries[idx]
+                scope_end = scope_ends[field_count]
+                if pos < scope_end and compiled.match(text, pos, scope_end):
+                    hits.setdefault(owner, set()).add(pattern)
+
+            # Restart one character later so overlapping words are not skipped
+            match = self._prefilter.search(folded, pos + 1)
+
+        return CopyScanResult(hits)
@@ -0,0 +1,330 @@
+"""
+Export Cache for Tesco Creative Studio
+Content-addressed store of rendered exports, so repeated exports skip rendering
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: pruning is then only serialised within a process
+    fcntl = None
+
+
+# Bump when a change to rendering or encoding alters export bytes
+EXPORT_CACHE_VERSION = "1"
+
+# Lock file held while the directory is pruned
+LOCK_NAME = '.lock'
+
+
+class ExportCache:
+    """
+    Rendered exports stored under <cache_dir>/<sha256>.<ext>
+
+    cache_dir must not be served publicly (keep it outside EXPORT_DIR); on the
+    same filesystem as the export directory, hits are hard links.
+
+    The key hashes the canonical creative JSON, the content of every image
+    it references, the output format and the encoder settings. Equal keys
+    produce identical files, so a repeat export just links the cached file
+    to the requested name. Entries are evicted least recently used first once
+    the files in cache_dir exceed max_bytes. The budget is checked against the
+    directory itself under a file lock, so it holds across every process
+    sharing cache_dir; recency is shared, and survives restarts, through the
+    file mtimes.
+    """
+
+    def __init__(self, cache_dir: str = './export_cache', max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(creative_data: dict, sources: Dict[str, Optional[str]], output: dict) -> str:
+        """
+        Canonical hash of an export
+
+        Args:
+            creative_data: Creative canvas data
+            sources: Content digest (or version key) of each referenced image, by src
+            output: Format, file format and encoder settings
+        """
+
+        payload = json.dumps(
+            {
+                'version': EXPORT_CACHE_VERSION,
+                'creative': creative_data,
+                'sources': sources,
+                'output': output,
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _load(self):
+        """Index existing entries, oldest first (called with the lock held)"""
+
+        if not self._loaded:
+            self._reindex(self._scan())
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        """Name and size of every cached file, least recently used first"""
+
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith('.') or entry.name.endswith('.tmp'):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            except FileNotFoundError:
+                # Evicted by another process mid-scan
+                continue
+
+        return [(name, size) for _, name, size in sorted(entries)]
+
+    @contextmanager
+    def _directory_lock(self):
+        """Exclusive lock on cache_dir, shared with other processes using it"""
+
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self.cache_dir, LOCK_NAME), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _name(key: str, ext: str) -> str:
+        return f"{key}.{ext.lower()}"
+
+    @staticmethod
+    def _link_atomic(source: str, target: str):
+        """Point target at source's content without ever exposing a partial file"""
+
+        tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                os.link(source, tmp_path)
+            except OSError:
+                # Filesystem without hard links
+                shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _indexed(self, name: str) -> bool:
+        """
+        True if the entry is known, adopting files stored by another process
+        sharing the cache directory (called with the lock held)
+        """
+
+        self._load()
+        if name in self._entries:
+            return True
+
+        try:
+            size = os.path.getsize(os.path.join(self.cache_dir, name))
+        except OSError:
+            return False
+
+        self._entries[name] = size
+        self.current_bytes += size
+        return True
+
+    def contains(self, key: str, ext: str) -> bool:
+        """True if an export with this key is cached"""
+
+        if not self.enabled:
+            return False
+
+        name = self._name(key, ext)
+        with self._lock:
+            return self._indexed(name) and os.path.exists(os.path.join(self.cache_dir, name))
+
+    def fetch(self, key: str, ext: str, output_path: str) -> bool:
+        """
+        Place a cached export at output_path
+
+        Returns:
+            True on a hit, False if the export must be rendered
+        """
+
+        if not self.enabled:
+            return False
+
+        name = self._name(key, ext)
+        path = os.path.join(self.cache_dir, name)
+
+        with self._lock:
+            if not self._indexed(name):
+                self.misses += 1
+                return False
+            self._entries.move_to_end(name)
+
+        try:
+            self._link_atomic(path, output_path)
+            os.utime(path)
+        except FileNotFoundError:
+            # Removed behind our back
+            with self._lock:
+                self.current_bytes -= self._entries.pop(name, 0)
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def read(self, key: str, ext: str) -> Optional[bytes]:
+        """
+        Content of a cached export
+
+        Returns:
+            The file bytes on a hit, None if the export must be rendered
+        """
+
+        if not self.enabled:
+            return None
+
+        name = self._name(key, ext)
+        path = os.path.join(self.cache_dir, name)
+
+        with self._lock:
+            if not self._indexed(name):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.current_bytes -= self._entries.pop(name, 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def store(self, key: str, ext: str, output_path: str):
+        """Add a freshly written export to the cache"""
+
+        if not self.enabled:
+            return
+
+        name = self._name(key, ext)
+        size = os.path.getsize(output_path)
+        if size > self.max_bytes:
+            return
+
+        path = os.path.join(self.cache_dir, name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._link_atomic(output_path, path)
+        os.utime(path)
+        self._prune()
+
+    def store_bytes(self, key: str, ext: str, data: bytes):
+        """Add an export rendered in memory to the cache"""
+
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+
+        name = self._name(key, ext)
+        path = os.path.join(self.cache_dir, name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._prune()
+
+    def _prune(self):
+        """
+        Evict the least recently used files until cache_dir fits max_bytes
+
+        Sizes come from the directory rather than this process's index, so
+        entries stored by other processes count against the budget too. The
+        index is then rebuilt from what is left.
+        """
+
+        evicted = 0
+        with self._directory_lock():
+            entries = self._scan()
+            total = sum(size for _, size in entries)
+
+            while total > self.max_bytes and entries:
+                name, size = entries.pop(0)
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self._reindex(entries)
+            self.evictions += evicted
+
+    def _reindex(self, entries: List[Tuple[str, int]]):
+        """Replace the index with a directory scan (called with the lock held)"""
+
+        self._entries = OrderedDict(entries)
+        self.current_bytes = sum(self._entries.values())
+        self._loaded = True
+
+    def stats(self) -> dict:
+        """Size (of the whole directory) and hit/miss/eviction counters for monitoring"""
+
+        entries = self._scan()
+        with self._lock:
+            self._reindex(entries)
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
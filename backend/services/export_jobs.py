@@ -0,0 +1,431 @@
+"""
+Export Jobs for Tesco Creative Studio
+Persistent export queue in SQLite, drained by worker processes
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ('completed', 'failed')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS export_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    results TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    owner TEXT,
+    lease_expires TEXT
+);
+CREATE INDEX IF NOT EXISTS export_jobs_queue ON export_jobs (status, created_at);
+"""
+
+
+def sqlite_path(database_url: str) -> str:
+    """File path of a sqlite:/// database URL"""
+
+    prefix = 'sqlite:///'
+    if not database_url.startswith(prefix):
+        raise ValueError(f"Export jobs need a SQLite database_url, got: {database_url}")
+    return database_url[len(prefix):]
+
+
+class ExportJobStore:
+    """
+    Export jobs table shared by the API process and the workers
+
+    Every call opens its own short-lived connection, so the store can be used
+    from any thread or process. WAL mode lets status reads run while a worker
+    writes progress.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+        # Tables created before jobs were leased to workers
+        with self._write_transaction() as conn:
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(export_jobs)")}
+            for column in ('owner', 'lease_expires'):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE export_jobs ADD COLUMN {column} TEXT")
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Autocommit connection, closed on exit"""
+
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection inside BEGIN IMMEDIATE, committed on success
+
+        The write lock is held from the first read, so read-modify-write
+        sequences in different processes never interleave.
+        """
+
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> dict:
+        total = row['total']
+        return {
+            'job_id': row['id'],
+            'status': row['status'],
+            'total': total,
+            'completed': row['completed'],
+            'progress': round(row['completed'] / total, 3) if total else 1.0,
+            'results': json.loads(row['results']),
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+        }
+
+    def submit(self, creative_data: dict, filename: str, formats: List[str], file_format: str) -> dict:
+        """Queue an export of creative_data in `formats`, returning the new job"""
+
+        job_id = uuid.uuid4().hex
+        payload = json.dumps({
+            'creative_data': creative_data,
+            'filename': filename,
+            'formats': formats,
+            'file_format': file_format,
+        })
+
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO export_jobs (id, status, payload, total, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, payload, len(formats), self._now())
+            )
+
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Status, progress and per-format results of a job, or None if unknown"""
+
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM export_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    @staticmethod
+    def _lease_expiry(now: datetime, lease_seconds: float) -> str:
+        return (now + timedelta(seconds=lease_seconds)).isoformat()
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        """
+        Lease the oldest runnable job to `owner` and mark it running
+
+        Runnable means queued, or running under a lease its worker stopped
+        renewing (the worker or its server died). BEGIN IMMEDIATE holds the
+        write lock across select and update, so two workers never claim the
+        same job.
+
+        Returns:
+            dict with job_id, owner and the submitted payload, or None if
+            nothing is runnable
+        """
+
+        now = datetime.now()
+        with self._write_transaction() as conn:
+            row = conn.execute(
+                "SELECT id, status, payload FROM export_jobs "
+                "WHERE status = 'queued' "
+                "OR (status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)) "
+                "ORDER BY created_at LIMIT 1",
+                (now.isoformat(),)
+            ).fetchone()
+            if row is None:
+                return None
+
+            # A reclaimed job starts over
+            conn.execute(
+                "UPDATE export_jobs SET status = 'running', started_at = ?, completed = 0, results = '{}', "
+                "owner = ?, lease_expires = ? WHERE id = ?",
+                (now.isoformat(), owner, self._lease_expiry(now, lease_seconds), row['id'])
+            )
+
+        if row['status'] == 'running':
+            logger.info("Reclaimed export job with an expired lease", extra={'job_id': row['id'], 'owner': owner})
+
+        return {'job_id': row['id'], 'owner': owner, **json.loads(row['payload'])}
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Extend owner's lease on a running job
+
+        Returns:
+            False if the job is no longer leased to owner
+        """
+
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE export_jobs SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (self._lease_expiry(datetime.now(), lease_seconds), job_id, owner)
+            )
+            return cursor.rowcount == 1
+
+    def record_result(self, job_id: str, owner: str, format_type: str, result: dict):
+        """Store the result of one format and advance the job's progress"""
+
+        with self._write_transaction() as conn:
+            row = conn.execute(
+                "SELECT results FROM export_jobs WHERE id = ? AND owner = ? AND status = 'running'",
+                (job_id, owner)
+            ).fetchone()
+            if row is None:
+                # Lease lost: the job belongs to another worker now
+                return
+
+            results = json.loads(row['results'])
+            results[format_type] = result
+
+            conn.execute(
+                "UPDATE export_jobs SET results = ?, completed = ? WHERE id = ?",
+                (json.dumps(results), len(results), job_id)
+            )
+
+    def finish(self, job_id: str, owner: str, failed: bool = False, error: Optional[str] = None):
+        """
+        Mark a job completed or failed
+
+        Args:
+            job_id: Job to finish
+            owner: Worker holding the lease; ignored if the job was reclaimed
+            failed: True when the job produced nothing usable
+            error: Why it failed, or which formats failed in a completed job
+        """
+
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE export_jobs SET status = ?, error = ?, finished_at = ?, lease_expires = NULL "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                ('failed' if failed else 'completed', error, self._now(), job_id, owner)
+            )
+
+    def prune(self, retention_hours: float) -> int:
+        """Delete finished jobs older than the retention period"""
+
+        cutoff = (datetime.now() - timedelta(hours=retention_hours)).isoformat()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM export_jobs WHERE status IN ('completed', 'failed') AND finished_at < ?",
+                (cutoff,)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Job counts by status for monitoring"""
+
+        with self._connection() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM export_jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in ('queued', 'running') + FINISHED_STATUSES}
+        counts.update({row['status']: row['n'] for row in rows})
+        return counts
+
+
+# ============================================================================
+# WORKERS
+# ============================================================================
+
+def _init_worker():
+    """Configure logging and ExportService in a freshly spawned worker"""
+
+    from config import get_settings
+    from services.export_service import configure_export_service
+    from utils.log import setup_logging
+
+    settings = get_settings()
+    setup_logging(settings.debug, settings.log_element_sample_rate)
+    configure_export_service(settings)
+
+    return settings.export_dir
+
+
+def _run_job(store: ExportJobStore, job: dict, export_dir: str):
+    from services.export_service import ExportService
+
+    job_id = job['job_id']
+
+    def on_result(format_type: str, result: dict):
+        if result.get('success') and result.get('output_path'):
+            # Web path, as returned by the synchronous export endpoints
+            result = {**result, 'output_path': f"/exports/{os.path.basename(result['output_path'])}"}
+        store.record_result(job_id, job['owner'], format_type, result)
+
+    try:
+        results = ExportService.export_multiple_formats(
+            job['creative_data'],
+            export_dir,
+            # Jobs share export_dir and mostly the default filename
+            f"{job['filename']}_{job_id}",
+            formats=job['formats'],
+            file_format=job['file_format'],
+            on_result=on_result
+        )
+    except Exception as e:
+        logger.exception("Export job failed", extra={'job_id': job_id})
+        store.finish(job_id, job['owner'], failed=True, error=str(e))
+        return
+
+    # Per-format errors come back as results, not exceptions
+    failures = {
+        format_type: result.get('error') or result.get('message') or 'Export failed'
+        for format_type, result in results['formats'].items()
+        if not result.get('success')
+    }
+    if not failures:
+        store.finish(job_id, job['owner'])
+        return
+
+    error = '; '.join(f"{format_type}: {message}" for format_type, message in failures.items())
+    if len(failures) == len(results['formats']):
+        logger.warning("Export job failed", extra={'job_id': job_id, 'error': error})
+        store.finish(job_id, job['owner'], failed=True, error=f"All formats failed. {error}")
+    else:
+        store.finish(job_id, job['owner'], error=f"Some formats failed. {error}")
+
+
+def _keep_lease(store: ExportJobStore, job: dict, lease_seconds: float, done: threading.Event):
+    """Renew the job's lease until done is set, so it isn't reclaimed while rendering"""
+
+    while not done.wait(lease_seconds / 3):
+        try:
+            if not store.renew(job['job_id'], job['owner'], lease_seconds):
+                logger.warning("Export job lease lost", extra={'job_id': job['job_id']})
+                return
+        except sqlite3.Error as e:
+            logger.warning("Export job lease not renewed: %s", e)
+
+
+def _worker_main(db_path: str, stop_event, poll_seconds: float, lease_seconds: float):
+    """Claim and run jobs until stop_event is set"""
+
+    export_dir = _init_worker()
+    store = ExportJobStore(db_path)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    while not stop_event.is_set():
+        try:
+            job = store.claim(owner, lease_seconds)
+        except sqlite3.Error as e:
+            logger.warning("Export queue unavailable: %s", e)
+            job = None
+
+        if job is None:
+            stop_event.wait(poll_seconds)
+            continue
+
+        started = time.perf_counter()
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=_keep_lease, args=(store, job, lease_seconds, done), name='export-lease', daemon=True
+        )
+        heartbeat.start()
+        try:
+            _run_job(store, job, export_dir)
+        finally:
+            done.set()
+            heartbeat.join()
+
+        logger.info(
+            "Export job finished",
+            extra={'job_id': job['job_id'], 'formats': len(job['formats']),
+                   'seconds': round(time.perf_counter() - started, 3)}
+        )
+
+
+class ExportWorkerPool:
+    """
+    Worker processes draining the export job queue
+
+    Spawned rather than forked, like the batch validation pool: the server
+    process runs an event loop and threads. Each worker renders one job at a
+    time, its formats in parallel threads, and renews the job's lease while
+    it runs. Jobs of a worker that dies are picked up again once their lease
+    expires, whichever server process it belonged to.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, poll_seconds: float = 0.5,
+                 lease_seconds: float = 60.0):
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = None
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        """Start the worker processes"""
+
+        if self._processes:
+            return
+
+        self._stop_event = self._context.Event()
+        for index in range(self.workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.db_path, self._stop_event, self.poll_seconds, self.lease_seconds),
+                name=f'export-worker-{index}',
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def alive(self) -> int:
+        return sum(1 for process in self._processes if process.is_alive())
+
+    def shutdown(self, timeout: float = 5.0):
+        """Ask workers to stop after their current job, then terminate stragglers"""
+
+        if not self._processes:
+            return
+
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
@@ -0,0 +1,169 @@
+"""
+Font Registry for Tesco Creative Studio
+Resolves font families and weights once and memoises loaded fonts
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PIL import ImageFont
+
+
+logger = logging.getLogger(__name__)
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+# Tried (via Pillow's system font search) when a family isn't in the font directory
+FALLBACK_FILES = {
+    'regular': ('arial.ttf', 'DejaVuSans.ttf'),
+    'bold': ('arialbd.ttf', 'DejaVuSans-Bold.ttf'),
+}
+
+
+def normalise_weight(weight) -> str:
+    """Map CSS-style weights ('bold', 700, '600') to 'regular' or 'bold'"""
+
+    if weight is None:
+        return 'regular'
+
+    weight = str(weight).strip().lower()
+    if weight.isdigit():
+        return 'bold' if int(weight) >= 600 else 'regular'
+
+    return 'bold' if weight in ('bold', 'bolder', 'semibold', 'extrabold', 'black', 'heavy') else 'regular'
+
+
+class FontRegistry:
+    """
+    Font lookup by (family, weight, size)
+
+    The font directory is scanned once; each file is registered under the
+    family and style names embedded in it. Loaded fonts are memoised per
+    (family, weight, size), so drawing text doesn't re-parse a TTF file.
+    Unknown families use the default family, and when no font file can be
+    found Pillow's built-in font is returned.
+    """
+
+    def __init__(self, font_dir: str = './fonts', default_family: str = 'Arial', max_entries: int = 256):
+        self.font_dir = font_dir
+        self.default_family = default_family.lower()
+        self.max_entries = max_entries
+        self._faces: Dict[Tuple[str, str], str] = {}
+        self._fonts: 'OrderedDict[tuple, ImageFont.ImageFont]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.scan()
+
+    def scan(self):
+        """Register every font file in the font directory"""
+
+        faces = {}
+
+        if os.path.isdir(self.font_dir):
+            for root, _, files in os.walk(self.font_dir):
+                for filename in sorted(files):
+                    if not filename.lower().endswith(FONT_EXTENSIONS):
+                        continue
+
+                    path = os.path.join(root, filename)
+                    try:
+                        family, style = ImageFont.truetype(path, 12).getname()
+                    except Exception as e:
+                        logger.warning("Skipping unreadable font %s: %s", path, e)
+                        continue
+
+                    style = (style or '').lower()
+                    if 'italic' in style or 'oblique' in style:
+                        continue
+
+                    # Prefer the plain 'Regular'/'Bold' cut over Light, Medium, etc.
+                    weight = 'bold' if 'bold' in style else 'regular'
+                    rank = 0 if style in ('regular', 'bold', 'book', 'normal') else 1
+                    key = ((family or '').lower(), weight)
+                    if key not in faces or rank < faces[key][1]:
+                        faces[key] = (path, rank)
+
+        with self._lock:
+            self._faces = {key: path for key, (path, _) in faces.items()}
+            self._fonts.clear()
+
+    def _resolve(self, family: str, weight: str) -> Optional[str]:
+        """Font file for a family/weight, preferring exact matches"""
+
+        for key in ((family, weight), (family, 'regular'),
+                    (self.default_family, weight), (self.default_family, 'regular')):
+            if key in self._faces:
+                return self._faces[key]
+
+        return None
+
+    def _load(self, family: str, weight: str, size: int) -> ImageFont.ImageFont:
+        path = self._resolve(family, weight)
+        candidates = (path,) if path else FALLBACK_FILES[weight]
+
+        for candidate in candidates:
+            try:
+                return ImageFont.truetype(candidate, size)
+            except OSError:
+                continue
+
+        self.fallbacks += 1
+        return ImageFont.load_default()
+
+    def get(self, family: Optional[str] = None, weight='regular', size: int = 16) -> ImageFont.ImageFont:
+        """
+        Loaded font for a family, weight and pixel size
+
+        Args:
+            family: Font family name (case-insensitive), default family if None
+            weight: 'regular'/'bold' or a CSS weight such as 700
+            size: Font size in pixels
+        """
+
+        key = ((family or self.default_family).lower(), normalise_weight(weight), max(1, int(size)))
+
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+
+            self.misses += 1
+            font = self._load(*key)
+
+            self._fonts[key] = font
+            while len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+
+        return font
+
+    def fingerprint(self) -> str:
+        """Hash of the registered faces, changes whenever text may render differently"""
+
+        with self._lock:
+            faces = sorted(f"{family}/{weight}={path}" for (family, weight), path in self._faces.items())
+        payload = '\n'.join([self.default_family] + faces)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def stats(self) -> dict:
+        """Registered faces and cache counters for monitoring"""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'font_dir': self.font_dir,
+                'faces': len(self._faces),
+                'families': sorted({family for family, _ in self._faces}),
+                'entries': len(self._fonts),
+                'hits': self.hits,
+                'misses': self.misses,
+                'fallbacks': self.fallbacks,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
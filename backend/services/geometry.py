@@ -0,0 +1,117 @@
+"""
+Element Geometry for Tesco Creative Studio
+Vectorised element bounds shared by the geometric compliance rules
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+def rect_gap(bounds1: dict, bounds2: dict) -> float:
+    """Calculate minimum gap between two rectangles"""
+
+    # Horizontal gap
+    if bounds1['x'] + bounds1['width'] <= bounds2['x']:
+        h_gap = bounds2['x'] - (bounds1['x'] + bounds1['width'])
+    elif bounds2['x'] + bounds2['width'] <= bounds1['x']:
+        h_gap = bounds1['x'] - (bounds2['x'] + bounds2['width'])
+    else:
+        h_gap = 0
+
+    # Vertical gap
+    if bounds1['y'] + bounds1['height'] <= bounds2['y']:
+        v_gap = bounds2['y'] - (bounds1['y'] + bounds1['height'])
+    elif bounds2['y'] + bounds2['height'] <= bounds1['y']:
+        v_gap = bounds1['y'] - (bounds2['y'] + bounds2['height'])
+    else:
+        v_gap = 0
+
+    # Return minimum gap (considering both directions)
+    if h_gap > 0 and v_gap > 0:
+        return min(h_gap, v_gap)
+    else:
+        return max(h_gap, v_gap)
+
+
+class ElementGeometry:
+    """
+    Bounds of every creative element as NumPy arrays
+
+    Built once per validation so overlap, gap and safe-zone checks run as
+    array operations over all elements instead of per-element dict lookups.
+    """
+
+    def __init__(self, elements: list):
+        self.elements = elements
+        self.ids = np.array([element.get('id') for element in elements], dtype=object)
+        self.types = np.array([element.get('type') for element in elements], dtype=object)
+
+        self.x = np.array([element.get('x', 0) for element in elements], dtype=float)
+        self.y = np.array([element.get('y', 0) for element in elements], dtype=float)
+        self.width = np.array([element.get('width', 0) for element in elements], dtype=float)
+        self.height = np.array([element.get('height', 0) for element in elements], dtype=float)
+
+        self.right = self.x + self.width
+        self.bottom = self.y + self.height
+
+    @classmethod
+    def from_creative(cls, creative_data: dict) -> 'ElementGeometry':
+        return cls(creative_data.get('elements', []))
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    @staticmethod
+    def bounds_of(element: dict) -> dict:
+        """Bounds dict of a single element, missing fields default to 0"""
+        return {
+            'x': element.get('x', 0),
+            'y': element.get('y', 0),
+            'width': element.get('width', 0),
+            'height': element.get('height', 0),
+        }
+
+    def type_mask(self, types: Iterable[str]) -> np.ndarray:
+        """Elements whose type is one of `types`"""
+        return np.isin(self.types, list(types))
+
+    def overlaps(self, bounds: dict, exclude_id=None) -> np.ndarray:
+        """
+        Elements touching or overlapping `bounds`
+
+        Edges are inclusive, so elements that merely touch count as overlapping.
+        Elements whose id equals `exclude_id` are ignored.
+        """
+
+        x, y = bounds['x'], bounds['y']
+        right, bottom = x + bounds['width'], y + bounds['height']
+
+        mask = ~(
+            (right < self.x) | (self.right < x) |
+            (bottom < self.y) | (self.bottom < y)
+        )
+        if len(self):
+            mask &= self.ids != exclude_id
+
+        return mask
+
+    def gaps(self, bounds: dict) -> np.ndarray:
+        """Minimum gap between every element and `bounds` (see rect_gap)"""
+
+        x, y = bounds['x'], bounds['y']
+        right, bottom = x + bounds['width'], y + bounds['height']
+
+        h_gap = np.where(self.right <= x, x - self.right,
+                         np.where(right <= self.x, self.x - right, 0.0))
+        v_gap = np.where(self.bottom <= y, y - self.bottom,
+                         np.where(bottom <= self.y, self.y - bottom, 0.0))
+
+        both = (h_gap > 0) & (v_gap > 0)
+        return np.where(both, np.minimum(h_gap, v_gap), np.maximum(h_gap, v_gap))
+
+    @staticmethod
+    def first(mask: np.ndarray) -> Optional[int]:
+        """Index of the first True entry, or None"""
+        indices = np.flatnonzero(mask)
+        return int(indices[0]) if indices.size else None
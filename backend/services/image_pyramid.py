@@ -0,0 +1,164 @@
+"""
+Image Pyramid for Tesco Creative Studio
+Pre-scaled copies of uploaded images so renders resample from a nearby size
+"""
+
+import json
+import os
+import re
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+
+PYRAMID_LEVELS = (2048, 1024, 512, 256)
+_DIGEST_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+def normalise_image(image: Image.Image) -> Image.Image:
+    """Apply EXIF orientation and convert to RGB, or RGBA when the image has transparency"""
+
+    image = ImageOps.exif_transpose(image)
+
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+class ImagePyramid:
+    """
+    Downscaled levels of source images, stored under <root_dir>/.pyramid/
+
+    Level N is the normalised image scaled so its longer side is N pixels;
+    only levels smaller than the source are written. A JSON manifest per
+    source lists the level sizes, so picking a level needs no decoding.
+    """
+
+    def __init__(self, root_dir: str = './uploads', levels: Tuple[int, ...] = PYRAMID_LEVELS):
+        self.root_dir = root_dir
+        self.pyramid_dir = os.path.join(root_dir, '.pyramid')
+        self.levels = tuple(sorted(levels, reverse=True))
+        self._manifests: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stem(source_path: str) -> str:
+        # Content-addressed files share one pyramid across extensions
+        filename = os.path.basename(source_path)
+        stem = os.path.splitext(filename)[0]
+        return stem if _DIGEST_NAME.match(stem) else filename
+
+    def _manifest_path(self, source_path: str) -> str:
+        return os.path.join(self.pyramid_dir, f"{self._stem(source_path)}.json")
+
+    def level_path(self, source_path: str, level: int) -> str:
+        return os.path.join(self.pyramid_dir, f"{self._stem(source_path)}_{level}.png")
+
+    @staticmethod
+    def _write_atomic(path: str, write):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def build(self, source_path: str) -> dict:
+        """
+        Decode a source image once and write its pyramid levels
+
+        Each level is downscaled from the previous one, so the full-size image
+        is resampled only once.
+
+        Returns:
+            Manifest with the source size and the written levels
+        """
+
+        with Image.open(source_path) as source:
+            image = normalise_image(source)
+
+        os.makedirs(self.pyramid_dir, exist_ok=True)
+
+        manifest = {'width': image.width, 'height': image.height, 'mode': image.mode, 'levels': []}
+
+        for level in self.levels:
+            if level >= max(image.width, image.height):
+                continue
+
+            scale = level / max(image.width, image.height)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.Resampling.LANCZOS)
+
+            self._write_atomic(
+                self.level_path(source_path, level),
+                lambda tmp, im=image: im.save(tmp, format='PNG', compress_level=1)
+            )
+            manifest['levels'].append({'level': level, 'width': size[0], 'height': size[1]})
+
+        def write_manifest(tmp):
+            with open(tmp, 'w') as f:
+                json.dump(manifest, f)
+
+        self._write_atomic(self._manifest_path(source_path), write_manifest)
+
+        with self._lock:
+            self._manifests[self._stem(source_path)] = manifest
+
+        return manifest
+
+    def remove(self, source_path: str):
+        """Delete the pyramid of a source image"""
+
+        manifest = self.manifest(source_path)
+        with self._lock:
+            self._manifests.pop(self._stem(source_path), None)
+
+        if manifest is None:
+            return
+
+        for path in [self.level_path(source_path, level['level']) for level in manifest['levels']] + \
+                [self._manifest_path(source_path)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def manifest(self, source_path: str) -> Optional[dict]:
+        """Pyramid manifest of a source image, or None if none was built"""
+
+        stem = self._stem(source_path)
+        with self._lock:
+            manifest = self._manifests.get(stem)
+        if manifest is not None:
+            return manifest
+
+        try:
+            with open(self._manifest_path(source_path)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self._manifests[stem] = manifest
+        return manifest
+
+    def select(self, source_path: str, width: int, height: int) -> Optional[str]:
+        """
+        Smallest level at least width x height, or None to use the source
+
+        Levels are only returned while their files exist, so a missing or
+        deleted pyramid falls back to the original.
+        """
+
+        manifest = self.manifest(source_path)
+        if manifest is None:
+            return None
+
+        for level in reversed(manifest['levels']):
+            if level['width'] >= width and level['height'] >= height:
+                path = self.level_path(source_path, level['level'])
+                return path if os.path.exists(path) else None
+
+        return None
@@ -0,0 +1,237 @@
+"""
+LLM Gateway for Tesco Creative Studio
+Shared Gemini client with request coalescing, a response cache and retries
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import google.ai.generativelanguage as glm
+import google.generativeai as genai
+from google.api_core import exceptions as api_exceptions
+
+from utils.metrics import GEMINI_REQUEST_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+# 429 (rate limited / quota) and any 5xx are worth another attempt
+RETRYABLE_ERRORS = (api_exceptions.TooManyRequests, api_exceptions.ServerError)
+
+
+class LLMGateway:
+    """
+    Single entry point for Gemini text generation
+
+    One GenerativeService client is created on first use and reused for every
+    call. The blocking generate_content runs on a pool of max_workers
+    threads, which also caps how many calls are in flight to the API; further
+    calls wait for a thread. Prompts are keyed by the SHA-256 of model name
+    and prompt text:
+      - a response younger than ttl_seconds is served from an LRU cache
+      - concurrent requests for the same key share one in-flight call
+    Calls failing with 429 or 5xx are retried up to max_retries times with
+    jittered exponential backoff (or the server's Retry-After), sleeping on
+    the event loop rather than holding a worker thread. The client's own
+    default retry is turned off, so this is the only retry policy. Failed
+    calls are not cached; every waiter sees the exception.
+
+    Setting `endpoint` (e.g. "http://127.0.0.1:8089") sends requests over
+    REST to that host instead of Google, for testing against a stub server.
+    """
+
+    def __init__(self, api_key: str = '', model_name: str = 'gemini-2.5-flash', endpoint: str = '',
+                 cache_size: int = 512, ttl_seconds: float = 3600, max_workers: int = 4,
+                 max_retries: int = 3, retry_base_seconds: float = 0.5, retry_max_seconds: float = 8.0):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.endpoint = endpoint
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(0, max_retries)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='llm')
+
+        self._cache: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.hits = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True when an API key is configured"""
+        return bool(self.api_key)
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                options = {'client_options': {'api_key': self.api_key}}
+                if self.endpoint:
+                    options['transport'] = 'rest'
+                    options['client_options']['api_endpoint'] = self.endpoint
+                self._client = glm.GenerativeServiceClient(**options)
+            return self._client
+
+    def prompt_key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{prompt}".encode('utf-8')).hexdigest()
+
+    # ========================================================================
+    # CACHE
+    # ========================================================================
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+
+            expires_at, text = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return None
+
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def _cache_put(self, key: str, text: str):
+        if self.cache_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.ttl_seconds, text)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    # ========================================================================
+    # GENERATION
+    # ========================================================================
+
+    def _call(self, prompt: str, operation: str) -> str:
+        """Blocking model call, run on the gateway pool"""
+
+        request = glm.GenerateContentRequest(
+            model=f"models/{self.model_name}",
+            contents=[glm.Content(role='user', parts=[glm.Part(text=prompt)])],
+        )
+        with GEMINI_REQUEST_SECONDS.labels(operation=operation).time():
+            response = self._get_client().generate_content(request, retry=None)
+        return genai.types.GenerateContentResponse.from_response(response).text
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retry number attempt + 1"""
+
+        response = getattr(error, 'response', None)
+        retry_after = getattr(response, 'headers', {}).get('Retry-After', '') if response is not None else ''
+        if retry_after.isdigit():
+            return min(float(retry_after), self.retry_max_seconds)
+
+        delay = min(self.retry_base_seconds * 2 ** attempt, self.retry_max_seconds)
+        return random.uniform(delay / 2, delay)
+
+    async def _fetch(self, key: str, prompt: str, operation: str) -> str:
+        loop = asyncio.get_running_loop()
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                self.calls += 1
+                try:
+                    text = await loop.run_in_executor(self._pool, self._call, prompt, operation)
+                    break
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+
+                    delay = self._retry_delay(attempt, e)
+                    self.retries += 1
+                    logger.warning(
+                        "Gemini call failed, retrying",
+                        extra={'operation': operation, 'attempt': attempt + 1, 'delay': round(delay, 3),
+                               'error': str(e)}
+                    )
+                    await asyncio.sleep(delay)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        self._cache_put(key, text)
+        return text
+
+    async def generate(self, prompt: str, operation: str = 'generate') -> str:
+        """
+        Response text for a prompt
+
+        Args:
+            prompt: Full prompt text
+            operation: Caller name, used as the metrics label
+
+        Returns:
+            Model response text, possibly from the cache
+        """
+
+        key = self.prompt_key(prompt)
+
+        text = self._cache_get(key)
+        if text is not None:
+            return text
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, prompt, operation))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+
+        # Shielded, so one cancelled request doesn't cancel the shared call
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Call, cache and coalescing counters for monitoring"""
+
+        with self._cache_lock:
+            entries = len(self._cache)
+
+        return {
+            'model': self.model_name,
+            'endpoint': self.endpoint or 'default',
+            'enabled': self.enabled,
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'max_workers': self.max_workers,
+            'cache_hits': self.hits,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+            'cache_entries': entries,
+            'cache_size': self.cache_size,
+            'ttl_seconds': self.ttl_seconds,
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
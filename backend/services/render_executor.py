@@ -0,0 +1,88 @@
+"""
+Render Executor for Tesco Creative Studio
+Runs CPU-bound export rendering off the asyncio event loop
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render executor has no free worker or queue slot"""
+
+
+class RenderExecutor:
+    """
+    Bounded thread pool for export rendering
+
+    Pillow releases the GIL while resampling and encoding, so render threads
+    run alongside the event loop. At most `max_workers + max_queue` renders are
+    admitted at once; further submissions fail fast with RenderQueueFull so the
+    API can answer 503 instead of queueing without limit.
+    """
+
+    def __init__(self, max_workers: int = 0, max_queue: int = 16):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='render')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _call(self, fn: Callable, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            # Released by the worker, so a cancelled request can't free a slot early
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Submit a render, raising RenderQueueFull when saturated"""
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise RenderQueueFull(
+                f"Render queue full ({self.max_workers} workers, {self.max_queue} queued)"
+            )
+
+        with self._lock:
+            self.in_flight += 1
+
+        try:
+            return self._pool.submit(functools.partial(self._call, fn, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+            raise
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a render on the pool and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        """Queue depth and throughput counters"""
+
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'queued': max(0, self.in_flight - self.max_workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self):
+        """Stop accepting renders and let running ones finish"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
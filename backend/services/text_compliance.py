@@ -0,0 +1,120 @@
+"""
+Text Compliance Classifier for Tesco Creative Studio
+Local copy-rule scan first, LLM review only for ambiguous text
+"""
+
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from services.compliance_rules import copy_rules
+from services.copy_scanner import CopyScanner
+
+
+# Prohibited words that also have innocent uses ("green beans", "natural
+# yoghurt", "offer your guests"): a whole-word hit is only a weak signal
+CONTEXT_DEPENDENT_TERMS = {
+    'green', 'natural', 'organic', 'renewable', 'win', 'draw', 'deal', 'offer',
+    'sale', 'price', 'reduced', 'supporting', 'guarantee', 'guaranteed',
+    'study', 'research', 'tested', 'clinical', 'proven',
+}
+
+# Local confidence in the verdict, compared against the LLM threshold
+CONFIDENCE_CERTAIN = 1.0
+CONFIDENCE_CLEAN = 0.9
+CONFIDENCE_CLEAN_LONG = 0.7
+CONFIDENCE_AMBIGUOUS = 0.5
+
+# Longer copy has more room for claims phrased outside the vocabulary
+LONG_TEXT_WORDS = 12
+
+
+class TextComplianceClassifier:
+    """
+    Tiered text compliance check
+
+    Tier 1 runs the compiled copy-rule vocabularies (the same patterns the
+    compliance engine enforces) over the text and scores its own verdict:
+      - a whole-word hit of an unambiguous term is a certain violation
+      - hits that are only substrings ("win" in "window") or context-dependent
+        words are ambiguous
+      - no hits is a clean verdict, less certain for long copy
+    Callers consult the LLM only when the confidence is below `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self.rules = copy_rules()
+
+        self.scanner = CopyScanner()
+        for rule in self.rules:
+            rule.register(self.scanner)
+        self.scanner.compile()
+
+        # Same patterns anchored at word boundaries, to grade each hit
+        self._whole_word: Dict[Tuple[str, str], re.Pattern] = {}
+        for rule in self.rules:
+            for pattern in rule.vocabulary():
+                source = re.escape(pattern) if rule.literal else pattern
+                self._whole_word[(rule.name, pattern)] = re.compile(rf'(?<!\w)(?:{source})(?!\w)', re.IGNORECASE)
+
+        self._lock = threading.Lock()
+        self.tier_counts = {'local': 0, 'llm': 0, 'llm_failed': 0}
+
+    def classify(self, text: str) -> dict:
+        """
+        Local verdict for a piece of copy
+
+        Returns:
+            dict with is_compliant, violations, severity, confidence and
+            needs_review (True when the LLM should decide)
+        """
+
+        scan = self.scanner.scan({'headline': text})
+        violations: List[str] = []
+        certain = False
+
+        for rule in self.rules:
+            hits = scan.hits_for(rule.name)
+            for pattern in rule.vocabulary():
+                if pattern not in hits:
+                    continue
+
+                violations.append(rule.hit_message(pattern))
+                if pattern not in CONTEXT_DEPENDENT_TERMS and self._whole_word[(rule.name, pattern)].search(text):
+                    certain = True
+
+        if certain:
+            confidence = CONFIDENCE_CERTAIN
+        elif violations:
+            confidence = CONFIDENCE_AMBIGUOUS
+        elif len(text.split()) > LONG_TEXT_WORDS:
+            confidence = CONFIDENCE_CLEAN_LONG
+        else:
+            confidence = CONFIDENCE_CLEAN
+
+        return {
+            'is_compliant': not violations,
+            'violations': violations,
+            'severity': 'high' if violations else 'low',
+            'confidence': confidence,
+            'needs_review': confidence < self.threshold,
+        }
+
+    def record(self, tier: str):
+        """Count a verdict served by `tier` ('local', 'llm' or 'llm_failed')"""
+        with self._lock:
+            self.tier_counts[tier] += 1
+
+    def stats(self) -> dict:
+        """Verdicts per tier for monitoring"""
+
+        with self._lock:
+            counts = dict(self.tier_counts)
+
+        total = sum(counts.values())
+        return {
+            'threshold': self.threshold,
+            **counts,
+            'local_rate': round(counts['local'] / total, 3) if total else 0.0,
+        }
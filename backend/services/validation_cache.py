@@ -0,0 +1,93 @@
+"""
+Validation Result Cache for Tesco Creative Studio
+Content-addressed LRU cache in front of the compliance engine
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class ValidationResultCache:
+    """Bounded LRU cache of compliance results keyed by creative content"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(creative_data: dict, ruleset_version: str, mode: str,
+                 rule_types: Optional[List[str]] = None) -> str:
+        """
+        Canonical hash of a validation request (mode is 'all' or 'realtime')
+
+        The creative is serialised with sorted keys so that equal payloads
+        produce the same key regardless of field order.
+        """
+
+        payload = json.dumps(
+            {
+                'creative': creative_data,
+                'ruleset': ruleset_version,
+                'mode': mode,
+                'rule_types': sorted(rule_types) if rule_types else None,
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a copy of the cached result, or None on a miss"""
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: dict):
+        """Store a result, evicting the least recently used entries"""
+
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters for monitoring"""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
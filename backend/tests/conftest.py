@@ -0,0 +1,54 @@
+"""
+Shared setup for the focused backend tests
+
+Run from the backend directory with `pytest tests/`. The live-server suites
+(comprehensive_test.py, test_api.py) are separate scripts.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Keep files written by the app under test out of the working tree. Set before
+# anything imports config, whose settings are read once.
+TEST_DATA_DIR = tempfile.mkdtemp(prefix='creative-studio-tests-')
+for _name in ('UPLOAD_DIR', 'EXPORT_DIR', 'EXPORT_CACHE_DIR'):
+    os.environ.setdefault(_name, os.path.join(TEST_DATA_DIR, _name.lower()))
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(TEST_DATA_DIR, 'jobs.db')}")
+os.environ.setdefault('REMBG_PRELOAD', 'false')
+
+
+@pytest.fixture
+def export_service(tmp_path, monkeypatch):
+    """
+    ExportService with fresh caches and registries under tmp_path
+
+    Returns the directories as a dict: uploads, exports and export_cache.
+    """
+
+    from services.asset_cache import AssetCache
+    from services.asset_registry import AssetRegistry
+    from services.compositor import Compositor
+    from services.export_cache import ExportCache
+    from services.export_service import ExportService
+    from services.font_registry import FontRegistry
+    from services.image_pyramid import ImagePyramid
+
+    dirs = {name: tmp_path / name for name in ('uploads', 'exports', 'export_cache')}
+    for path in dirs.values():
+        path.mkdir()
+
+    monkeypatch.setattr(ExportService, 'asset_cache', AssetCache())
+    monkeypatch.setattr(ExportService, 'compositor', Compositor())
+    monkeypatch.setattr(ExportService, 'export_cache', ExportCache(str(dirs['export_cache'])))
+    monkeypatch.setattr(ExportService, 'fonts', FontRegistry(str(tmp_path / 'fonts')))
+    monkeypatch.setattr(ExportService, 'pyramid', ImagePyramid(str(dirs['uploads'])))
+    monkeypatch.setattr(ExportService, 'asset_registry', AssetRegistry(str(dirs['uploads'])))
+
+    return {name: str(path) for name, path in dirs.items()}
@@ -0,0 +1,106 @@
+"""
+Tests for the decoded image cache shared across renders
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from services.asset_cache import AssetCache
+from services.export_service import ExportService
+
+
+def save_image(path, size=(64, 48), color=(200, 30, 30)):
+    Image.new('RGB', size, color).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Paths passed to Image.open"""
+
+    paths = []
+    image_open = Image.open
+
+    def recording_open(fp, *args, **kwargs):
+        paths.append(str(fp))
+        return image_open(fp, *args, **kwargs)
+
+    monkeypatch.setattr(Image, 'open', recording_open)
+    return paths
+
+
+def test_repeat_lookups_share_one_decode(tmp_path, opened):
+    path = save_image(tmp_path / 'pack.png')
+    cache = AssetCache()
+
+    first = cache.get_image(path)
+
+    assert cache.get_image(path) is first
+    assert first.mode == 'RGBA'
+    assert opened.count(path) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_overwritten_file_is_decoded_again(tmp_path):
+    path = save_image(tmp_path / 'pack.png')
+    cache = AssetCache()
+    cache.get_image(path)
+
+    save_image(path, size=(32, 32), color=(0, 0, 255))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.get_image(path).size == (32, 32)
+
+
+def test_variants_are_keyed_by_size_and_rotation(tmp_path):
+    path = save_image(tmp_path / 'pack.png')
+    cache = AssetCache()
+
+    small = cache.get_variant(path, 32, 24)
+    rotated = cache.get_variant(path, 32, 24, rotation=90)
+
+    assert cache.get_variant(path, 32, 24) is small
+    assert small.size == (32, 24)
+    assert rotated.size == (24, 32)
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path):
+    paths = [save_image(tmp_path / f'{n}.png', size=(10, 10)) for n in range(3)]
+    cache = AssetCache(max_bytes=2 * 10 * 10 * 4)
+
+    first = cache.get_image(paths[0])
+    cache.get_image(paths[1])
+    cache.get_image(paths[0])
+    cache.get_image(paths[2])
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['evictions']) == (2, 1)
+    assert stats['bytes'] <= stats['max_bytes']
+    assert cache.get_image(paths[0]) is first
+
+
+def test_images_over_budget_are_not_cached(tmp_path):
+    path = save_image(tmp_path / 'big.png', size=(100, 100))
+    cache = AssetCache(max_bytes=100)
+
+    cache.get_image(path)
+
+    assert cache.stats()['entries'] == 0
+
+
+def test_multi_format_export_decodes_each_image_once(export_service, opened):
+    path = save_image(os.path.join(export_service['uploads'], 'pack.png'), size=(300, 300))
+    creative = {
+        'format': '1:1',
+        'background_color': '#FFFFFF',
+        'elements': [{'id': 'pack', 'type': 'packshot', 'src': path,
+                      'x': 100, 'y': 100, 'width': 300, 'height': 300}],
+    }
+
+    results = ExportService.export_multiple_formats(creative, export_service['exports'], 'creative')
+
+    assert all(result['success'] for result in results['formats'].values())
+    assert opened.count(path) == 1
@@ -0,0 +1,155 @@
+"""
+Tests for resolving asset references and deleting assets
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from services.asset_registry import AssetRegistry
+from services.asset_store import AssetStore
+from services.export_service import ExportService
+
+
+DIGEST = '0123456789abcdef' * 4
+
+
+def touch(path, content=b'data'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return str(path)
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    upload_dir = tmp_path / 'uploads'
+    touch(upload_dir / f'{DIGEST}.png')
+    touch(upload_dir / f'{DIGEST}.jpg')
+    touch(upload_dir / f'no_bg_{DIGEST}_u2net.png')
+    touch(upload_dir / '.upload-abc123')
+    touch(upload_dir / '.meta' / f'{DIGEST}.json', b'{}')
+    touch(upload_dir / '.pyramid' / f'{DIGEST}_256.png')
+    touch(upload_dir / 'notes.txt')
+    return upload_dir
+
+
+@pytest.fixture
+def registry(upload_dir):
+    return AssetRegistry(str(upload_dir))
+
+
+@pytest.mark.parametrize('ref', [
+    DIGEST,
+    f'{DIGEST}.png',
+    f'./uploads/{DIGEST}.png',
+    f'uploads/{DIGEST}.png',
+    f'/uploads/{DIGEST}.png',
+    f'http://localhost:8000/uploads/{DIGEST}.png',
+    f'http://localhost:8000/uploads/{DIGEST}%2Epng',
+])
+def test_ids_urls_and_paths_resolve_to_the_upload(registry, upload_dir, ref):
+    path = registry.resolve(ref)
+
+    assert os.path.basename(path) in (f'{DIGEST}.png', f'{DIGEST}.jpg')
+    assert os.path.dirname(os.path.abspath(path)) == str(upload_dir)
+
+
+def test_absolute_paths_inside_the_upload_dir_resolve(registry, upload_dir):
+    assert registry.resolve(str(upload_dir / f'no_bg_{DIGEST}_u2net.png')) is not None
+
+
+def test_every_extension_of_an_asset_is_indexed(registry):
+    assert sorted(os.path.basename(path) for path in registry.paths_for(DIGEST)) == [
+        f'{DIGEST}.jpg', f'{DIGEST}.png',
+    ]
+    assert registry.stats() == {'assets': 2, 'files': 3}
+
+
+@pytest.mark.parametrize('ref', [
+    '.upload-abc123',
+    '.meta',
+    f'.meta/{DIGEST}.json',
+    f'/uploads/.meta/{DIGEST}.json',
+    f'./uploads/.pyramid/{DIGEST}_256.png',
+    f'uploads/.pyramid/{DIGEST}_256.png',
+    'http://localhost:8000/uploads/.upload-abc123',
+    'notes.txt',
+    '/uploads/notes.txt',
+    f'../secrets/{DIGEST}.png',
+    f'/etc/{DIGEST}.png',
+    '',
+])
+def test_internal_and_unregistered_files_do_not_resolve(registry, ref):
+    assert registry.resolve(ref) is None
+
+
+def test_scan_indexes_only_asset_names(upload_dir):
+    registry = AssetRegistry(str(upload_dir))
+
+    assert registry.register(str(upload_dir / 'notes.txt')) is None
+    assert sorted(registry._paths) == sorted([
+        f'{DIGEST}.png', f'{DIGEST}.jpg', f'no_bg_{DIGEST}_u2net.png',
+    ])
+
+
+def test_assets_written_outside_the_api_are_found_on_lookup(registry, upload_dir):
+    other = 'f' * 64
+    touch(upload_dir / f'no_bg_{other}_isnet-general-use.png')
+
+    assert registry.resolve(f'no_bg_{other}_isnet-general-use.png') is not None
+    assert registry.stats()['files'] == 4
+
+
+def test_unregistered_files_are_forgotten(registry, upload_dir):
+    for path in registry.paths_for(DIGEST):
+        registry.unregister(path)
+
+    assert registry.paths_for(DIGEST) == []
+    assert registry.resolve(DIGEST) is None
+
+
+@pytest.fixture
+def client(export_service, monkeypatch):
+    monkeypatch.setattr(main, 'asset_store', AssetStore(export_service['uploads']))
+    monkeypatch.setattr(main, 'asset_registry', ExportService.asset_registry)
+    return TestClient(main.app)
+
+
+def upload(client, color):
+    image = Image.new('RGB', (600, 400), color)
+    path = os.path.join(os.path.dirname(main.asset_store.root_dir), f'{color}.png')
+    image.save(path)
+    with open(path, 'rb') as f:
+        return client.post('/api/upload', files={'file': (f'{color}.png', f, 'image/png')}).json()
+
+
+def test_delete_removes_every_copy_and_its_pyramid(client, export_service):
+    uploaded = upload(client, 'red')
+    with open(uploaded['file_path'], 'rb') as f:
+        client.post('/api/upload', files={'file': ('red.jpeg', f, 'image/jpeg')})
+    assert len(main.asset_registry.paths_for(uploaded['sha256'])) == 2
+
+    response = client.delete(f"/api/assets/{uploaded['sha256']}")
+
+    assert response.status_code == 200
+    assert sorted(response.json()['deleted']) == sorted([f"{uploaded['sha256']}.png", f"{uploaded['sha256']}.jpeg"])
+    assert main.asset_registry.resolve(uploaded['sha256']) is None
+    assert main.asset_store.metadata(uploaded['sha256']) is None
+    assert ExportService.pyramid.manifest(uploaded['file_path']) is None
+    assert client.delete(f"/api/assets/{uploaded['sha256']}").status_code == 404
+
+
+@pytest.mark.parametrize('ref', ['.upload-abc123', '%2Eupload-abc123', 'notes.txt', '.meta', '..%2Fjobs.db'])
+def test_delete_refuses_files_that_are_not_assets(client, export_service, ref):
+    internal = [
+        touch(os.path.join(export_service['uploads'], '.upload-abc123')),
+        touch(os.path.join(export_service['uploads'], 'notes.txt')),
+        touch(os.path.join(os.path.dirname(export_service['uploads']), 'jobs.db')),
+    ]
+
+    assert client.delete(f'/api/assets/{ref}').status_code == 404
+    assert all(os.path.exists(path) for path in internal)
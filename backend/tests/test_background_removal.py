@@ -0,0 +1,244 @@
+"""
+Tests for the background removal engine's session pool and worker threads
+
+rembg's session factory and remove() are replaced with fakes, so no model is
+downloaded and inference is instant unless a test makes it wait.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from services import background_removal
+from services.background_removal import BackgroundRemovalEngine
+
+
+class FakeSession:
+    """Stands in for U2netSession: predict() and the pieces batching uses"""
+
+    def __init__(self, model_name, accepts_batches=True):
+        self.model_name = model_name
+        self.accepts_batches = accepts_batches
+        self.predicted = 0
+        self.batch_sizes = []
+        self.inner_session = self
+
+    def normalize(self, image, mean, std, size):
+        return {'input.1': np.zeros((1, 3) + size, dtype=np.float32)}
+
+    def run(self, output_names, feed):
+        batch = feed['input.1'].shape[0]
+        if not self.accepts_batches and batch > 1:
+            raise ValueError('Got invalid dimensions for input: input.1')
+        self.batch_sizes.append(batch)
+        return [np.random.default_rng(0).random((batch, 1, 320, 320), dtype=np.float32)]
+
+    def predict(self, image):
+        self.predicted += 1
+        return [Image.new('L', image.size, 255)]
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Sessions created by the engine, plus the thread each remove() ran on"""
+
+    created = []
+    removed_on = []
+
+    def fake_new_session(model_name):
+        session = FakeSession(model_name)
+        created.append(session)
+        return session
+
+    def fake_remove(image, session=None):
+        assert session in created
+        removed_on.append(threading.current_thread().name)
+        return image.convert('RGBA')
+
+    monkeypatch.setattr(background_removal, 'new_session', fake_new_session)
+    monkeypatch.setattr(background_removal, 'remove', fake_remove)
+    return {'created': created, 'removed_on': removed_on}
+
+
+@pytest.fixture
+def engine():
+    engine = BackgroundRemovalEngine(sessions=2, batch_size=3)
+    yield engine
+    engine.shutdown()
+
+
+def save_image(path, size=(40, 30)):
+    Image.new('RGB', size, (10, 120, 200)).save(path)
+    return str(path)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_sessions_are_created_once_and_reused(engine, sessions):
+    image = Image.new('RGB', (20, 20))
+
+    for _ in range(5):
+        engine.remove_image(image)
+
+    assert len(sessions['created']) == 1
+    assert engine.stats()['sessions_loaded'] == 1
+
+
+def test_preload_warms_every_session_off_the_caller(engine, sessions):
+    engine.preload()
+
+    wait_for(lambda: engine.stats()['sessions_loaded'] == 2)
+    assert len(sessions['created']) == 2
+
+
+def test_failed_preload_can_be_retried(engine, monkeypatch, sessions):
+    fake_new_session = background_removal.new_session
+    attempts = []
+
+    def failing_new_session(model_name):
+        attempts.append(model_name)
+        raise OSError('model download failed')
+
+    monkeypatch.setattr(background_removal, 'new_session', failing_new_session)
+
+    engine.preload()
+    wait_for(lambda: len(attempts) == 2)
+    wait_for(lambda: engine.stats()['sessions_loaded'] == 0)
+
+    monkeypatch.setattr(background_removal, 'new_session', fake_new_session)
+    engine.remove_image(Image.new('RGB', (20, 20)))
+    assert engine.stats()['sessions_loaded'] == 1
+
+
+def test_remove_file_runs_on_the_worker_pool(engine, sessions, tmp_path):
+    source = save_image(tmp_path / 'pack.jpg')
+    output = str(tmp_path / 'pack_nobg.png')
+
+    cached = asyncio.run(engine.remove_file(source, output))
+
+    assert cached is False
+    assert sessions['removed_on'] and sessions['removed_on'][0].startswith('rembg')
+    with Image.open(output) as result:
+        assert (result.mode, result.size) == ('RGBA', (40, 30))
+
+    stats = engine.stats()
+    assert (stats['completed'], stats['in_flight']) == (1, 0)
+    assert stats['latency_ms']['p50'] is not None
+
+
+def test_event_loop_keeps_running_during_inference(engine, sessions, monkeypatch, tmp_path):
+    release = threading.Event()
+    fake_remove = background_removal.remove
+
+    def slow_remove(image, session=None):
+        release.wait(timeout=5)
+        return fake_remove(image, session=session)
+
+    monkeypatch.setattr(background_removal, 'remove', slow_remove)
+    source = save_image(tmp_path / 'pack.jpg')
+
+    async def scenario():
+        removal = asyncio.create_task(engine.remove_file(source, str(tmp_path / 'out.png')))
+        ticks = 0
+        while ticks < 5:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not removal.done()
+        assert engine.stats()['in_flight'] == 1
+        release.set()
+        await removal
+        return ticks
+
+    assert asyncio.run(scenario()) == 5
+
+
+def test_queue_depth_counts_work_beyond_the_sessions(sessions, monkeypatch, tmp_path):
+    engine = BackgroundRemovalEngine(sessions=1)
+    release = threading.Event()
+    fake_remove = background_removal.remove
+
+    def slow_remove(image, session=None):
+        release.wait(timeout=5)
+        return fake_remove(image, session=session)
+
+    monkeypatch.setattr(background_removal, 'remove', slow_remove)
+    source = save_image(tmp_path / 'pack.jpg')
+
+    async def scenario():
+        removals = [
+            asyncio.create_task(engine.remove_file(source, str(tmp_path / f'out-{n}.png'))) for n in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        stats = engine.stats()
+        release.set()
+        await asyncio.gather(*removals)
+        return stats
+
+    stats = asyncio.run(scenario())
+    engine.shutdown()
+
+    assert (stats['in_flight'], stats['queued']) == (3, 2)
+    assert engine.stats()['completed'] == 3
+
+
+def test_existing_output_skips_inference(engine, sessions, tmp_path):
+    output = save_image(tmp_path / 'done.png')
+
+    assert asyncio.run(engine.remove_file(str(tmp_path / 'missing.jpg'), output)) is True
+    assert sessions['removed_on'] == []
+    assert engine.stats()['cache_hits'] == 1
+
+
+def test_failed_removal_is_counted_and_frees_its_slot(engine, sessions, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(engine.remove_file(str(tmp_path / 'missing.jpg'), str(tmp_path / 'out.png')))
+
+    stats = engine.stats()
+    assert (stats['failed'], stats['in_flight']) == (1, 0)
+    assert not (tmp_path / 'out.png').exists()
+
+
+def test_batch_job_reports_each_image(engine, sessions, tmp_path):
+    items = [(save_image(tmp_path / f'{n}.jpg'), str(tmp_path / f'{n}_nobg.png')) for n in range(4)]
+    items.insert(2, (str(tmp_path / 'missing.jpg'), str(tmp_path / 'missing_nobg.png')))
+
+    job_id = engine.submit_batch(items)
+    wait_for(lambda: engine.get_job(job_id)['status'] == 'completed')
+
+    job = engine.get_job(job_id)
+    assert (job['total'], job['processed'], job['failed']) == (5, 5, 1)
+    assert [result['index'] for result in job['results']] == [0, 1, 2, 3, 4]
+    assert [result['success'] for result in job['results']] == [True, True, False, True, True]
+    for result in job['results']:
+        if result['success']:
+            with Image.open(result['output_path']) as output:
+                assert output.mode == 'RGBA'
+
+    # Batches of three: two readable images, then two more
+    assert sorted(size for session in sessions['created'] for size in session.batch_sizes) == [2, 2]
+
+
+def test_models_without_batch_support_fall_back_to_single_predictions(engine, sessions, monkeypatch, tmp_path):
+    def fixed_batch_session(model_name):
+        session = FakeSession(model_name, accepts_batches=False)
+        sessions['created'].append(session)
+        return session
+
+    monkeypatch.setattr(background_removal, 'new_session', fixed_batch_session)
+    items = [(save_image(tmp_path / f'{n}.jpg'), str(tmp_path / f'{n}_nobg.png')) for n in range(3)]
+
+    job_id = engine.submit_batch(items)
+    wait_for(lambda: engine.get_job(job_id)['status'] == 'completed')
+
+    assert engine.get_job(job_id)['failed'] == 0
+    assert engine.stats()['batched_inference'] is False
+    assert sum(session.predicted for session in sessions['created']) == 3
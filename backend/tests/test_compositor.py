@@ -0,0 +1,174 @@
+"""
+Tests for the layer graph and reuse of cached static layer prefixes
+"""
+
+import os
+
+import pytest
+from PIL import Image, ImageChops
+
+from services.compositor import Compositor
+from services.export_service import ExportService
+
+
+SIZE = (100, 100)
+
+
+def creative(headline='Fresh Products', pack_x=10):
+    return {
+        'format': '1:1',
+        'background_color': '#00539F',
+        'elements': [
+            {'id': 'headline', 'type': 'text', 'text': headline, 'zIndex': 3},
+            {'id': 'pack', 'type': 'packshot', 'src': 'pack.png', 'x': pack_x, 'zIndex': 1},
+            {'id': 'logo', 'type': 'logo', 'src': 'logo.png', 'zIndex': 2},
+            {'id': 'tag', 'type': 'shape', 'zIndex': 4},
+        ],
+    }
+
+
+class Renderer:
+    """Draws each layer as a pixel whose value depends on its key"""
+
+    def __init__(self, compositor, versions=None):
+        self.compositor = compositor
+        self.versions = versions or {}
+        self.drawn = []
+
+    def source_key(self, src):
+        return (src, self.versions.get(src, 1))
+
+    def draw(self, canvas, layer):
+        self.drawn.append(layer.element['id'] if layer.element else 'background')
+        index = int(layer.key[:4], 16) % (SIZE[0] * SIZE[1])
+        color = tuple(int(layer.key[i:i + 2], 16) for i in (0, 2, 4))
+        canvas.putpixel((index % SIZE[0], index // SIZE[0]), color)
+
+    def render(self, creative_data):
+        self.drawn = []
+        layers = self.compositor.build_graph(creative_data, SIZE, 'RGB', self.source_key)
+        return self.compositor.compose(layers, lambda: Image.new('RGB', SIZE, 'white'), self.draw)
+
+
+@pytest.fixture
+def renderer():
+    return Renderer(Compositor())
+
+
+def same_pixels(first, second):
+    return ImageChops.difference(first.convert('RGB'), second.convert('RGB')).getbbox() is None
+
+
+def test_layers_follow_z_order_with_static_flags(renderer):
+    layers = renderer.compositor.build_graph(creative(), SIZE, 'RGB', renderer.source_key)
+
+    assert [(layer.element or {}).get('id', 'background') for layer in layers] == [
+        'background', 'pack', 'logo', 'headline', 'tag',
+    ]
+    assert [layer.static for layer in layers] == [True, True, True, False, True]
+
+
+def test_layer_keys_follow_content_and_source_version(renderer):
+    def keys(creative_data, versions=None):
+        renderer.versions = versions or {}
+        return [layer.key for layer in renderer.compositor.build_graph(creative_data, SIZE, 'RGB', renderer.source_key)]
+
+    base = keys(creative())
+
+    assert keys(creative()) == base
+    assert keys(creative(headline='New')) != base and keys(creative(headline='New'))[:3] == base[:3]
+    assert keys(creative(), {'pack.png': 2})[1] != base[1]
+    assert keys(creative(), {'pack.png': 2})[0] == base[0]
+
+
+def test_only_layers_above_the_static_prefix_are_redrawn(renderer):
+    renderer.render(creative())
+    assert renderer.drawn == ['background', 'pack', 'logo', 'headline', 'tag']
+
+    edited = renderer.render(creative(headline='Summer Range'))
+
+    # The shape above the headline isn't part of the prefix, so it is drawn again
+    assert renderer.drawn == ['headline', 'tag']
+    assert same_pixels(edited, Renderer(Compositor()).render(creative(headline='Summer Range')))
+
+    stats = renderer.compositor.stats()
+    assert (stats['hits'], stats['misses'], stats['layers_reused']) == (1, 1, 3)
+
+
+@pytest.mark.parametrize('change', [
+    lambda r: creative(pack_x=50),
+    lambda r: r.versions.update({'logo.png': 2}) or creative(),
+    lambda r: dict(creative(), background_color='#FFFFFF'),
+])
+def test_changed_static_layers_invalidate_the_prefix(renderer, change):
+    renderer.render(creative())
+
+    renderer.render(change(renderer))
+
+    assert renderer.drawn == ['background', 'pack', 'logo', 'headline', 'tag']
+
+
+def test_cached_prefix_is_not_drawn_on(renderer):
+    first = renderer.render(creative())
+    renderer.render(creative(headline='Other'))
+
+    again = renderer.render(creative())
+
+    assert same_pixels(first, again)
+
+
+def test_canvas_size_and_mode_are_part_of_the_key():
+    compositor = Compositor()
+    renderer = Renderer(compositor)
+    layers = compositor.build_graph(creative(), SIZE, 'RGB', renderer.source_key)
+    rgba_layers = compositor.build_graph(creative(), SIZE, 'RGBA', renderer.source_key)
+
+    assert layers[0].key != rgba_layers[0].key
+    assert compositor._static_prefix(layers)[1] != compositor._static_prefix(rgba_layers)[1]
+
+
+def test_byte_budget_evicts_old_prefixes():
+    renderer = Renderer(Compositor(max_bytes=2 * SIZE[0] * SIZE[1] * 3))
+
+    for x in range(3):
+        renderer.render(creative(pack_x=x))
+    stats = renderer.compositor.stats()
+    assert (stats['entries'], stats['bytes']) == (2, 2 * SIZE[0] * SIZE[1] * 3)
+
+    renderer.render(creative(pack_x=0))
+    assert renderer.drawn[0] == 'background'
+    renderer.render(creative(pack_x=2))
+    assert renderer.drawn[0] == 'headline'
+
+
+def test_canvases_over_budget_are_not_cached():
+    renderer = Renderer(Compositor(max_bytes=100))
+
+    renderer.render(creative())
+    renderer.render(creative())
+
+    assert renderer.drawn[0] == 'background'
+    assert renderer.compositor.stats()['entries'] == 0
+
+
+def test_headline_edits_reuse_the_rendered_packshot(export_service):
+    pack = os.path.join(export_service['uploads'], 'pack.png')
+    Image.new('RGB', (400, 400), (200, 30, 30)).save(pack)
+    creative_data = {
+        'format': '1:1',
+        'background_color': '#00539F',
+        'elements': [
+            {'id': 'pack', 'type': 'packshot', 'src': pack, 'x': 100, 'y': 300, 'width': 400, 'height': 400},
+            {'id': 'headline', 'type': 'text', 'x': 100, 'y': 100, 'text': 'Fresh', 'fontSize': 48,
+             'fill': '#FFFFFF', 'zIndex': 1},
+        ],
+    }
+    edited = dict(creative_data, elements=[creative_data['elements'][0],
+                                           dict(creative_data['elements'][1], text='Summer')])
+
+    ExportService._render_canvas(creative_data, '1:1')
+    reused = ExportService._render_canvas(edited, '1:1')
+
+    assert ExportService.compositor.stats()['layers_reused'] == 2
+    ExportService.compositor.clear()
+    assert same_pixels(reused, ExportService._render_canvas(edited, '1:1'))
@@ -0,0 +1,101 @@
+"""
+Tests for the single-pass copy scanner behind the copy compliance rules
+"""
+
+import pytest
+
+from services.compliance_rules import ComplianceEngine
+from services.copy_scanner import CopyScanner
+
+
+# Copy rule verdicts recorded from the per-rule implementation the scanner
+# replaced. Only failing rules are listed, with the message of their first hit.
+COPY_CASES = [
+    ({'headline': 'Fresh Summer Flavours', 'subhead': 'Taste the season'}, {}),
+    ({'headline': 'Terms and Conditions apply'},
+     {'No T&Cs': "Prohibited T&C text detected: 'terms?\\s+(?:and|&)\\s+conditions?'"}),
+    ({'headline': 'Big savings', 'subhead': 'T & C'},
+     {'No T&Cs': "Prohibited T&C text detected: 't\\s*&\\s*c'"}),
+    ({'headline': 'Enter to win a prize', 'body_text': 'Free entry'},
+     {'No Competitions': "Competition keyword detected: 'win'"}),
+    ({'headline': 'Window cleaning essentials'},
+     {'No Competitions': "Competition keyword detected: 'win'"}),
+    ({'headline': 'ORGANIC GOODNESS', 'subhead': 'Naturally green'},
+     {'No Sustainability Claims': "Sustainability claim detected: 'green'"}),
+    ({'headline': 'Proud charity partner', 'body_text': 'Proceeds go to local schools'},
+     {'No Charity Partnerships': "Charity partnership text detected: 'charity'"}),
+    ({'headline': 'Only £5', 'subhead': '50% off'},
+     {'No Price Call-Outs': "Price call-out detected in copy: '£\\d+'",
+      'No Claims': "Survey/claim reference detected: '\\d+%\\s+of'"}),
+    # Body text is outside the price rule's scope
+    ({'headline': 'Fresh bakes', 'body_text': 'Huge sale on now'}, {}),
+    ({'headline': 'Money-back guarantee', 'subhead': 'Risk free'},
+     {'No Money-Back Guarantees': "Money-back guarantee text detected: 'money-back'"}),
+    ({'headline': 'Best coffee*'},
+     {'No T&Cs': "Prohibited T&C text detected: '\\*'",
+      'No Claims': 'Asterisk detected - claims not allowed'}),
+    ({'headline': 'Scientifically proven', 'subhead': '9 out of 10 cats'},
+     {'No Claims': "Survey/claim reference detected: 'proven'"}),
+    ({'headline': '80% of shoppers agree'},
+     {'No Claims': "Survey/claim reference detected: '\\d+%\\s+of'"}),
+    # Matches spanning two copy fields
+    ({'headline': 'Terms', 'subhead': 'apply'},
+     {'No T&Cs': "Prohibited T&C text detected: 'terms?\\s+apply'"}),
+    ({'headline': 'Café crème', 'subhead': 'RRP £4.50, now £3'},
+     {'No Price Call-Outs': "Price call-out detected in copy: '£\\d+'"}),
+    ({'headline': None, 'subhead': None, 'body_text': None}, {}),
+    ({}, {}),
+    ({'headline': 'Drawn to quality', 'subhead': 'Subject to availability'},
+     {'No T&Cs': "Prohibited T&C text detected: 'subject\\s+to'",
+      'No Competitions': "Competition keyword detected: 'draw'"}),
+    ({'headline': 'Save 20 today', 'body_text': 'Tested by our chefs'},
+     {'No Price Call-Outs': "Price call-out detected in copy: 'save\\s+\\d+'"}),
+    ({'headline': 'Supporting British farmers', 'subhead': 'Giving back to growers'},
+     {'No Charity Partnerships': "Charity partnership text detected: 'supporting'"}),
+    ({'tag_text': 'Only at Tesco', 'headline': 'Deal of the week'},
+     {'No Price Call-Outs': "Price call-out detected in copy: 'deal'"}),
+]
+
+
+@pytest.fixture
+def engine():
+    return ComplianceEngine()
+
+
+@pytest.mark.parametrize('creative_data, expected', COPY_CASES)
+def test_copy_verdicts_match_per_rule_checks(engine, creative_data, expected):
+    result = engine.validate_realtime(creative_data, rule_types=['copy'])
+    issues = {issue['rule']: issue['message'] for issue in result['errors'] + result['warnings']}
+
+    assert issues == expected
+
+
+def test_copy_is_scanned_once_per_validation(engine, monkeypatch):
+    calls = []
+    scan = engine.copy_scanner.scan
+
+    def counting_scan(creative_data):
+        calls.append(creative_data)
+        return scan(creative_data)
+
+    monkeypatch.setattr(engine.copy_scanner, 'scan', counting_scan)
+    engine.validate_all({'headline': 'Win a prize', 'subhead': 'Terms apply'})
+
+    assert len(calls) == 1
+
+
+def test_scanner_dispatches_hits_to_owners():
+    scanner = CopyScanner()
+    scanner.register('prices', [r'£\d+', 'deal'], ['headline', 'subhead'])
+    scanner.register('words', ['win', 'green'], ['headline', 'subhead', 'body_text'], literal=True)
+    scanner.compile()
+
+    result = scanner.scan({'headline': 'Green deal', 'body_text': 'Win £5'})
+
+    assert result.hits_for('prices') == {'deal'}
+    assert result.hits_for('words') == {'green', 'win'}
+
+
+def test_scanner_rejects_non_prefix_fields():
+    with pytest.raises(ValueError):
+        CopyScanner().register('body only', ['deal'], ['body_text'])
@@ -0,0 +1,168 @@
+"""
+Tests for the export cache: keys, hits and misses, and the shared disk budget
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from PIL import Image
+
+from services.export_cache import ExportCache
+from services.export_service import ExportService
+
+
+KB = 1024
+CREATIVE = {'format': '1:1', 'background_color': '#00539F', 'elements': []}
+
+
+def key(n):
+    return ExportCache.make_key(dict(CREATIVE, n=n), {}, {'format': '1:1'})
+
+
+def write(directory, name, size):
+    path = os.path.join(str(directory), name)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def cached_bytes(cache_dir):
+    return sum(
+        os.path.getsize(os.path.join(cache_dir, name))
+        for name in os.listdir(cache_dir) if not name.startswith('.')
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExportCache(str(tmp_path / 'cache'), max_bytes=10 * KB)
+
+
+def test_key_is_canonical():
+    reordered = {'elements': [], 'background_color': '#00539F', 'format': '1:1'}
+
+    assert ExportCache.make_key(CREATIVE, {'a.png': 'x'}, {'format': '1:1'}) == \
+        ExportCache.make_key(reordered, {'a.png': 'x'}, {'format': '1:1'})
+
+
+@pytest.mark.parametrize('creative, sources, output', [
+    (dict(CREATIVE, background_color='#FFFFFF'), {'a.png': 'x'}, {'format': '1:1'}),
+    (CREATIVE, {'a.png': 'y'}, {'format': '1:1'}),
+    (CREATIVE, {'a.png': 'x'}, {'format': '9:16'}),
+])
+def test_key_changes_with_creative_images_and_output(creative, sources, output):
+    assert ExportCache.make_key(creative, sources, output) != \
+        ExportCache.make_key(CREATIVE, {'a.png': 'x'}, {'format': '1:1'})
+
+
+def test_stored_exports_are_fetched(cache, tmp_path):
+    output = write(tmp_path, 'out.jpg', KB)
+    cache.store(key(1), 'JPEG', output)
+
+    assert cache.fetch(key(1), 'JPEG', str(tmp_path / 'again.jpg'))
+    assert (tmp_path / 'again.jpg').read_bytes() == (tmp_path / 'out.jpg').read_bytes()
+    assert cache.read(key(1), 'JPEG') == (tmp_path / 'out.jpg').read_bytes()
+    assert not cache.fetch(key(1), 'PNG', str(tmp_path / 'other.png'))
+    assert not cache.fetch(key(2), 'JPEG', str(tmp_path / 'other.jpg'))
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (2, 2, 1, KB)
+
+
+def test_disabled_cache_never_hits(tmp_path):
+    cache = ExportCache(str(tmp_path / 'cache'), max_bytes=0)
+
+    cache.store_bytes(key(1), 'PNG', b'data')
+
+    assert cache.read(key(1), 'PNG') is None
+    assert not os.path.exists(tmp_path / 'cache')
+
+
+def test_least_recently_used_exports_are_evicted(cache):
+    for n in range(3):
+        cache.store_bytes(key(n), 'PNG', os.urandom(4 * KB))
+        time.sleep(0.01)
+    assert cache.read(key(0), 'PNG') is None
+
+    assert cache.read(key(1), 'PNG') is not None
+    cache.store_bytes(key(3), 'PNG', os.urandom(4 * KB))
+
+    assert cache.read(key(2), 'PNG') is None
+    assert cache.read(key(1), 'PNG') is not None
+    assert cache.stats()['evictions'] == 2
+    assert cached_bytes(cache.cache_dir) <= cache.max_bytes
+
+
+def test_exports_larger_than_the_budget_are_not_cached(cache):
+    cache.store_bytes(key(1), 'PNG', os.urandom(11 * KB))
+
+    assert cache.read(key(1), 'PNG') is None
+
+
+def test_recency_survives_a_restart(cache):
+    for n in range(2):
+        cache.store_bytes(key(n), 'PNG', os.urandom(4 * KB))
+        time.sleep(0.01)
+    cache.read(key(0), 'PNG')
+
+    restarted = ExportCache(cache.cache_dir, max_bytes=cache.max_bytes)
+    restarted.store_bytes(key(2), 'PNG', os.urandom(4 * KB))
+
+    assert restarted.read(key(0), 'PNG') is not None
+    assert restarted.read(key(1), 'PNG') is None
+
+
+def test_budget_holds_across_instances_sharing_a_directory(tmp_path):
+    caches = [ExportCache(str(tmp_path / 'cache'), max_bytes=10 * KB) for _ in range(2)]
+
+    for n in range(6):
+        caches[n % 2].store_bytes(key(n), 'PNG', os.urandom(3 * KB))
+
+    assert cached_bytes(str(tmp_path / 'cache')) <= 10 * KB
+    assert caches[0].read(key(5), 'PNG') is not None
+    assert all(cache.stats()['bytes'] <= 10 * KB for cache in caches)
+
+
+STORE_MANY = """
+import os, sys
+from services.export_cache import ExportCache
+
+cache = ExportCache(sys.argv[1], max_bytes=20 * 1024)
+for n in range(20):
+    cache.store_bytes(f"{sys.argv[2]}{n:062d}", 'PNG', os.urandom(3 * 1024))
+"""
+
+
+def test_budget_holds_across_processes(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    workers = [
+        subprocess.Popen([sys.executable, '-c', STORE_MANY, cache_dir, f'{worker:02d}'], cwd=backend)
+        for worker in range(4)
+    ]
+
+    assert [worker.wait(timeout=60) for worker in workers] == [0] * 4
+    assert 0 < cached_bytes(cache_dir) <= 20 * KB
+
+
+def test_repeat_exports_reuse_the_cached_file(export_service):
+    image = os.path.join(export_service['uploads'], 'pack.png')
+    Image.new('RGB', (200, 200), (200, 30, 30)).save(image)
+    creative = dict(CREATIVE, elements=[{'type': 'packshot', 'src': image, 'x': 100, 'y': 100}])
+    output = os.path.join(export_service['exports'], '{}.jpg')
+
+    first = ExportService.export_creative(creative, '1:1', output.format('first'))
+    second = ExportService.export_creative(creative, '1:1', output.format('second'))
+
+    assert (first['cached'], second['cached']) == (False, True)
+    with open(output.format('first'), 'rb') as a, open(output.format('second'), 'rb') as b:
+        assert a.read() == b.read()
+
+    # New image content behind the same src is a new export
+    time.sleep(0.01)
+    Image.new('RGB', (200, 200), (30, 200, 30)).save(image)
+    assert ExportService.export_creative(creative, '1:1', output.format('third'))['cached'] is False
@@ -0,0 +1,119 @@
+"""
+Tests for the SQLite export job queue
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from services.export_jobs import ExportJobStore, _run_job
+
+
+CREATIVE = {'format': '1:1', 'background_color': '#00539F', 'elements': []}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExportJobStore(str(tmp_path / 'jobs.db'))
+
+
+def test_claim_leases_the_oldest_job(store):
+    first = store.submit(CREATIVE, 'first', ['1:1'], 'JPEG')
+    store.submit(CREATIVE, 'second', ['1:1'], 'JPEG')
+
+    job = store.claim('worker-a', lease_seconds=60)
+
+    assert job['job_id'] == first['job_id']
+    assert job['owner'] == 'worker-a'
+    assert job['filename'] == 'first'
+    assert store.get(first['job_id'])['status'] == 'running'
+
+
+def test_running_job_is_not_claimed_while_leased(store):
+    store.submit(CREATIVE, 'creative', ['1:1'], 'JPEG')
+    store.claim('worker-a', lease_seconds=60)
+
+    assert store.claim('worker-b', lease_seconds=60) is None
+
+
+def test_expired_lease_is_reclaimed_from_scratch(store):
+    submitted = store.submit(CREATIVE, 'creative', ['1:1', '9:16'], 'JPEG')
+    job_id = submitted['job_id']
+    store.claim('worker-a', lease_seconds=-1)
+    store.record_result(job_id, 'worker-a', '1:1', {'success': True})
+
+    reclaimed = store.claim('worker-b', lease_seconds=60)
+
+    assert reclaimed['job_id'] == job_id
+    job = store.get(job_id)
+    assert (job['status'], job['completed'], job['results']) == ('running', 0, {})
+
+
+def test_previous_owner_cannot_write_after_losing_the_lease(store):
+    job_id = store.submit(CREATIVE, 'creative', ['1:1'], 'JPEG')['job_id']
+    store.claim('worker-a', lease_seconds=-1)
+    store.claim('worker-b', lease_seconds=60)
+
+    assert not store.renew(job_id, 'worker-a', 60)
+    store.record_result(job_id, 'worker-a', '1:1', {'success': True})
+    store.finish(job_id, 'worker-a')
+
+    job = store.get(job_id)
+    assert (job['status'], job['completed']) == ('running', 0)
+
+    assert store.renew(job_id, 'worker-b', 60)
+    store.record_result(job_id, 'worker-b', '1:1', {'success': True})
+    store.finish(job_id, 'worker-b')
+    assert store.get(job_id)['status'] == 'completed'
+
+
+def test_finished_jobs_are_not_reclaimed(store):
+    job_id = store.submit(CREATIVE, 'creative', ['1:1'], 'JPEG')['job_id']
+    store.claim('worker-a', lease_seconds=-1)
+    store.finish(job_id, 'worker-a', failed=True, error='boom')
+
+    assert store.claim('worker-b', lease_seconds=60) is None
+    assert store.stats()['failed'] == 1
+
+
+def test_tables_without_lease_columns_are_upgraded(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE export_jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+        "total INTEGER NOT NULL, completed INTEGER NOT NULL DEFAULT 0, results TEXT NOT NULL DEFAULT '{}', "
+        "error TEXT, created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO export_jobs (id, status, payload, total, created_at) VALUES "
+        "('old', 'running', '{\"filename\": \"creative\"}', 1, '2026-01-01T00:00:00')"
+    )
+    conn.commit()
+    conn.close()
+
+    store = ExportJobStore(db_path)
+
+    # Left running by a server without leases: runnable again
+    assert store.claim('worker-a', lease_seconds=60)['job_id'] == 'old'
+
+
+def test_jobs_with_the_default_filename_keep_their_own_files(store, export_service):
+    red = dict(CREATIVE, background_color='#E31837')
+    first = store.submit(CREATIVE, 'creative', ['1:1', '9:16'], 'JPEG')
+    second = store.submit(red, 'creative', ['1:1', '9:16'], 'JPEG')
+
+    for _ in range(2):
+        _run_job(store, store.claim('worker-a', lease_seconds=60), export_service['exports'])
+
+    paths = {}
+    for submitted in (first, second):
+        job = store.get(submitted['job_id'])
+        assert job['status'] == 'completed'
+        paths[submitted['job_id']] = {result['output_path'] for result in job['results'].values()}
+
+    first_paths, second_paths = paths[first['job_id']], paths[second['job_id']]
+    assert len(first_paths) == len(second_paths) == 2
+    assert not first_paths & second_paths
+    for web_path in first_paths | second_paths:
+        assert os.path.exists(os.path.join(export_service['exports'], os.path.basename(web_path)))
@@ -0,0 +1,157 @@
+"""
+Tests for font resolution and memoisation in the font registry
+"""
+
+import os
+
+import pytest
+from PIL import ImageFont
+
+from services.export_service import ExportService
+from services.font_registry import FontRegistry, normalise_weight
+
+
+# Test font files are empty placeholders; their embedded names come from here
+EMBEDDED_NAMES = {
+    'Brand-Regular.ttf': ('Brand', 'Regular'),
+    'Brand-Light.ttf': ('Brand', 'Light'),
+    'Brand-Bold.ttf': ('Brand', 'Bold'),
+    'Brand-Italic.ttf': ('Brand', 'Italic'),
+    'Arial.ttf': ('Arial', 'Regular'),
+    'Plain-Regular.otf': ('Plain', 'Regular'),
+}
+
+
+class FakeFont:
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+    def getname(self):
+        return EMBEDDED_NAMES[os.path.basename(self.path)]
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """(file name, size) of every font file opened"""
+
+    calls = []
+    truetype = ImageFont.truetype
+
+    def fake_truetype(path, size, **kwargs):
+        if not isinstance(path, str):
+            return truetype(path, size, **kwargs)
+        name = os.path.basename(path)
+        if name not in EMBEDDED_NAMES or not os.path.exists(path):
+            raise OSError(f"cannot open resource {path}")
+        calls.append((name, size))
+        return FakeFont(path, size)
+
+    monkeypatch.setattr(ImageFont, 'truetype', fake_truetype)
+    return calls
+
+
+@pytest.fixture
+def font_dir(tmp_path):
+    for name in list(EMBEDDED_NAMES) + ['README.txt', 'broken.ttf']:
+        (tmp_path / name).write_bytes(b'')
+    return tmp_path
+
+
+def face(font):
+    return os.path.basename(font.path)
+
+
+@pytest.mark.parametrize('weight, expected', [
+    (None, 'regular'), ('bold', 'bold'), ('Bold', 'bold'), (700, 'bold'), ('600', 'bold'),
+    ('500', 'regular'), ('normal', 'regular'), ('black', 'bold'),
+])
+def test_css_weights_map_to_regular_or_bold(weight, expected):
+    assert normalise_weight(weight) == expected
+
+
+def test_faces_are_registered_by_their_embedded_names(font_dir, loaded):
+    registry = FontRegistry(str(font_dir))
+
+    stats = registry.stats()
+    assert stats['families'] == ['arial', 'brand', 'plain']
+    assert stats['faces'] == 4
+    assert face(registry.get('Brand', 'regular', 20)) == 'Brand-Regular.ttf'
+    assert face(registry.get('brand', 700, 20)) == 'Brand-Bold.ttf'
+    assert face(registry.get('Plain', size=20)) == 'Plain-Regular.otf'
+
+
+def test_missing_weight_and_family_fall_back(font_dir, loaded):
+    registry = FontRegistry(str(font_dir), default_family='Arial')
+
+    assert face(registry.get('Plain', 'bold', 20)) == 'Plain-Regular.otf'
+    assert face(registry.get('Unknown', size=20)) == 'Arial.ttf'
+    assert face(registry.get(size=20)) == 'Arial.ttf'
+
+
+def test_fonts_are_loaded_once_per_family_weight_and_size(font_dir, loaded):
+    registry = FontRegistry(str(font_dir))
+    del loaded[:]
+
+    first = registry.get('Brand', 'bold', 32)
+
+    assert registry.get('brand', 700, 32) is first
+    assert registry.get('Brand', 'bold', 16) is not first
+    assert registry.get('Brand', 'regular', 32) is not first
+    assert loaded == [('Brand-Bold.ttf', 32), ('Brand-Bold.ttf', 16), ('Brand-Regular.ttf', 32)]
+    assert (registry.hits, registry.misses) == (1, 3)
+
+
+def test_cache_is_bounded_least_recently_used_first(font_dir, loaded):
+    registry = FontRegistry(str(font_dir), max_entries=2)
+
+    small = registry.get('Brand', size=10)
+    registry.get('Brand', size=20)
+    registry.get('Brand', size=10)
+    registry.get('Brand', size=30)
+
+    assert registry.stats()['entries'] == 2
+    assert registry.get('Brand', size=10) is small
+    assert registry.stats()['misses'] == 3
+
+
+def test_missing_font_files_use_the_builtin_font(tmp_path, loaded):
+    registry = FontRegistry(str(tmp_path / 'missing'))
+
+    font = registry.get(size=24)
+
+    assert not isinstance(font, FakeFont)
+    assert registry.stats()['fallbacks'] == 1
+    assert registry.get(size=24) is font
+
+
+def test_fingerprint_changes_with_the_registered_faces(font_dir, loaded):
+    registry = FontRegistry(str(font_dir))
+    before = registry.fingerprint()
+    cached = registry.get('Brand', size=20)
+
+    os.remove(font_dir / 'Brand-Bold.ttf')
+    registry.scan()
+
+    assert registry.fingerprint() != before
+    assert registry.get('Brand', size=20) is not cached
+
+
+def test_renders_reuse_loaded_fonts(export_service, monkeypatch):
+    registry = FontRegistry(os.path.join(export_service['uploads'], 'fonts'))
+    monkeypatch.setattr(ExportService, 'fonts', registry)
+    creative = {
+        'format': '1:1',
+        'background_color': '#FFFFFF',
+        'elements': [
+            {'id': f'line-{n}', 'type': 'text', 'x': 100, 'y': 100 + n * 60, 'width': 800, 'height': 50,
+             'text': f'Line {n}', 'fontSize': 40, 'fill': '#000000'}
+            for n in range(3)
+        ],
+    }
+
+    for format_type in ('1:1', '9:16'):
+        output_path = os.path.join(export_service['exports'], f'creative_{format_type.replace(":", "-")}.png')
+        assert ExportService.export_creative(creative, format_type, output_path, 'PNG')['success']
+
+    assert (registry.misses, registry.hits) == (1, 5)
@@ -0,0 +1,107 @@
+"""
+Tests for the shared element geometry behind the geometric compliance rules
+"""
+
+import random
+
+import pytest
+
+from services.compliance_rules import ComplianceEngine
+from services.geometry import ElementGeometry, rect_gap
+
+
+GEOMETRIC_RULES = {'Value Tile', 'Tesco Tag Position', 'Social Safe Zone', 'Packshot Safe Zone'}
+
+TILE = {'id': 'tile', 'type': 'new', 'x': 20, 'y': 20, 'width': 200, 'height': 200,
+        'position': {'x': 20, 'y': 20}}
+TAG = {'id': 'tag', 'position': {'x': 0, 'y': 1000}, 'width': 300, 'height': 60}
+CTA = {'x': 500, 'y': 500, 'width': 200, 'height': 80}
+
+
+def box(element_id, x, y, width, height, **extra):
+    return {'id': element_id, 'x': x, 'y': y, 'width': width, 'height': height, **extra}
+
+
+# Geometric rule verdicts recorded from the per-element implementation the
+# shared geometry replaced. Only failing rules are listed.
+GEOMETRY_CASES = [
+    ({'format': '1:1', 'elements': []}, {}),
+    ({'format': '1:1', 'value_tile': TILE, 'elements': [dict(TILE), box('a', 500, 500, 100, 100)]}, {}),
+    ({'format': '1:1', 'value_tile': TILE, 'elements': [box('a', 100, 100, 100, 100)]},
+     {'Value Tile': 'Content cannot overlay value tile'}),
+    # Touching edges count as an overlay
+    ({'format': '1:1', 'value_tile': TILE, 'elements': [box('edge', 220, 220, 10, 10)]},
+     {'Value Tile': 'Content cannot overlay value tile'}),
+    ({'format': '1:1', 'value_tile': TILE, 'elements': [box('gap', 221, 20, 10, 10)]}, {}),
+    ({'format': '9:16', 'value_tile': TILE, 'elements': []},
+     {'Value Tile': 'Value tile position cannot be modified'}),
+    ({'format': '1:1', 'value_tile': dict(TILE, type='gold'), 'elements': []},
+     {'Value Tile': 'Invalid value tile type: gold'}),
+    ({'format': '1:1', 'canvas_height': 1080, 'tag': TAG,
+      'elements': [box('tag', 0, 1000, 300, 60), box('p', 400, 900, 100, 150)]}, {}),
+    ({'format': '1:1', 'canvas_height': 1080, 'tag': TAG, 'elements': [box('p', 250, 900, 100, 150)]},
+     {'Tesco Tag Position': 'Content cannot overlay Tesco tag'}),
+    ({'format': '1:1', 'canvas_height': 1080, 'tag': dict(TAG, position={'x': 0, 'y': 500}), 'elements': []},
+     {'Tesco Tag Position': 'Tesco tag must be positioned at bottom of creative'}),
+    ({'format': '9:16', 'canvas_height': 1920, 'elements': [box('ok', 0, 300, 100, 100)]}, {}),
+    ({'format': '9:16', 'canvas_height': 1920,
+      'elements': [box('ok', 0, 300, 100, 100), box('top', 0, 150, 100, 100)]},
+     {'Social Safe Zone': "Element 'top' violates top safe zone (200px)"}),
+    # The first offending element decides the message
+    ({'format': '9:16', 'canvas_height': 1920,
+      'elements': [box('low', 0, 1600, 100, 100), box('top', 0, 10, 1, 1)]},
+     {'Social Safe Zone': "Element 'low' violates bottom safe zone (250px)"}),
+    ({'format': '9:16', 'elements': [{'id': 'nosize', 'y': 1670}]}, {}),
+    ({'format': 'brand', 'cta': CTA, 'elements': [box('p1', 100, 100, 200, 200, type='packshot')]}, {}),
+    ({'format': 'checkout_single', 'cta': CTA, 'elements': [box('p1', 290, 500, 200, 80, type='image')]},
+     {'Packshot Safe Zone': 'Packshot must have minimum 12px gap from CTA (current: 10px)'}),
+    ({'format': 'brand', 'cta': CTA,
+      'elements': [box('p1', 490, 400, 100, 90, type='packshot'), box('t', 500, 500, 10, 10, type='text')]},
+     {'Packshot Safe Zone': 'Packshot must have minimum 24px gap from CTA (current: 10px)'}),
+    ({'format': '1:1', 'cta': CTA, 'elements': [box('p1', 550, 550, 50, 50, type='packshot')]},
+     {'Packshot Safe Zone': 'Packshot must have minimum 24px gap from CTA (current: 0px)'}),
+    ({'format': '1:1', 'cta': {'x': 100, 'y': 100, 'width': 50, 'height': 50},
+      'elements': [box('far', 300, 300, 50, 50, type='packshot'), box('near', 160, 100, 50, 50, type='image')]},
+     {'Packshot Safe Zone': 'Packshot must have minimum 24px gap from CTA (current: 10px)'}),
+]
+
+
+@pytest.mark.parametrize('creative_data, expected', GEOMETRY_CASES)
+def test_geometric_verdicts_match_per_element_checks(creative_data, expected):
+    result = ComplianceEngine().validate_realtime(creative_data)
+    issues = {
+        issue['rule']: issue['message']
+        for issue in result['errors'] + result['warnings']
+        if issue['rule'] in GEOMETRIC_RULES
+    }
+
+    assert issues == expected
+
+
+def _random_bounds(rng):
+    return {'x': rng.randint(0, 100), 'y': rng.randint(0, 100),
+            'width': rng.randint(0, 40), 'height': rng.randint(0, 40)}
+
+
+def test_vectorised_overlaps_and_gaps_match_scalar_checks():
+    rng = random.Random(7)
+    elements = [dict(_random_bounds(rng), id=str(i)) for i in range(200)]
+    geometry = ElementGeometry(elements)
+
+    for _ in range(20):
+        bounds = _random_bounds(rng)
+        expected_overlaps = [
+            not (bounds['x'] + bounds['width'] < e['x'] or e['x'] + e['width'] < bounds['x'] or
+                 bounds['y'] + bounds['height'] < e['y'] or e['y'] + e['height'] < bounds['y'])
+            for e in elements
+        ]
+
+        assert geometry.overlaps(bounds).tolist() == expected_overlaps
+        assert geometry.gaps(bounds).tolist() == [rect_gap(e, bounds) for e in elements]
+
+
+def test_overlaps_excludes_the_reference_element():
+    geometry = ElementGeometry([box('self', 0, 0, 10, 10), box('other', 5, 5, 10, 10)])
+
+    assert geometry.overlaps({'x': 0, 'y': 0, 'width': 10, 'height': 10}, exclude_id='self').tolist() == [False, True]
+    assert ElementGeometry.first(geometry.type_mask(['packshot'])) is None
@@ -0,0 +1,110 @@
+"""
+Tests for image opacity and alpha compositing onto RGB and RGBA canvases
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from services.asset_cache import AssetCache
+from services.export_service import ExportService
+
+
+def save(directory, name, image):
+    path = os.path.join(directory, name)
+    image.save(path)
+    return path
+
+
+@pytest.fixture
+def cutout(export_service):
+    """Red square whose left half is transparent and right half 80% opaque"""
+
+    image = Image.new('RGBA', (40, 40), (255, 0, 0, 200))
+    image.paste((0, 0, 0, 0), (0, 0, 20, 40))
+    return save(export_service['uploads'], 'cutout.png', image)
+
+
+@pytest.fixture
+def opaque(export_service):
+    return save(export_service['uploads'], 'opaque.png', Image.new('RGB', (40, 40), (255, 0, 0)))
+
+
+def render(canvas, src, **element):
+    ExportService._render_image(canvas, dict({'type': 'image', 'src': src, 'width': 40, 'height': 40}, **element))
+    return canvas
+
+
+def test_opacity_scales_existing_alpha(cutout):
+    cache = AssetCache()
+
+    faded = cache.get_variant(cutout, 40, 40, opacity=0.5)
+
+    assert faded.getpixel((5, 20))[3] == 0
+    assert faded.getpixel((30, 20)) == (255, 0, 0, 100)
+    assert cache.get_variant(cutout, 40, 40).getpixel((30, 20))[3] == 200
+
+
+def test_rotated_corners_stay_transparent_when_faded(opaque):
+    faded = AssetCache().get_variant(opaque, 40, 40, rotation=45, opacity=0.5)
+
+    assert faded.getpixel((0, 0))[3] == 0
+    assert faded.getpixel((faded.width // 2, faded.height // 2))[3] == 128
+
+
+def test_faded_image_blends_into_an_rgb_canvas(opaque):
+    canvas = render(Image.new('RGB', (60, 60), 'white'), opaque, opacity=0.5)
+
+    assert canvas.getpixel((20, 20)) == (255, 127, 127)
+    assert canvas.getpixel((50, 50)) == (255, 255, 255)
+
+
+@pytest.mark.parametrize('opacity, pixel', [(0.0, (255, 255, 255)), (1.5, (255, 0, 0))])
+def test_opacity_is_clamped(opaque, opacity, pixel):
+    canvas = render(Image.new('RGB', (60, 60), 'white'), opaque, opacity=opacity)
+
+    assert canvas.getpixel((20, 20)) == pixel
+
+
+def test_transparent_pixels_leave_an_rgb_canvas_untouched(cutout):
+    canvas = render(Image.new('RGB', (60, 60), (0, 0, 255)), cutout, opacity=0.5)
+
+    assert canvas.getpixel((5, 20)) == (0, 0, 255)
+    assert canvas.getpixel((30, 20)) == (100, 0, 155)
+
+
+def test_rgba_canvas_keeps_its_alpha_under_translucent_images(cutout):
+    canvas = render(Image.new('RGBA', (60, 60), (0, 0, 255, 255)), cutout, opacity=0.5)
+
+    # A masked paste would set alpha to the image alpha here
+    assert canvas.getpixel((5, 20)) == (0, 0, 255, 255)
+    assert canvas.getpixel((30, 20)) == (100, 0, 155, 255)
+
+
+def test_rgba_canvas_alpha_is_porter_duff_over(cutout):
+    canvas = render(Image.new('RGBA', (60, 60), (0, 0, 255, 128)), cutout)
+
+    red, green, blue, alpha = canvas.getpixel((30, 20))
+
+    # 200 + 128 * (1 - 200/255) ~= 228, with the colour weighted by coverage
+    assert abs(alpha - 228) <= 1
+    assert red > blue > 0 and green == 0
+    assert canvas.getpixel((5, 20)) == (0, 0, 255, 128)
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'RGBA'])
+def test_negative_positions_draw_the_visible_part(opaque, mode):
+    canvas = render(Image.new(mode, (60, 60), 'white'), opaque, x=-30, y=-10)
+
+    assert canvas.getpixel((9, 29))[:3] == (255, 0, 0)
+    assert canvas.getpixel((10, 10))[:3] == (255, 255, 255)
+    assert canvas.getpixel((5, 30))[:3] == (255, 255, 255)
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'RGBA'])
+@pytest.mark.parametrize('position', [(-40, 0), (0, -50), (60, 0), (100, 100)])
+def test_offscreen_images_are_skipped(opaque, mode, position):
+    canvas = render(Image.new(mode, (60, 60), 'white'), opaque, x=position[0], y=position[1])
+
+    assert canvas.getcolors() == [(3600, Image.new(mode, (1, 1), 'white').getpixel((0, 0)))]
@@ -0,0 +1,137 @@
+"""
+Tests for pyramid levels of uploaded images and picking one per render
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from services.export_service import ExportService
+from services.image_pyramid import ImagePyramid
+
+
+DIGEST = 'ab' * 32
+
+
+@pytest.fixture
+def pyramid(tmp_path):
+    return ImagePyramid(str(tmp_path))
+
+
+def save_image(path, size, mode='RGB', **kwargs):
+    Image.new(mode, size, (200, 30, 30) if mode == 'RGB' else 0).save(path, **kwargs)
+    return str(path)
+
+
+def test_only_levels_below_the_source_size_are_written(pyramid, tmp_path):
+    source = save_image(tmp_path / f'{DIGEST}.png', (1500, 1000))
+
+    manifest = pyramid.build(source)
+
+    assert (manifest['width'], manifest['height'], manifest['mode']) == (1500, 1000, 'RGB')
+    assert manifest['levels'] == [
+        {'level': 1024, 'width': 1024, 'height': 683},
+        {'level': 512, 'width': 512, 'height': 342},
+        {'level': 256, 'width': 256, 'height': 171},
+    ]
+    for level in manifest['levels']:
+        with Image.open(pyramid.level_path(source, level['level'])) as image:
+            assert image.size == (level['width'], level['height'])
+
+
+@pytest.mark.parametrize('target, expected', [
+    ((100, 60), 256),
+    ((256, 171), 256),
+    ((257, 100), 512),
+    ((500, 341), 512),
+    ((600, 300), 1024),
+    ((1024, 683), 1024),
+    ((1100, 700), None),
+    ((100, 700), None),
+])
+def test_smallest_covering_level_is_selected(pyramid, tmp_path, target, expected):
+    source = save_image(tmp_path / f'{DIGEST}.png', (1500, 1000))
+    pyramid.build(source)
+
+    selected = pyramid.select(source, *target)
+
+    assert selected == (pyramid.level_path(source, expected) if expected else None)
+
+
+def test_source_without_a_pyramid_is_used_directly(pyramid, tmp_path):
+    source = save_image(tmp_path / 'logo.png', (800, 800))
+
+    assert pyramid.manifest(source) is None
+    assert pyramid.select(source, 10, 10) is None
+
+
+def test_deleted_level_falls_back_to_the_source(pyramid, tmp_path):
+    source = save_image(tmp_path / f'{DIGEST}.png', (1500, 1000))
+    pyramid.build(source)
+
+    os.remove(pyramid.level_path(source, 256))
+
+    assert pyramid.select(source, 100, 60) is None
+
+
+def test_manifest_is_read_back_by_a_new_instance(pyramid, tmp_path):
+    source = save_image(tmp_path / f'{DIGEST}.png', (600, 400))
+    manifest = pyramid.build(source)
+
+    reloaded = ImagePyramid(str(tmp_path))
+
+    assert reloaded.manifest(source) == manifest
+    assert reloaded.select(source, 200, 100) == pyramid.level_path(source, 256)
+
+
+def test_content_addressed_files_share_one_pyramid(pyramid, tmp_path):
+    jpg = save_image(tmp_path / f'{DIGEST}.jpg', (600, 400), format='JPEG')
+    pyramid.build(jpg)
+
+    assert pyramid.select(str(tmp_path / f'{DIGEST}.jpeg'), 200, 100) == pyramid.level_path(jpg, 256)
+
+
+def test_exif_orientation_and_transparency_are_normalised(pyramid, tmp_path):
+    image = Image.new('RGB', (600, 300))
+    exif = image.getexif()
+    exif[0x0112] = 6  # Rotated 90 degrees
+    rotated = str(tmp_path / 'rotated.jpg')
+    image.save(rotated, exif=exif)
+
+    transparent = save_image(tmp_path / 'transparent.gif', (600, 300), mode='P', transparency=0)
+
+    assert pyramid.build(rotated)['width'] == 300
+    assert pyramid.build(transparent)['mode'] == 'RGBA'
+    with Image.open(pyramid.level_path(transparent, 256)) as level:
+        assert level.mode == 'RGBA'
+
+
+def test_remove_deletes_every_level_and_the_manifest(pyramid, tmp_path):
+    source = save_image(tmp_path / f'{DIGEST}.png', (1500, 1000))
+    pyramid.build(source)
+
+    pyramid.remove(source)
+
+    assert pyramid.manifest(source) is None
+    assert os.listdir(pyramid.pyramid_dir) == []
+
+
+def test_renders_resample_from_the_nearest_level(export_service, monkeypatch):
+    source = save_image(os.path.join(export_service['uploads'], f'{DIGEST}.png'), (3000, 2000))
+    ExportService.pyramid.build(source)
+    resampled_from = []
+    get_variant = ExportService.asset_cache.get_variant
+
+    def recording_get_variant(path, *args, **kwargs):
+        resampled_from.append(path)
+        return get_variant(path, *args, **kwargs)
+
+    monkeypatch.setattr(ExportService.asset_cache, 'get_variant', recording_get_variant)
+
+    small = ExportService._scaled_image(source, 300, 200)
+    large = ExportService._scaled_image(source, 2500, 1600)
+
+    assert (small.size, large.size) == ((300, 200), (2500, 1600))
+    assert resampled_from == [ExportService.pyramid.level_path(source, 512), source]
+    assert ExportService._source_size(source) == (3000, 2000)
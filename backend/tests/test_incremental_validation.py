@@ -0,0 +1,101 @@
+"""
+Tests for incremental, per-session compliance validation
+"""
+
+import copy
+
+import pytest
+
+from services.compliance_rules import ComplianceEngine
+
+
+CREATIVE = {
+    'format': '9:16',
+    'canvas_height': 1920,
+    'background_color': '#FFFFFF',
+    'headline': 'Fresh Summer Flavours',
+    'subhead': 'Taste the season',
+    'elements': [
+        {'id': 'headline', 'type': 'text', 'x': 100, 'y': 400, 'width': 800, 'height': 100,
+         'fontSize': 48, 'fill': '#000000'},
+        {'id': 'pack', 'type': 'packshot', 'x': 300, 'y': 700, 'width': 400, 'height': 400},
+    ],
+}
+
+COPY_RULES = {
+    'No T&Cs', 'No Competitions', 'No Sustainability Claims', 'No Charity Partnerships',
+    'No Price Call-Outs', 'No Money-Back Guarantees', 'No Claims',
+}
+# Rules that read element x coordinates
+X_RULES = {'Value Tile', 'Tesco Tag Position', 'Packshot Safe Zone'}
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = ComplianceEngine()
+    engine.checked = []
+    check = engine._check
+
+    def recording_check(rule, context):
+        engine.checked.append(rule.name)
+        return check(rule, context)
+
+    monkeypatch.setattr(engine, '_check', recording_check)
+    return engine
+
+
+def test_first_validation_runs_every_rule(engine):
+    engine.validate_all(CREATIVE, session_id='s1')
+
+    assert sorted(engine.checked) == sorted(rule.name for rule in engine.rules)
+
+
+def test_moving_an_element_reruns_only_geometry_rules(engine):
+    engine.validate_all(CREATIVE, session_id='s1')
+    engine.checked.clear()
+
+    moved = copy.deepcopy(CREATIVE)
+    moved['elements'][1]['x'] = 320
+    engine.validate_all(moved, session_id='s1')
+
+    assert set(engine.checked) == X_RULES
+
+
+def test_editing_copy_reruns_only_copy_rules(engine):
+    engine.validate_all(CREATIVE, session_id='s1')
+    engine.checked.clear()
+
+    edited = dict(CREATIVE, subhead='Taste the season today')
+    engine.validate_all(edited, session_id='s1')
+
+    assert set(engine.checked) == COPY_RULES
+
+
+def test_sessions_do_not_share_verdicts(engine):
+    engine.validate_all(CREATIVE, session_id='s1')
+    engine.checked.clear()
+
+    edited = dict(CREATIVE, headline='Fresh Autumn Flavours')
+    engine.validate_all(edited, session_id='s2')
+
+    assert len(engine.checked) == len(engine.rules)
+
+
+def test_incremental_results_match_full_validation(engine):
+    engine.validate_all(CREATIVE, session_id='s1')
+
+    edited = copy.deepcopy(CREATIVE)
+    edited['headline'] = 'Win a prize'
+    edited['elements'][0]['y'] = 50
+    incremental = engine.validate_all(edited, session_id='s1')
+
+    assert incremental == ComplianceEngine().validate_all(edited)
+    assert {issue['rule'] for issue in incremental['errors']} == {'No Competitions', 'Social Safe Zone'}
+
+
+def test_session_store_is_bounded():
+    engine = ComplianceEngine(max_sessions=2)
+    for session_id in ('a', 'b', 'c'):
+        engine.validate_all(dict(CREATIVE, headline=session_id), session_id=session_id)
+
+    assert list(engine._sessions) == ['b', 'c']
@@ -0,0 +1,105 @@
+"""
+Tests for JPEG quality bisection under the export size limit
+"""
+
+import io
+import math
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from services.export_service import ExportService
+
+
+MAX_KB = ExportService.JPEG_MAX_KB
+
+
+def noisy_image(sigma: float, size=(1080, 1080), seed=1) -> Image.Image:
+    """Gradient with Gaussian noise; larger sigma needs lower quality to fit"""
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 255, width)[None, :, None].repeat(height, 0).repeat(3, 2)
+    pixels = np.clip(gradient + rng.normal(0, sigma, (height, width, 3)), 0, 255).astype('uint8')
+    return Image.fromarray(pixels)
+
+
+@pytest.fixture
+def full_size_encodes(monkeypatch):
+    """Qualities of every full-size encode, excluding the predictor's trial encodes"""
+
+    qualities = []
+    encode = ExportService._encode_jpeg
+
+    def recording_encode(image, quality):
+        if image.width >= 1080:
+            qualities.append(quality)
+        return encode(image, quality)
+
+    monkeypatch.setattr(ExportService, '_encode_jpeg', staticmethod(recording_encode))
+    return qualities
+
+
+@pytest.mark.parametrize('sigma', [10, 20, 40, 80])
+def test_result_fits_and_quality_is_the_highest_that_fits(sigma):
+    image = noisy_image(sigma)
+
+    data, quality = ExportService._encode_jpeg_to_size(image, MAX_KB)
+
+    assert len(data) <= MAX_KB * 1024
+    assert ExportService.JPEG_QUALITY_MIN <= quality <= ExportService.JPEG_QUALITY_MAX
+    assert Image.open(io.BytesIO(data)).format == 'JPEG'
+    if quality < ExportService.JPEG_QUALITY_MAX:
+        assert len(ExportService._encode_jpeg(image, quality + 1)) > MAX_KB * 1024
+
+
+def test_image_that_fits_at_top_quality_is_encoded_once(full_size_encodes):
+    _, quality = ExportService._encode_jpeg_to_size(Image.new('RGB', (1080, 1080), '#00539F'), MAX_KB)
+
+    assert quality == ExportService.JPEG_QUALITY_MAX
+    assert full_size_encodes == [ExportService.JPEG_QUALITY_MAX]
+
+
+@pytest.mark.parametrize('sigma', [20, 40, 80])
+def test_search_needs_only_a_few_full_size_encodes(sigma, full_size_encodes):
+    ExportService._encode_jpeg_to_size(noisy_image(sigma), MAX_KB)
+
+    # Top quality, the prediction and its bracket, then bisection of what is
+    # left; the old step-down loop could take 14 encodes
+    span = ExportService.JPEG_QUALITY_MAX - ExportService.JPEG_QUALITY_MIN
+    assert len(full_size_encodes) <= 3 + math.ceil(math.log2(span))
+    assert len(set(full_size_encodes)) == len(full_size_encodes)
+
+
+def test_unreachable_limit_falls_back_to_minimum_quality():
+    data, quality = ExportService._encode_jpeg_to_size(noisy_image(80), max_size_kb=10)
+
+    assert quality == ExportService.JPEG_QUALITY_MIN
+    assert data == ExportService._encode_jpeg(noisy_image(80), ExportService.JPEG_QUALITY_MIN)
+
+
+def test_transparency_is_flattened_onto_white():
+    image = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
+
+    data, _ = ExportService._encode_jpeg_to_size(image, MAX_KB)
+
+    assert Image.open(io.BytesIO(data)).convert('RGB').getpixel((32, 32)) == (255, 255, 255)
+
+
+def test_export_writes_the_searched_bytes(export_service, monkeypatch):
+    encoded = []
+    encode_to_size = ExportService._encode_jpeg_to_size
+
+    def recording_encode_to_size(image, max_size_kb=MAX_KB):
+        result = encode_to_size(image, max_size_kb)
+        encoded.append(result[0])
+        return result
+
+    monkeypatch.setattr(ExportService, '_encode_jpeg_to_size', staticmethod(recording_encode_to_size))
+    output_path = f"{export_service['exports']}/creative.jpg"
+    result = ExportService.export_creative({'format': '1:1', 'elements': []}, '1:1', output_path)
+
+    assert result['success']
+    with open(output_path, 'rb') as f:
+        assert [f.read()] == encoded
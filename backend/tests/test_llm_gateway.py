@@ -0,0 +1,255 @@
+"""
+Tests for the LLM gateway against a local stub of the Gemini REST API
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from services.llm_gateway import LLMGateway
+
+
+STATUS_NAMES = {400: 'INVALID_ARGUMENT', 429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE'}
+
+
+class StubGemini:
+    """
+    generateContent endpoint answering "echo: <prompt>"
+
+    Requests wait `delay` seconds before answering. Statuses queued in
+    `failures` are returned, one per request, before answers resume.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.failures = deque()
+        self.delay = 0.0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.handle(self, body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def handle(self, handler, body):
+        prompt = body['contents'][0]['parts'][0]['text']
+
+        with self._lock:
+            self.requests.append({'path': handler.path, 'prompt': prompt,
+                                  'api_key': handler.headers.get('x-goog-api-key')})
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            failure = self.failures.popleft() if self.failures else None
+
+        try:
+            time.sleep(self.delay)
+            if failure is None:
+                status, headers = 200, {}
+                payload = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': f'echo: {prompt}'}]},
+                                           'finishReason': 'STOP', 'index': 0}]}
+            else:
+                status, headers = failure if isinstance(failure, tuple) else (failure, {})
+                payload = {'error': {'code': status, 'message': 'stub failure', 'status': STATUS_NAMES[status]}}
+
+            data = json.dumps(payload).encode()
+            handler.send_response(status)
+            handler.send_header('Content-Type', 'application/json')
+            handler.send_header('Content-Length', str(len(data)))
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.end_headers()
+            handler.wfile.write(data)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def prompts(self):
+        return [request['prompt'] for request in self.requests]
+
+
+@pytest.fixture
+def stub():
+    stub = StubGemini()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+@pytest.fixture
+def make_gateway(stub):
+    gateways = []
+
+    def make(**kwargs):
+        options = {'api_key': 'test-key', 'endpoint': stub.endpoint, 'retry_base_seconds': 0.01}
+        options.update(kwargs)
+        gateway = LLMGateway(**options)
+        gateways.append(gateway)
+        return gateway
+
+    yield make
+
+    for gateway in gateways:
+        gateway.shutdown()
+
+
+def test_prompt_is_sent_to_the_configured_endpoint(stub, make_gateway):
+    gateway = make_gateway(model_name='gemini-test')
+
+    assert asyncio.run(gateway.generate('Fresh Products')) == 'echo: Fresh Products'
+
+    request, = stub.requests
+    assert request['path'].startswith('/v1beta/models/gemini-test:generateContent')
+    assert request['api_key'] == 'test-key'
+
+
+def test_concurrent_identical_prompts_share_one_call(stub, make_gateway):
+    gateway = make_gateway()
+    stub.delay = 0.2
+
+    async def burst():
+        return await asyncio.gather(*[gateway.generate('Same headline') for _ in range(10)])
+
+    assert asyncio.run(burst()) == ['echo: Same headline'] * 10
+    assert stub.prompts() == ['Same headline']
+    assert (gateway.stats()['calls'], gateway.stats()['coalesced']) == (1, 9)
+
+
+def test_failed_call_reaches_every_waiter_and_is_not_cached(stub, make_gateway):
+    gateway = make_gateway()
+    stub.delay = 0.2
+    stub.failures.append(400)
+
+    async def burst():
+        return await asyncio.gather(*[gateway.generate('Bad') for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    assert all(isinstance(result, api_exceptions.BadRequest) for result in results)
+    assert stub.prompts() == ['Bad']
+    assert asyncio.run(gateway.generate('Bad')) == 'echo: Bad'
+
+
+def test_responses_are_cached_until_the_ttl_expires(stub, make_gateway):
+    gateway = make_gateway(ttl_seconds=0.3)
+
+    async def ask_twice():
+        return [await gateway.generate('Cached'), await gateway.generate('Cached')]
+
+    assert asyncio.run(ask_twice()) == ['echo: Cached'] * 2
+    assert stub.prompts() == ['Cached']
+    assert gateway.stats()['cache_hits'] == 1
+
+    time.sleep(0.35)
+    asyncio.run(gateway.generate('Cached'))
+    assert stub.prompts() == ['Cached', 'Cached']
+
+
+def test_cache_keeps_the_most_recent_prompts(stub, make_gateway):
+    gateway = make_gateway(cache_size=2)
+
+    async def ask(*prompts):
+        for prompt in prompts:
+            await gateway.generate(prompt)
+
+    asyncio.run(ask('a', 'b', 'a', 'c', 'a', 'b'))
+
+    assert stub.prompts() == ['a', 'b', 'c', 'b']
+    assert gateway.stats()['cache_entries'] == 2
+
+
+def test_concurrent_calls_are_capped_at_max_workers(stub, make_gateway):
+    gateway = make_gateway(max_workers=2)
+    stub.delay = 0.1
+
+    async def burst():
+        return await asyncio.gather(*[gateway.generate(f'Prompt {n}') for n in range(6)])
+
+    results = asyncio.run(burst())
+
+    assert results == [f'echo: Prompt {n}' for n in range(6)]
+    assert stub.peak == 2
+    assert len(stub.requests) == 6
+
+
+def test_rate_limits_and_server_errors_are_retried(stub, make_gateway):
+    gateway = make_gateway(max_retries=3)
+    stub.failures.extend([429, 503, 500])
+
+    assert asyncio.run(gateway.generate('Retry me')) == 'echo: Retry me'
+    assert stub.prompts() == ['Retry me'] * 4
+
+    stats = gateway.stats()
+    assert (stats['calls'], stats['retries'], stats['errors']) == (4, 3, 0)
+
+
+def test_retries_give_up_after_max_retries(stub, make_gateway):
+    gateway = make_gateway(max_retries=1)
+    stub.failures.extend([503, 503, 503])
+
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        asyncio.run(gateway.generate('Down'))
+
+    assert stub.prompts() == ['Down'] * 2
+    assert (gateway.stats()['errors'], gateway.stats()['cache_entries']) == (1, 0)
+
+
+def test_client_errors_are_not_retried(stub, make_gateway):
+    gateway = make_gateway(max_retries=3)
+    stub.failures.append(400)
+
+    with pytest.raises(api_exceptions.BadRequest):
+        asyncio.run(gateway.generate('Invalid'))
+
+    assert stub.prompts() == ['Invalid']
+    assert gateway.stats()['retries'] == 0
+
+
+def test_backoff_waits_between_attempts(stub, make_gateway):
+    gateway = make_gateway(max_retries=2, retry_base_seconds=0.1, retry_max_seconds=1.0)
+    stub.failures.extend([429, 429])
+
+    started = time.monotonic()
+    asyncio.run(gateway.generate('Slow down'))
+
+    # Jittered between half and all of 0.1s, then of 0.2s
+    assert time.monotonic() - started >= 0.15
+
+
+def test_retry_after_is_honoured_up_to_the_maximum(stub, make_gateway):
+    gateway = make_gateway(max_retries=1, retry_max_seconds=0.3)
+    stub.failures.append((429, {'Retry-After': '30'}))
+
+    started = time.monotonic()
+    assert asyncio.run(gateway.generate('Busy')) == 'echo: Busy'
+
+    assert 0.3 <= time.monotonic() - started < 5
+
+
+@pytest.mark.parametrize('attempt, bounds', [(0, (0.25, 0.5)), (2, (1.0, 2.0)), (6, (2.5, 5.0))])
+def test_backoff_doubles_with_jitter_up_to_the_maximum(attempt, bounds):
+    gateway = LLMGateway(retry_base_seconds=0.5, retry_max_seconds=5.0)
+    error = SimpleNamespace(response=SimpleNamespace(headers={}))
+
+    delays = [gateway._retry_delay(attempt, error) for _ in range(50)]
+
+    assert all(bounds[0] <= delay <= bounds[1] for delay in delays)
+    assert len(set(delays)) > 1
+    gateway.shutdown()
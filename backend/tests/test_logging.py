@@ -0,0 +1,158 @@
+"""
+Tests for structured JSON logging and element log sampling
+"""
+
+import atexit
+import io
+import json
+import logging
+import random
+import sys
+import threading
+
+import pytest
+
+from utils import log
+from utils.log import ELEMENT_LOGGERS, JsonFormatter, SampleFilter, StructuredQueueHandler, setup_logging
+
+
+def make_record(msg='Rendered %s', args=('headline',), exc_info=None, **extra):
+    record = logging.getLogger('services.export_service').makeRecord(
+        'services.export_service', logging.INFO, __file__, 1, msg, args, exc_info
+    )
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def boom():
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        return sys.exc_info()
+
+
+class CapturedLogging:
+    """setup_logging with stdout swapped for a buffer while it runs"""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.buffer = io.StringIO()
+
+    def setup(self, **kwargs):
+        # Patched here, not in the fixture: pytest resets sys.stdout between phases
+        with self.monkeypatch.context() as patch:
+            patch.setattr(sys, 'stdout', self.buffer)
+            setup_logging(**kwargs)
+
+    def entries(self):
+        log._listener.stop()
+        return [json.loads(line) for line in self.buffer.getvalue().splitlines()]
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    """Logging set up from scratch, root and element loggers restored afterwards"""
+
+    root = logging.getLogger()
+    saved = (root.level, root.handlers[:])
+    saved_filters = {name: logging.getLogger(name).filters[:] for name in ELEMENT_LOGGERS}
+    monkeypatch.setattr(log, '_listener', None)
+
+    yield CapturedLogging(monkeypatch)
+
+    if log._listener is not None:
+        if log._listener._thread is not None:
+            log._listener.stop()
+        atexit.unregister(log._listener.stop)
+    root.setLevel(saved[0])
+    root.handlers = saved[1]
+    for name, filters in saved_filters.items():
+        logging.getLogger(name).filters = filters
+
+
+def test_records_are_formatted_as_one_json_object():
+    entry = json.loads(JsonFormatter().format(make_record(format='1:1', size=(1080, 1080))))
+
+    assert entry['level'] == 'info'
+    assert entry['logger'] == 'services.export_service'
+    assert entry['message'] == 'Rendered headline'
+    assert (entry['format'], entry['size']) == ('1:1', [1080, 1080])
+    assert entry['ts'].endswith('+00:00')
+    assert 'args' not in entry and 'lineno' not in entry
+
+
+def test_values_json_cannot_encode_are_stringified():
+    entry = json.loads(JsonFormatter().format(make_record(path=object)))
+
+    assert entry['path'] == "<class 'object'>"
+
+
+def test_queued_records_keep_message_and_traceback_as_text():
+    record = make_record(exc_info=boom())
+
+    prepared = StructuredQueueHandler(None).prepare(record)
+
+    assert (prepared.msg, prepared.args, prepared.exc_info) == ('Rendered headline', None, None)
+    assert 'ZeroDivisionError' in prepared.exc_text
+    assert record.exc_info is not None
+
+    entry = json.loads(JsonFormatter().format(prepared))
+    assert 'ZeroDivisionError' in entry['exc_info']
+
+
+@pytest.mark.parametrize('rate, expected', [(0.0, 0), (1.0, 1000), (1.5, 1000)])
+def test_sample_filter_extremes(rate, expected):
+    sample = SampleFilter(rate)
+
+    assert sum(sample.filter(make_record()) for _ in range(1000)) == expected
+
+
+def test_sample_filter_keeps_about_the_rate(monkeypatch):
+    monkeypatch.setattr(log, 'random', random.Random(7))
+    sample = SampleFilter(0.1)
+
+    kept = sum(sample.filter(make_record()) for _ in range(10_000))
+
+    assert 800 < kept < 1200
+
+
+def test_logging_goes_through_the_queue_as_json(captured):
+    captured.setup(debug=False)
+    logger = logging.getLogger('services.export_service')
+
+    thread = threading.Thread(target=lambda: logger.info("Exported %s", '1:1', extra={'bytes': 1234}))
+    thread.start()
+    thread.join()
+    logger.debug("Dropped below INFO")
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("Render failed")
+
+    entries = captured.entries()
+    assert [entry['message'] for entry in entries] == ['Exported 1:1', 'Render failed']
+    assert entries[0]['bytes'] == 1234
+    assert 'ZeroDivisionError' in entries[1]['exc_info']
+    assert isinstance(logging.getLogger().handlers[0], StructuredQueueHandler)
+
+
+def test_element_records_are_sampled_in_debug_mode(captured):
+    captured.setup(debug=True, element_sample_rate=0.0)
+
+    logging.getLogger(ELEMENT_LOGGERS[0]).debug("Rendering text")
+    logging.getLogger('services.export_service').debug("Rendering creative")
+
+    assert [entry['message'] for entry in captured.entries()] == ['Rendering creative']
+
+
+def test_setup_can_be_called_again(captured):
+    captured.setup(debug=False)
+    listener = log._listener
+
+    captured.setup(debug=True, element_sample_rate=0.5)
+
+    assert log._listener is listener
+    assert len(logging.getLogger().handlers) == 1
+    assert logging.getLogger().level == logging.DEBUG
+    assert [f.rate for f in logging.getLogger(ELEMENT_LOGGERS[1]).filters] == [0.5]
@@ -0,0 +1,132 @@
+"""
+Tests for concurrent multi-format export
+"""
+
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from services.export_service import ExportService
+from services.render_executor import RenderExecutor, RenderQueueFull
+
+
+CREATIVE = {
+    'format': '1:1',
+    'background_color': '#00539F',
+    'elements': [
+        {'id': 'headline', 'type': 'text', 'x': 100, 'y': 100, 'width': 800, 'height': 100,
+         'text': 'Fresh Products', 'fontSize': 48, 'fill': '#FFFFFF', 'zIndex': 1},
+    ],
+}
+
+
+@pytest.fixture
+def executor():
+    executor = RenderExecutor(max_workers=4, max_queue=4)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def asset_loads(monkeypatch):
+    """Threads _load_assets ran on"""
+
+    loads = []
+    load_assets = ExportService._load_assets
+
+    def recording_load(creative_data):
+        loads.append(threading.current_thread().name)
+        return load_assets(creative_data)
+
+    monkeypatch.setattr(ExportService, '_load_assets', staticmethod(recording_load))
+    return loads
+
+
+def test_every_format_is_exported_in_requested_order(export_service, executor):
+    formats = ['9:16', '1:1', '4:5']
+    results = ExportService.export_multiple_formats(
+        CREATIVE, export_service['exports'], 'creative', formats=formats, submit=executor.submit
+    )
+
+    assert list(results['formats']) == formats
+    for format_type, result in results['formats'].items():
+        assert result['success']
+        config = ExportService.FORMATS[format_type]
+        with Image.open(result['output_path']) as image:
+            assert image.size == (config['width'], config['height'])
+
+
+def test_assets_load_once_on_a_render_thread(export_service, executor, asset_loads):
+    ExportService.export_multiple_formats(CREATIVE, export_service['exports'], 'creative', submit=executor.submit)
+
+    assert len(asset_loads) == 1
+    assert asset_loads[0].startswith('render')
+
+
+def test_cached_formats_skip_asset_loading(export_service, executor, asset_loads):
+    ExportService.export_multiple_formats(CREATIVE, export_service['exports'], 'first', submit=executor.submit)
+    results = ExportService.export_multiple_formats(
+        CREATIVE, export_service['exports'], 'second', submit=executor.submit
+    )
+
+    assert len(asset_loads) == 1
+    assert all(result['cached'] for result in results['formats'].values())
+    assert os.path.exists(os.path.join(export_service['exports'], 'second_1-1.jpg'))
+
+
+def test_formats_render_concurrently(export_service, executor, monkeypatch):
+    # Passes only if all four formats are rendering at the same time
+    barrier = threading.Barrier(len(ExportService.FORMATS), timeout=10)
+    export_creative = ExportService.export_creative
+
+    def waiting_export(*args, **kwargs):
+        barrier.wait()
+        return export_creative(*args, **kwargs)
+
+    monkeypatch.setattr(ExportService, 'export_creative', staticmethod(waiting_export))
+    results = ExportService.export_multiple_formats(
+        CREATIVE, export_service['exports'], 'creative', submit=executor.submit
+    )
+
+    assert all(result['success'] for result in results['formats'].values())
+
+
+def test_render_slots_bound_concurrency(export_service, monkeypatch):
+    executor = RenderExecutor(max_workers=1, max_queue=8)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+    export_creative = ExportService.export_creative
+
+    def counting_export(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            return export_creative(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(ExportService, 'export_creative', staticmethod(counting_export))
+    ExportService.export_multiple_formats(CREATIVE, export_service['exports'], 'creative', submit=executor.submit)
+    executor.shutdown()
+
+    assert peak[0] == 1
+
+
+def test_saturated_pool_raises_before_rendering(export_service):
+    executor = RenderExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+    blocker = executor.submit(release.wait)
+
+    try:
+        with pytest.raises(RenderQueueFull):
+            ExportService.export_multiple_formats(
+                CREATIVE, export_service['exports'], 'creative', submit=executor.submit
+            )
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+        executor.shutdown()
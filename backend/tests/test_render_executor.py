@@ -0,0 +1,68 @@
+"""
+Tests for the bounded render executor and the 503 it turns into
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.render_executor import RenderExecutor, RenderQueueFull
+
+
+@pytest.fixture
+def blocked_executor():
+    """Executor with one worker and one queue slot, both taken until released"""
+
+    executor = RenderExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(2)]
+
+    yield executor
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    executor.shutdown()
+
+
+def test_submissions_beyond_workers_and_queue_are_rejected(blocked_executor):
+    with pytest.raises(RenderQueueFull):
+        blocked_executor.submit(lambda: None)
+
+    stats = blocked_executor.stats()
+    assert (stats['in_flight'], stats['queued'], stats['rejected']) == (2, 1, 1)
+
+
+def test_slots_are_freed_when_renders_finish():
+    executor = RenderExecutor(max_workers=1, max_queue=0)
+
+    assert executor.submit(lambda: 'first').result(timeout=5) == 'first'
+    assert executor.submit(lambda: 'second').result(timeout=5) == 'second'
+    assert executor.stats()['completed'] == 2
+    executor.shutdown()
+
+
+def test_failed_renders_free_their_slot():
+    executor = RenderExecutor(max_workers=1, max_queue=0)
+
+    with pytest.raises(ZeroDivisionError):
+        executor.submit(lambda: 1 / 0).result(timeout=5)
+
+    assert executor.submit(lambda: 'ok').result(timeout=5) == 'ok'
+    executor.shutdown()
+
+
+def test_saturated_executor_answers_503(blocked_executor, export_service, monkeypatch):
+    monkeypatch.setattr(main, 'render_executor', blocked_executor)
+    client = TestClient(main.app)
+
+    response = client.post('/api/export/single', json={
+        'creative_data': {'format': '1:1', 'background_color': '#FFFFFF', 'elements': []},
+        'format_type': '1:1',
+    })
+
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '1'
+    assert 'Render queue full' in response.json()['detail']
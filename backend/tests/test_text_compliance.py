@@ -0,0 +1,141 @@
+"""
+Tests for tiered text compliance: local verdicts first, the LLM for ambiguous copy
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from services.ai_service import AIService
+from services.text_compliance import (
+    CONFIDENCE_AMBIGUOUS, CONFIDENCE_CERTAIN, CONFIDENCE_CLEAN, CONFIDENCE_CLEAN_LONG,
+    TextComplianceClassifier,
+)
+
+
+LONG_CLEAN = 'Our tasty new range of hand picked seasonal vegetables grown by local farmers for you'
+
+
+class FakeLLM:
+    """Stands in for LLMGateway, answering with a canned verdict"""
+
+    def __init__(self, verdict=None, error=None, enabled=True, reply=None):
+        self.verdict = verdict or {'is_compliant': True, 'violations': [], 'severity': 'low'}
+        self.reply = reply
+        self.error = error
+        self.enabled = enabled
+        self.prompts = []
+
+    async def generate(self, prompt, operation='generate'):
+        self.prompts.append((operation, prompt))
+        if self.error:
+            raise self.error
+        return self.reply if self.reply is not None else json.dumps(self.verdict)
+
+
+@pytest.fixture
+def classifier(monkeypatch):
+    classifier = TextComplianceClassifier(threshold=0.8)
+    monkeypatch.setattr(AIService, 'text_classifier', classifier)
+    return classifier
+
+
+def use_llm(monkeypatch, llm):
+    monkeypatch.setattr(AIService, 'llm', llm)
+    return llm
+
+
+def check(text):
+    return asyncio.run(AIService.check_text_compliance(text))
+
+
+@pytest.mark.parametrize('text, compliant, confidence', [
+    ('Fresh Products Daily', True, CONFIDENCE_CLEAN),
+    (LONG_CLEAN, True, CONFIDENCE_CLEAN_LONG),
+    ('Enter our competition', False, CONFIDENCE_CERTAIN),
+    ('Eco-friendly packaging', False, CONFIDENCE_CERTAIN),
+    ('Terms and conditions apply', False, CONFIDENCE_CERTAIN),
+    ('Fresh green beans', False, CONFIDENCE_AMBIGUOUS),
+    ('Window cleaner spray', False, CONFIDENCE_AMBIGUOUS),
+])
+def test_local_confidence(classifier, text, compliant, confidence):
+    verdict = classifier.classify(text)
+
+    assert (verdict['is_compliant'], verdict['confidence']) == (compliant, confidence)
+    assert verdict['needs_review'] == (confidence < 0.8)
+    assert bool(verdict['violations']) != compliant
+
+
+@pytest.mark.parametrize('text', ['Fresh Products Daily', 'Enter our competition', 'Eco-friendly packaging'])
+def test_clear_verdicts_never_reach_the_llm(classifier, monkeypatch, text):
+    llm = use_llm(monkeypatch, FakeLLM())
+
+    result = check(text)
+
+    assert result['tier'] == 'local'
+    assert result['is_compliant'] == classifier.classify(text)['is_compliant']
+    assert llm.prompts == []
+
+
+@pytest.mark.parametrize('text', ['Fresh green beans', 'Window cleaner spray', LONG_CLEAN])
+def test_ambiguous_copy_is_decided_by_the_llm(classifier, monkeypatch, text):
+    llm = use_llm(monkeypatch, FakeLLM({'is_compliant': True, 'violations': [], 'severity': 'low'}))
+
+    result = check(text)
+
+    assert (result['tier'], result['is_compliant']) == ('llm', True)
+    assert len(llm.prompts) == 1
+    operation, prompt = llm.prompts[0]
+    assert operation == 'text_compliance'
+    assert f'"{text}"' in prompt
+
+
+def test_llm_violations_are_returned(classifier, monkeypatch):
+    use_llm(monkeypatch, FakeLLM({'is_compliant': False, 'violations': ['Sustainability claim'], 'severity': 'medium'}))
+
+    result = check('Fresh green beans')
+
+    assert (result['is_compliant'], result['violations'], result['severity']) == (
+        False, ['Sustainability claim'], 'medium'
+    )
+
+
+@pytest.mark.parametrize('llm', [FakeLLM(error=RuntimeError('quota')), FakeLLM(reply='Looks fine to me')])
+def test_failed_llm_call_keeps_the_local_verdict(classifier, monkeypatch, llm):
+    use_llm(monkeypatch, llm)
+
+    result = check('Fresh green beans')
+
+    assert (result['tier'], result['is_compliant'], result['confidence']) == ('local', False, CONFIDENCE_AMBIGUOUS)
+    assert classifier.stats()['llm_failed'] == 1
+
+
+def test_without_an_api_key_everything_is_local(classifier, monkeypatch):
+    llm = use_llm(monkeypatch, FakeLLM(enabled=False))
+
+    assert check('Fresh green beans')['tier'] == 'local'
+    assert llm.prompts == []
+
+
+@pytest.mark.parametrize('threshold, llm_calls', [(0.0, 0), (0.6, 1), (0.8, 2), (1.01, 4)])
+def test_threshold_sets_which_verdicts_are_reviewed(monkeypatch, threshold, llm_calls):
+    monkeypatch.setattr(AIService, 'text_classifier', TextComplianceClassifier(threshold=threshold))
+    llm = use_llm(monkeypatch, FakeLLM())
+
+    for text in ('Fresh Products Daily', LONG_CLEAN, 'Fresh green beans', 'Enter our competition'):
+        check(text)
+
+    assert len(llm.prompts) == llm_calls
+
+
+def test_tier_counts_are_reported(classifier, monkeypatch):
+    use_llm(monkeypatch, FakeLLM())
+
+    for text in ('Fresh Products Daily', 'Enter our competition', 'Eco-friendly packaging', 'Fresh green beans'):
+        check(text)
+
+    stats = classifier.stats()
+    assert (stats['local'], stats['llm'], stats['llm_failed']) == (3, 1, 0)
+    assert stats['local_rate'] == 0.75
+    assert stats['threshold'] == 0.8
@@ -0,0 +1,197 @@
+"""
+Tests for streaming uploads and the upload size limit
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from services.asset_registry import AssetRegistry
+from services.asset_store import AssetStore, UploadTooLarge
+from utils.multipart_stream import BodyTooLarge, MultipartError, MultipartFileStream
+
+
+BOUNDARY = 'test-boundary-1234'
+
+
+def multipart_body(parts) -> bytes:
+    """parts: (field name, filename or None, content) tuples"""
+
+    body = b''
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else '')
+        body += f'--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n'.encode()
+        if filename:
+            body += b'Content-Type: application/octet-stream\r\n'
+        body += b'\r\n' + content + b'\r\n'
+    return body + f'--{BOUNDARY}--\r\n'.encode()
+
+
+class FakeRequest:
+    """Request whose body arrives in fixed-size chunks, counting those taken"""
+
+    def __init__(self, body: bytes, chunk_size: int = 7, content_type=f'multipart/form-data; boundary={BOUNDARY}'):
+        self.headers = {'content-type': content_type}
+        self.body = body
+        self.chunk_size = chunk_size
+        self.chunks_read = 0
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + self.chunk_size]
+        yield b''
+
+
+async def read_all(stream: MultipartFileStream, size: int = 5) -> bytes:
+    data = b''
+    while True:
+        chunk = await stream.read(size)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def png_bytes(color=(10, 120, 200)) -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(output, format='PNG')
+    return output.getvalue()
+
+
+def test_file_field_is_read_across_chunk_boundaries():
+    content = bytes(range(256)) * 3 + b'\r\n--not-the-boundary\r\n'
+    request = FakeRequest(multipart_body([
+        ('note', None, b'ignored'),
+        ('file', 'pack shot.png', content),
+        ('other', 'other.png', b'also ignored'),
+    ]))
+
+    async def read():
+        stream = await MultipartFileStream(request, 'file').open()
+        return stream.filename, await read_all(stream)
+
+    assert asyncio.run(read()) == ('pack shot.png', content)
+
+
+def test_open_stops_at_the_start_of_the_file():
+    padding = b'x' * 10_000
+    request = FakeRequest(multipart_body([('file', 'pack.png', padding)]), chunk_size=100)
+
+    asyncio.run(MultipartFileStream(request, 'file').open())
+
+    assert request.chunks_read < 5
+
+
+@pytest.mark.parametrize('content_type', ['application/json', 'multipart/form-data'])
+def test_non_multipart_bodies_are_rejected(content_type):
+    with pytest.raises(MultipartError):
+        MultipartFileStream(FakeRequest(b'{}', content_type=content_type))
+
+
+def test_missing_file_field_is_reported():
+    request = FakeRequest(multipart_body([('image', 'pack.png', b'data'), ('file', None, b'not a file')]))
+
+    with pytest.raises(MultipartError):
+        asyncio.run(MultipartFileStream(request, 'file').open())
+
+
+def test_raw_body_limit_stops_reading_the_request():
+    request = FakeRequest(multipart_body([('file', 'pack.png', b'x' * 100_000)]), chunk_size=1000)
+
+    async def read():
+        stream = await MultipartFileStream(request, 'file', max_body_bytes=5000).open()
+        await read_all(stream, 1000)
+
+    with pytest.raises(BodyTooLarge):
+        asyncio.run(read())
+
+    assert request.chunks_read == 6
+
+
+def test_oversized_upload_aborts_without_reading_the_rest(tmp_path):
+    store = AssetStore(str(tmp_path))
+    request = FakeRequest(multipart_body([('file', 'big.png', b'x' * 1_000_000)]), chunk_size=64 * 1024)
+
+    async def upload():
+        stream = await MultipartFileStream(request, 'file').open()
+        await store.store_upload(stream, max_bytes=200 * 1024)
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(upload())
+
+    # 200KB limit in 64KB chunks: aborted on the fourth, of sixteen
+    assert request.chunks_read == 4
+    assert [name for name in os.listdir(tmp_path) if name != '.meta'] == []
+
+
+def test_streamed_upload_is_stored_under_its_hash(tmp_path):
+    store = AssetStore(str(tmp_path))
+    content = png_bytes()
+    request = FakeRequest(multipart_body([('file', 'pack.PNG', content)]), chunk_size=50)
+
+    async def upload():
+        return await store.store_upload(await MultipartFileStream(request, 'file').open(), max_bytes=len(content))
+
+    stored = asyncio.run(upload())
+
+    assert stored['sha256'] == hashlib.sha256(content).hexdigest()
+    assert stored['size'] == len(content)
+    assert stored['filename'] == f"{stored['sha256']}.png"
+    with open(stored['file_path'], 'rb') as f:
+        assert f.read() == content
+
+
+@pytest.fixture
+def client(export_service, monkeypatch):
+    monkeypatch.setattr(main, 'asset_store', AssetStore(export_service['uploads']))
+    monkeypatch.setattr(main, 'asset_registry', AssetRegistry(export_service['uploads']))
+    monkeypatch.setattr(main.settings, 'max_file_size', 4096)
+    return TestClient(main.app)
+
+
+def test_upload_endpoint_stores_the_file(client):
+    content = png_bytes()
+
+    response = client.post('/api/upload', files={'file': ('pack.png', content, 'image/png')})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data['file_size'], data['original_filename'], data['duplicate']) == (len(content), 'pack.png', False)
+    assert main.asset_registry.resolve(data['sha256']) == data['file_path']
+
+
+def test_upload_endpoint_refuses_oversized_content_length(client, monkeypatch):
+    opened = []
+    monkeypatch.setattr(MultipartFileStream, 'open', lambda self: opened.append(self))
+
+    response = client.post('/api/upload', files={'file': ('big.png', b'x' * (main.UPLOAD_BODY_OVERHEAD + 8192))})
+
+    assert response.status_code == 400
+    assert 'too large' in response.json()['detail']
+    assert opened == []
+
+
+def test_upload_endpoint_refuses_files_over_the_limit(client):
+    response = client.post('/api/upload', files={'file': ('big.png', b'x' * 5000, 'image/png')})
+
+    assert response.status_code == 400
+    assert 'too large' in response.json()['detail']
+
+
+def test_upload_endpoint_checks_the_extension_before_storing(client, export_service):
+    response = client.post('/api/upload', files={'file': ('script.exe', b'MZ', 'application/octet-stream')})
+
+    assert response.status_code == 400
+    assert 'Invalid file type' in response.json()['detail']
+    assert [name for name in os.listdir(export_service['uploads']) if not name.startswith('.')] == []
+
+
+def test_upload_endpoint_requires_a_file(client):
+    assert client.post('/api/upload', data={'file': 'not a file'}).status_code == 422
+    assert client.post('/api/upload', json={'file': 'pack.png'}).status_code == 422
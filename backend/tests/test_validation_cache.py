@@ -0,0 +1,83 @@
+"""
+Tests for the content-addressed compliance result cache
+"""
+
+from services import compliance_rules
+from services.compliance_rules import ComplianceEngine
+from services.validation_cache import ValidationResultCache
+
+
+CREATIVE = {
+    'format': '1:1',
+    'background_color': '#FFFFFF',
+    'headline': 'Fresh Summer Flavours',
+    'elements': [{'id': 'headline', 'type': 'text', 'x': 100, 'y': 100, 'width': 800, 'height': 100,
+                  'fontSize': 48, 'fill': '#000000'}],
+}
+
+
+def test_key_ignores_field_order():
+    reordered = {key: CREATIVE[key] for key in reversed(list(CREATIVE))}
+
+    assert (ValidationResultCache.make_key(CREATIVE, '1', 'all') ==
+            ValidationResultCache.make_key(reordered, '1', 'all'))
+
+
+def test_key_depends_on_mode_rule_types_and_ruleset():
+    base = ValidationResultCache.make_key(CREATIVE, '1', 'all')
+
+    assert base != ValidationResultCache.make_key(CREATIVE, '2', 'all')
+    assert base != ValidationResultCache.make_key(CREATIVE, '1', 'realtime')
+    assert (ValidationResultCache.make_key(CREATIVE, '1', 'realtime', ['copy', 'design']) ==
+            ValidationResultCache.make_key(CREATIVE, '1', 'realtime', ['design', 'copy']))
+
+
+def test_repeat_validation_is_a_hit():
+    engine = ComplianceEngine()
+
+    first = engine.validate_all(CREATIVE)
+    second = engine.validate_all(dict(CREATIVE))
+
+    stats = engine.result_cache.stats()
+    assert second == first
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_cached_results_are_copies():
+    engine = ComplianceEngine()
+
+    engine.validate_all(CREATIVE)['errors'].append('mutated')
+
+    assert 'mutated' not in engine.validate_all(CREATIVE)['errors']
+
+
+def test_lru_eviction():
+    cache = ValidationResultCache(max_entries=2)
+    cache.put('a', {'n': 1})
+    cache.put('b', {'n': 2})
+    cache.get('a')
+    cache.put('c', {'n': 3})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'n': 1}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ruleset_change_invalidates_cached_results(monkeypatch):
+    engine = ComplianceEngine()
+    engine.validate_all(CREATIVE)
+
+    monkeypatch.setattr(compliance_rules, 'RULESET_VERSION', '2.0')
+    upgraded = ComplianceEngine()
+    upgraded.result_cache = engine.result_cache
+    upgraded.validate_all(CREATIVE)
+
+    assert upgraded.ruleset_version != engine.ruleset_version
+    assert engine.result_cache.stats()['misses'] == 2
+
+
+def test_rule_configuration_changes_the_ruleset_version():
+    engine = ComplianceEngine()
+    engine.rules[0].strictness = 'warning'
+
+    assert engine._ruleset_fingerprint() != engine.ruleset_version
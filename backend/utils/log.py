@@ -0,0 +1,108 @@
+"""
+Logging for Tesco Creative Studio
+Structured JSON records written by a background thread
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+
+# Loggers for per-element detail, sampled by ELEMENT_SAMPLE_RATE
+ELEMENT_LOGGERS = (
+    'services.export_service.elements',
+    'services.compliance_rules.elements',
+)
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra` fields inlined"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the message and traceback as separate fields"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SampleFilter(logging.Filter):
+    """Let through a random `rate` fraction of records"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+def setup_logging(debug: bool = False, element_sample_rate: float = 1.0):
+    """
+    Route all logging through a queue to a JSON stdout writer thread
+
+    Request threads only enqueue records; formatting and the stdout write
+    happen on the listener thread. The level is DEBUG when `debug` is set and
+    INFO otherwise, so per-element debug records are dropped in production
+    and sampled at `element_sample_rate` in debug mode. Safe to call again,
+    e.g. when uvicorn reloads.
+    """
+
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+
+    for name in ELEMENT_LOGGERS:
+        element_logger = logging.getLogger(name)
+        element_logger.filters = [SampleFilter(element_sample_rate)]
+
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: 'queue.Queue' = queue.Queue(-1)
+    root.handlers = [StructuredQueueHandler(log_queue)]
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
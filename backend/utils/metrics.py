@@ -0,0 +1,222 @@
+"""
+Metrics for Tesco Creative Studio
+Latency histograms for hot paths, exported in Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+
+# Upper bounds in seconds, from sub-millisecond rule checks to model calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Rule checks usually take microseconds
+RULE_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.1,
+)
+
+_REGISTRY: List['Histogram'] = []
+_enabled = True
+
+
+def set_enabled(enabled: bool):
+    """Turn recording on or off process-wide"""
+    global _enabled
+    _enabled = enabled
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager observing the elapsed time of its block"""
+
+    __slots__ = ('_series', '_started')
+
+    def __init__(self, series: '_Series'):
+        self._series = series
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._series.observe(time.perf_counter() - self._started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Series:
+    """Bucket counts, sum and count for one label combination"""
+
+    __slots__ = ('_histogram', 'counts', 'sum', 'count')
+
+    def __init__(self, histogram: 'Histogram'):
+        self._histogram = histogram
+        self.counts = [0] * (len(histogram.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        if not _enabled:
+            return
+
+        index = bisect_left(self._histogram.buckets, value)
+        with self._histogram._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """Observe the duration of a `with` block"""
+        return _Timer(self) if _enabled else _NULL_TIMER
+
+
+class Histogram:
+    """
+    Latency histogram with optional labels
+
+    Recording is a bisect and three increments under a lock; cumulative
+    bucket counts and the text format are only computed when /metrics is
+    scraped. Usage mirrors prometheus_client:
+
+        RULE_SECONDS.labels(rule='CTA').observe(0.002)
+        with RENDER_SECONDS.labels(type='text').time():
+            ...
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, _Series] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def labels(self, **labels) -> _Series:
+        """Series for a label combination, created on first use"""
+
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, _Series(self))
+        return series
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def collect(self) -> List[str]:
+        """Prometheus text exposition lines"""
+
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+
+        with self._lock:
+            snapshot = [
+                (key, list(series.counts), series.sum, series.count)
+                for key, series in self._series.items()
+            ]
+
+        for key, counts, total, count in sorted(snapshot):
+            pairs = list(zip(self.labelnames, key))
+
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_format_labels(pairs + [("le", _format_value(bound))])} {cumulative}')
+            lines.append(f'{self.name}_bucket{_format_labels(pairs + [("le", "+Inf")])} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(pairs)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(pairs)} {count}')
+
+        return lines
+
+
+def render_metrics() -> str:
+    """Every registered histogram in Prometheus text format"""
+
+    lines = []
+    for histogram in _REGISTRY:
+        lines.extend(histogram.collect())
+    return '\n'.join(lines) + '\n'
+
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+COMPLIANCE_RULE_SECONDS = Histogram(
+    'creative_studio_compliance_rule_seconds',
+    'Time spent in one compliance rule check',
+    ('rule',),
+    buckets=RULE_BUCKETS
+)
+
+RENDER_ELEMENT_SECONDS = Histogram(
+    'creative_studio_render_element_seconds',
+    'Time spent rendering one element onto the export canvas',
+    ('type',)
+)
+
+IMAGE_DECODE_SECONDS = Histogram(
+    'creative_studio_image_decode_seconds',
+    'Time spent decoding a source image into the asset cache'
+)
+
+IMAGE_RESIZE_SECONDS = Histogram(
+    'creative_studio_image_resize_seconds',
+    'Time spent resizing and rotating an image variant for the asset cache'
+)
+
+JPEG_QUALITY_SEARCH_SECONDS = Histogram(
+    'creative_studio_jpeg_quality_search_seconds',
+    'Time spent finding and encoding the highest JPEG quality under the size limit'
+)
+
+REMBG_INFERENCE_SECONDS = Histogram(
+    'creative_studio_rembg_inference_seconds',
+    'Time spent in background removal inference per call',
+    ('mode',)
+)
+
+GEMINI_REQUEST_SECONDS = Histogram(
+    'creative_studio_gemini_request_seconds',
+    'Time spent waiting for a Gemini generate_content call',
+    ('operation',)
+)
@@ -0,0 +1,142 @@
+"""
+Multipart Stream for Tesco Creative Studio
+Reads one file field of a multipart/form-data request as the body arrives
+"""
+
+from typing import Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartError(ValueError):
+    """Raised when the request body isn't usable multipart/form-data"""
+
+
+class BodyTooLarge(Exception):
+    """Raised when the raw request body exceeds the size limit"""
+
+
+class MultipartFileStream:
+    """
+    A file field of a request body, readable like an UploadFile
+
+    FastAPI's File(...) parameters spool the whole body before the endpoint
+    runs. This parses the body chunk by chunk straight off request.stream()
+    instead: read() only pulls more of the body when the bytes already parsed
+    are used up, so memory stays at about one network chunk. Raw body bytes
+    are counted as they arrive, and other fields are skipped.
+    """
+
+    def __init__(self, request, field_name: str = 'file', max_body_bytes: Optional[int] = None):
+        content_type, params = parse_options_header(request.headers.get('content-type', ''))
+        if content_type != b'multipart/form-data' or not params.get(b'boundary'):
+            raise MultipartError("Expected a multipart/form-data body")
+
+        self.field_name = field_name
+        self.max_body_bytes = max_body_bytes
+        self.filename: Optional[str] = None
+        self.body_bytes = 0
+
+        self._chunks = request.stream()
+        self._pending = bytearray()
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers = {}
+        self._in_field = False
+        self._field_done = False
+        self._eof = False
+
+        self._parser = MultipartParser(params[b'boundary'], {
+            'on_part_begin': self._on_part_begin,
+            'on_header_field': lambda data, start, end: self._header_field.extend(data[start:end]),
+            'on_header_value': lambda data, start, end: self._header_value.extend(data[start:end]),
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+        })
+
+    # ------------------------------------------------------------------
+    # Parser callbacks
+    # ------------------------------------------------------------------
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_end(self):
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b'content-disposition', b''))
+        name = params.get(b'name', b'').decode('utf-8', 'replace')
+        filename = params.get(b'filename')
+
+        # Only the first file sent under the field name is read
+        self._in_field = (
+            name == self.field_name and filename is not None and self.filename is None
+        )
+        if self._in_field:
+            self.filename = filename.decode('utf-8', 'replace')
+
+    def _on_part_data(self, data, start: int, end: int):
+        if self._in_field:
+            self._pending.extend(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_field:
+            self._in_field = False
+            self._field_done = True
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    async def _feed(self):
+        """Parse the next chunk of the request body"""
+
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            self._parser.finalize()
+            return
+
+        self.body_bytes += len(chunk)
+        if self.max_body_bytes is not None and self.body_bytes > self.max_body_bytes:
+            raise BodyTooLarge(f"Request body exceeds {self.max_body_bytes} bytes")
+
+        if chunk:
+            self._parser.write(chunk)
+
+    async def open(self) -> 'MultipartFileStream':
+        """
+        Read up to the start of the file's content, setting filename
+
+        Raises:
+            MultipartError: The body has no file under field_name
+        """
+
+        while self.filename is None and not self._eof:
+            await self._feed()
+
+        if self.filename is None:
+            raise MultipartError(f"No file in field '{self.field_name}'")
+
+        return self
+
+    async def read(self, size: int = -1) -> bytes:
+        """Next bytes of the file, b'' once it ends"""
+
+        while not self._pending and not self._field_done and not self._eof:
+            await self._feed()
+
+        if size < 0 or size >= len(self._pending):
+            data = bytes(self._pending)
+            self._pending.clear()
+        else:
+            data = bytes(self._pending[:size])
+            del self._pending[:size]
+
+        return data
@@ -0,0 +1,78 @@
+"""
+ZIP Stream for Tesco Creative Studio
+Builds a ZIP archive incrementally, handing out bytes as each entry is added
+"""
+
+import io
+import time
+import zipfile
+
+
+class _DrainBuffer(io.RawIOBase):
+    """Write-only, unseekable sink whose pending bytes are taken by drain()"""
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._pending += data
+        self._position += len(data)
+        return len(data)
+
+    def flush(self):
+        # Nothing buffered below us; also keeps an abandoned ZipFile's
+        # finaliser from failing once this sink is closed
+        pass
+
+    def tell(self) -> int:
+        # Offsets for the local headers and central directory
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._pending)
+        self._pending.clear()
+        return data
+
+
+class ZipStream:
+    """
+    ZIP archive written as a sequence of chunks
+
+    Every add() returns the bytes of that entry (local header, data and data
+    descriptor), and close() returns the central directory, so an archive of
+    many files can be sent while later files are still being produced. Only
+    the entry being added is held in memory. The sink is not seekable, so
+    zipfile records sizes and CRCs in data descriptors after each entry.
+    """
+
+    def __init__(self):
+        self._buffer = _DrainBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, mode='w', compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, data: bytes, compress: bool = False) -> bytes:
+        """
+        Append one file to the archive
+
+        Args:
+            name: Path inside the archive
+            data: File content
+            compress: Deflate the content (pointless for JPEG/PNG)
+
+        Returns:
+            The archive bytes for this entry
+        """
+
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        info.external_attr = 0o644 << 16
+        self._zip.writestr(info, data)
+        return self._buffer.drain()
+
+    def close(self) -> bytes:
+        """Finish the archive, returning the central directory"""
+        self._zip.close()
+        return self._buffer.drain()
@@ -3,7 +3,7 @@
  * Compliance validation and export options
  */
 
-import React, {useState, useEffect} from 'react';
+import React, {useState, useEffect, useRef} from 'react';
 import {CheckCircle, AlertTriangle, XCircle, RefreshCw, Download} from 'lucide-react';
 import useCreativeStore from '../store/creativeStore';
 import {validateCompliance, exportCreative} from '../services/api';
@@ -30,6 +30,9 @@ const RightPanel = () => {
 
     const [activeSection, setActiveSection] = useState('compliance');
 
+    // Stable id so the backend only re-runs rules whose inputs changed
+    const validationSessionId = useRef(`session-${Date.now()}-${Math.random().toString(36).slice(2)}`);
+
     // Auto-validate on changes (debounced)
     useEffect(() => {
         const timer = setTimeout(() => {
@@ -43,7 +46,7 @@ const RightPanel = () => {
         try {
             setIsValidating(true);
             const creativeData = getCreativeData();
-            const result = await validateCompliance(creativeData);
+            const result = await validateCompliance(creativeData, null, validationSessionId.current);
             setComplianceResult(result);
         } catch (error) {
             console.error('Validation error:', error);
@@ -51,7 +51,7 @@ const Sidebar = () => {
             if (result.success) {
                 addUploadedAsset({
                     id: Date.now(),
-                    filename: result.filename,
+                    filename: result.original_filename || result.filename,
                     path: result.file_path,
                     type: file.type.startsWith('image/') ? 'image' : 'file',
                 });
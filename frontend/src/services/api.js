@@ -43,6 +43,26 @@ export const removeBackground = async (imagePath) => {
     return response.data;
 };
 
+export const deleteAsset = async (assetRef) => {
+    const response = await api.delete(`/api/assets/${encodeURIComponent(assetRef)}`);
+
+    return response.data;
+};
+
+export const removeBackgroundBatch = async (imagePaths) => {
+    const response = await api.post('/api/ai/remove-background/batch', {
+        image_paths: imagePaths,
+    });
+
+    return response.data;
+};
+
+export const getBackgroundRemovalJob = async (jobId) => {
+    const response = await api.get(`/api/ai/remove-background/jobs/${jobId}`);
+
+    return response.data;
+};
+
 export const checkTextCompliance = async (text) => {
     const response = await api.post('/api/ai/check-text-compliance', {
         text,
@@ -96,10 +116,11 @@ export const generateCampaignSet = async (productName, headline, brandColors) =>
 // COMPLIANCE VALIDATION
 // ============================================================================
 
-export const validateCompliance = async (creativeData, ruleTypes = null) => {
+export const validateCompliance = async (creativeData, ruleTypes = null, sessionId = null) => {
     const response = await api.post('/api/compliance/validate', {
         creative_data: creativeData,
         rule_types: ruleTypes,
+        session_id: sessionId,
     });
 
     return response.data;
@@ -134,6 +155,68 @@ export const exportMultipleFormats = async (creativeData, filename) => {
     return response.data;
 };
 
+const saveBlob = (blob, filename) => {
+    const url = URL.createObjectURL(blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    link.click();
+    URL.revokeObjectURL(url);
+};
+
+// All formats in one ZIP (with manifest.json), streamed as each format renders
+export const downloadExportBundle = async (creativeData, filename, formats = null, fileFormat = 'JPEG') => {
+    const response = await api.post('/api/export/multi-format/zip', {
+        creative_data: creativeData,
+        filename,
+        formats,
+        file_format: fileFormat,
+    }, { responseType: 'blob' });
+
+    saveBlob(response.data, `${filename}.zip`);
+};
+
+// creatives: [{ creative_data, name, formats }]
+export const downloadCampaignBundle = async (creatives, filename = 'campaign', fileFormat = 'JPEG') => {
+    const response = await api.post('/api/export/campaign/zip', {
+        creatives,
+        filename,
+        file_format: fileFormat,
+    }, { responseType: 'blob' });
+
+    saveBlob(response.data, `${filename}.zip`);
+};
+
+export const submitExportJob = async (creativeData, filename, formats = null, fileFormat = 'JPEG') => {
+    const response = await api.post('/api/export/jobs', {
+        creative_data: creativeData,
+        filename,
+        formats,
+        file_format: fileFormat,
+    });
+
+    return response.data;
+};
+
+export const getExportJob = async (jobId) => {
+    const response = await api.get(`/api/export/jobs/${jobId}`);
+    return response.data;
+};
+
+// Progress events; the handler receives the job after every change
+export const watchExportJob = (jobId, onUpdate) => {
+    const source = new EventSource(`${API_BASE_URL}/api/export/jobs/${jobId}/events`);
+    source.onmessage = (event) => {
+        const job = JSON.parse(event.data);
+        onUpdate(job);
+        if (!job || job.status === 'completed' || job.status === 'failed') {
+            source.close();
+        }
+    };
+    source.onerror = () => source.close();
+    return source;
+};
+
 export const downloadExport = (filename) => {
     window.open(`${API_BASE_URL}/api/export/download/${filename}`, '_blank');
 };